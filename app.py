@@ -3,27 +3,24 @@ Aplicação Streamlit refatorada - Página principal enxuta
 """
 
 import streamlit as st
-import pandas as pd
 
 # Imports das camadas
-from config.settings import configure_page, UI_CONFIG
-from data.loader import load_data, get_groups
-from logic.filters import filter_foods_by_groups, row_by_food, get_food_names, get_available_groups
+from config.settings import configure_page, UI_CONFIG, MULTI_COMPARE_MIN, MULTI_COMPARE_MAX
+from data.loader import get_dataset
+from logic.filters import row_view_by_food
 from ui.state import (
-    init_state, get_selected_groups, toggle_group, clear_groups,
-    get_selected_sections, toggle_section, get_ordered_sections, StateKeys,
-    has_selection_changed, set_current_selection, get_current_foods, get_current_data,
-    clear_current_selection, is_valid_selection, should_update_selection,
-    handle_chips_interaction, get_safe_food_names, handle_food_change_autoclear,
+    init_state, StateKeys, is_valid_selection, get_safe_food_keys, get_multi_selection,
     # Sistema de instância fixa
-    create_fixed_instance, get_fixed_instance, has_fixed_instance, clear_fixed_instance,
-    should_create_new_instance, should_update_instance, get_instance_foods, get_instance_data,
-    is_instance_valid, handle_filtering_with_fixed_instance, handle_food_selection_with_fixed_instance,
-    should_replace_food_in_instance
+    create_fixed_instance, has_fixed_instance, clear_fixed_instance, should_update_instance,
+    get_instance_foods, get_instance_data, is_instance_valid, should_replace_food_in_instance
+)
+from ui.components import (
+    inject_css, food_card, similar_foods_panel, food_picker, sections_panel, range_filters_sidebar,
+    profiling_sidebar
 )
-from ui.components import inject_css, food_card, chips_grid, section_selector, sticky_sections_menu
 from ui.charts import pie_macros
-from ui.sections import SECTIONS_REGISTRY
+from ui.sections import render_multi_comparison
+from logic.profiling import profile_rerun
 
 # Funções auxiliares removidas - lógica movida para main() enxuta
 
@@ -35,8 +32,9 @@ def main():
     configure_page()
     inject_css()
     
-    # 2. Carregar dados
-    df = load_data()
+    # 2. Carregar dados (mesma versão do dataset durante todo o rerun)
+    dataset = get_dataset()
+    store = dataset.store
     init_state()
     
     # 3. Renderizar títulos
@@ -58,65 +56,55 @@ def main():
     </div>
     """, unsafe_allow_html=True)
     
-    # 5. Chips esquerda/direita → selectbox(es)
+    # 5. Filtro por faixas de nutrientes (barra lateral) → restringe ambos os selectboxes
+    range_rows = range_filters_sidebar(store)
+    
+    # Modo de comparação: dois alimentos (padrão) ou vários alimentos
+    modo = st.radio(
+        UI_CONFIG['compare_mode_label'],
+        [UI_CONFIG['compare_mode_pair'], UI_CONFIG['compare_mode_multi']],
+        horizontal=True,
+        key=StateKeys.MODO_COMPARACAO
+    )
+    if modo == UI_CONFIG['compare_mode_multi']:
+        st.multiselect(
+            UI_CONFIG['multi_select_label'],
+            get_safe_food_keys(store, None, "left", rows=range_rows),
+            format_func=store.label_for,
+            max_selections=MULTI_COMPARE_MAX,
+            key=StateKeys.ALIMENTOS_MULTI
+        )
+        foods, rows = get_multi_selection(store)
+        if len(foods) < MULTI_COMPARE_MIN:
+            st.info(UI_CONFIG['multi_select_hint'])
+            return
+        st.markdown("---")
+        render_multi_comparison(store, rows, foods)
+        return
+    
+    # 6. Seletores esquerda/direita (chips → busca → selectbox), cada um como fragmento
+    st.session_state[StateKeys.RENDERED_FOODS] = {
+        'left': st.session_state.get(StateKeys.ALIMENTO_1, ''),
+        'right': st.session_state.get(StateKeys.ALIMENTO_2, '')
+    }
     col1, col2 = st.columns(2, gap="large")
     
     with col1:
-        st.markdown(f"### {UI_CONFIG['food1_label']}")
-        chips_grid(get_available_groups(df), "left")
-        if st.button(UI_CONFIG['clear_button_text'], key=StateKeys.CLEAR_BUTTON_LEFT):
-            clear_groups("left")
-            # Usar st.rerun() para melhor performance
-            st.rerun()
-        
-        # Gerenciar interação das chips
-        handle_chips_interaction("left")
-        
-        selected_groups_1 = get_selected_groups("left")
-        filtered_foods_1 = get_safe_food_names(df, selected_groups_1, "left")
-        food1 = st.selectbox(
-            UI_CONFIG['select_food1_placeholder'],
-            [''] + filtered_foods_1,
-            key=StateKeys.ALIMENTO_1
-        )
-        
-        # Autoclear quando alimento muda
-        if food1:
-            handle_food_change_autoclear("left", food1)
+        food1 = food_picker(store, "left", range_rows)
     
     with col2:
-        st.markdown(f"### {UI_CONFIG['food2_label']}")
-        chips_grid(get_available_groups(df), "right")
-        if st.button(UI_CONFIG['clear_button_text'], key=StateKeys.CLEAR_BUTTON_RIGHT):
-            clear_groups("right")
-            # Usar st.rerun() para melhor performance
-            st.rerun()
-        
-        # Gerenciar interação das chips
-        handle_chips_interaction("right")
-        
-        selected_groups_2 = get_selected_groups("right")
-        filtered_foods_2 = get_safe_food_names(df, selected_groups_2, "right")
-        food2 = st.selectbox(
-            UI_CONFIG['select_food2_placeholder'],
-            [''] + filtered_foods_2,
-            key=StateKeys.ALIMENTO_2
-        )
-        
-        # Autoclear quando alimento muda
-        if food2:
-            handle_food_change_autoclear("right", food2)
+        food2 = food_picker(store, "right", range_rows)
     
     # Os valores dos alimentos já estão sendo gerenciados automaticamente pelo Streamlit
     # através das keys StateKeys.ALIMENTO_1 e StateKeys.ALIMENTO_2
     
-    # 6. Sistema de instância fixa (comparação estável)
+    # 7. Sistema de instância fixa (comparação estável)
     # LÓGICA CORRIGIDA: Usar instância fixa como fonte de verdade
     
     # Verificar se há instância fixa ativa
     if has_fixed_instance() and is_instance_valid():
         # Usar dados da instância fixa (comparação estável)
-        data1, data2 = get_instance_data()
+        data1, data2 = get_instance_data(store)
         current_food1, current_food2 = get_instance_foods()
         
         # SÓ atualizar se há uma nova seleção válida (não apenas filtros)
@@ -124,8 +112,8 @@ def main():
             # Substituição inteligente: atualizar apenas o alimento que mudou
             if should_replace_food_in_instance("left", food1):
                 # Substituir alimento1, manter alimento2
-                new_data1 = row_by_food(df, food1)
-                if not new_data1.empty and data2 is not None:
+                new_data1 = row_view_by_food(store, food1)
+                if new_data1 is not None and data2 is not None:
                     create_fixed_instance(food1, current_food2, new_data1, data2)
                     data1 = new_data1
                     current_food1 = food1
@@ -134,8 +122,8 @@ def main():
                     return
             elif should_replace_food_in_instance("right", food2):
                 # Substituir alimento2, manter alimento1
-                new_data2 = row_by_food(df, food2)
-                if data1 is not None and not new_data2.empty:
+                new_data2 = row_view_by_food(store, food2)
+                if data1 is not None and new_data2 is not None:
                     create_fixed_instance(current_food1, food2, data1, new_data2)
                     data2 = new_data2
                     current_food2 = food2
@@ -144,10 +132,10 @@ def main():
                     return
     elif is_valid_selection(food1, food2):
         # Criar nova instância fixa apenas se não há instância ativa
-        data1 = row_by_food(df, food1)
-        data2 = row_by_food(df, food2)
+        data1 = row_view_by_food(store, food1)
+        data2 = row_view_by_food(store, food2)
         
-        if not data1.empty and not data2.empty:
+        if data1 is not None and data2 is not None:
             # Criar nova instância fixa
             create_fixed_instance(food1, food2, data1, data2)
             current_food1, current_food2 = food1, food2
@@ -160,8 +148,10 @@ def main():
         return
         
     # Verificar se temos dados válidos
-    if not data1.empty and not data2.empty:
-        # Usar alimentos da instância fixa (já obtidos acima)
+    if data1 is not None and data2 is not None:
+        # Usar alimentos da instância fixa (já obtidos acima); as chaves identificam,
+        # os rótulos (nome desambiguado pela fonte) são exibidos
+        label1, label2 = data1.label, data2.label
         
         # Cards (food_card)
         st.markdown("---")
@@ -170,10 +160,12 @@ def main():
         col_esq, col_dir = st.columns(2, gap="large")
         
         with col_esq:
-            food_card(data1, current_food1, slot='left')
+            food_card(data1, label1, slot='left')
+            similar_foods_panel(store, current_food1, slot='left')
         
         with col_dir:
-            food_card(data2, current_food2, slot='right')
+            food_card(data2, label2, slot='right')
+            similar_foods_panel(store, current_food2, slot='right')
         
         # Gráficos de pizza (charts.pie_macros)
         st.markdown("---")
@@ -182,37 +174,19 @@ def main():
         
         with col_esq:
             st.plotly_chart(
-                pie_macros(data1, current_food1, slot='left'),
+                pie_macros(data1, label1, slot='left'),
                 use_container_width=True
             )
         
         with col_dir:
             st.plotly_chart(
-                pie_macros(data2, current_food2, slot='right'),
+                pie_macros(data2, label2, slot='right'),
                 use_container_width=True
             )
         
-        # section_selector([...])
-        st.markdown("---")
-        st.markdown(f"### {UI_CONFIG['sections_title']}")
-        section_selector([])
-        
-        # Sticky menu para navegação rápida
-        sticky_sections_menu()
-        
+        # Seletor de seções + seções: fragmento próprio (não refaz cards/pizzas)
         # Para cada seção selecionada: SECTIONS_REGISTRY[id].render(df1_row, df2_row, food1, food2)
-        # Usar ordenação inteligente baseada no layout esperado
-        ordered_sections = get_ordered_sections()
-        if ordered_sections:
-            st.markdown("---")
-            
-            # Usar alimentos da instância fixa (já obtidos acima)
-            for section_id in ordered_sections:
-                if section_id in SECTIONS_REGISTRY:
-                    section = SECTIONS_REGISTRY[section_id]
-                    section["render"](data1, data2, current_food1, current_food2)
-                else:
-                    st.warning(f"Seção '{section_id}' não encontrada")
+        sections_panel(data1, data2, label1, label2)
     
     elif food1 == food2 and food1 != '':
         st.warning("Por favor, selecione alimentos diferentes para comparação.")
@@ -227,4 +201,8 @@ def main():
         clear_fixed_instance()
 
 if __name__ == "__main__":
-    main()
+    # Instrumentação opcional (APP_PROFILING=1): perfil do rerun na barra lateral e no log JSONL
+    with profile_rerun() as profile:
+        main()
+    if profile is not None:
+        profiling_sidebar(profile)
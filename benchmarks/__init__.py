@@ -0,0 +1,3 @@
+"""
+Micro-benchmarks das funções críticas da aplicação (executar com python -m benchmarks.<modulo>)
+"""
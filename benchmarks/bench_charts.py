@@ -0,0 +1,98 @@
+"""
+Micro-benchmark dos gráficos comparativos: construção da figura e tamanho do JSON.
+
+Compara o layout antigo (um trace por nutriente por alimento) com os
+construtores atuais (um trace por alimento, x/y/text em arrays).
+
+Uso:
+    python -m benchmarks.bench_charts [repeticoes]
+"""
+
+import sys
+import time
+
+import numpy as np
+import plotly.graph_objects as go
+
+from config.settings import CHART_HEIGHT_SMALL
+from data.loader import load_store
+from domain.nutrients import get_protein_fractions, get_lipid_fractions, MICROS_BY_CATEGORY
+from logic.compute import clean_nutrient_data
+from domain.palette import get_slot_solid
+from ui.charts import bar_compare, bar_compare_aminoacidos, bar_compare_fractions
+
+def legacy_bar_compare(df1_row, df2_row, food1, food2, columns, decimals=1):
+    """
+    Réplica do construtor anterior: add_trace com uma barra por nutriente por alimento
+    """
+    nutrientes1 = clean_nutrient_data(df1_row, columns)
+    nutrientes2 = clean_nutrient_data(df2_row, columns)
+    fig = go.Figure()
+    for food, nutrientes, slot in ((food1, nutrientes1, 'left'), (food2, nutrientes2, 'right')):
+        for i, (label, valor) in enumerate(nutrientes.items()):
+            fig.add_trace(go.Bar(
+                name=food,
+                x=[label],
+                y=[valor],
+                text=[f"<b>{valor:.{decimals}f}</b>"],
+                textposition='auto',
+                marker_color=get_slot_solid(slot),
+                showlegend=(i == 0)
+            ))
+    valores = list(nutrientes1.values()) + list(nutrientes2.values())
+    fig.update_layout(
+        title=next(iter(nutrientes1 or nutrientes2)),
+        xaxis_title=None,
+        yaxis_title="Valor (g)",
+        yaxis=dict(range=[0, max(valores) * 1.1]),
+        height=CHART_HEIGHT_SMALL,
+        font=dict(family="Arial, sans-serif"),
+        showlegend=False
+    )
+    return fig
+
+def pick_foods(store, columns):
+    """
+    Escolhe os dois alimentos com mais dados nas colunas do benchmark
+    """
+    counts = (store.gather(range(len(store)), columns) > 0).sum(axis=1)
+    rows = np.argsort(-counts, kind='stable')[:2]
+    return [store.row(store.keys[r]) for r in rows]
+
+def measure(build, repeats):
+    """
+    Retorna (tempo médio de construção em ms, tamanho do JSON em bytes, número de traces)
+    """
+    fig = build()
+    start = time.perf_counter()
+    for _ in range(repeats):
+        fig = build()
+    elapsed_ms = (time.perf_counter() - start) * 1000 / repeats
+    return elapsed_ms, len(fig.to_json()), len(fig.data)
+
+def run(repeats=50):
+    """
+    Executa os cenários e retorna uma lista de resultados
+    """
+    store = load_store()
+    scenarios = [
+        ('aminoacidos', get_protein_fractions(), bar_compare_aminoacidos, 3),
+        ('fracoes_lipidios', get_lipid_fractions(), bar_compare_fractions, 3),
+        ('minerais', MICROS_BY_CATEGORY['Minerais'], bar_compare, 1)
+    ]
+
+    results = []
+    for name, mapping, builder, decimals in scenarios:
+        row1, row2 = pick_foods(store, list(mapping.values()))
+        food1, food2 = row1.label, row2.label
+        before = measure(lambda: legacy_bar_compare(row1, row2, food1, food2, mapping, decimals), repeats)
+        after = measure(lambda: builder(row1, row2, food1, food2, mapping, name, 'g'), repeats)
+        results.append({'cenario': name, 'antes': before, 'depois': after})
+    return results
+
+if __name__ == "__main__":
+    repeats = int(sys.argv[1]) if len(sys.argv) > 1 else 50
+    print(f"{'cenário':<18} {'traces':>13} {'build (ms)':>17} {'JSON (bytes)':>19}")
+    for result in run(repeats):
+        (t0, j0, n0), (t1, j1, n1) = result['antes'], result['depois']
+        print(f"{result['cenario']:<18} {n0:>5} → {n1:<5} {t0:>7.2f} → {t1:<7.2f} {j0:>8} → {j1:<8}")
@@ -0,0 +1,119 @@
+"""
+Tempo por interação com e sem reexecução parcial (st.fragment), medido com AppTest.
+
+"antes": a interação reexecuta o script inteiro (comportamento anterior aos
+fragmentos). "depois": apenas o fragmento que contém o widget é reexecutado.
+
+O AppTest sempre faz reexecuções completas ao interagir com widgets; para
+simular a reexecução de um fragmento, o RerunData do executor local recebe a
+fila de fragmentos (API interna do Streamlit, sujeita a mudanças).
+
+Uso:
+    python -m benchmarks.bench_fragments [repeticoes]
+"""
+
+import contextlib
+import functools
+import statistics
+import sys
+import time
+from pathlib import Path
+
+from streamlit.runtime.scriptrunner import RerunData
+from streamlit.testing.v1 import AppTest
+from streamlit.testing.v1 import local_script_runner
+
+APP_PATH = str(Path(__file__).resolve().parent.parent / "app.py")
+
+FOOD1 = 'Arroz, integral, cozido'
+FOOD2 = 'Feijão, jalo, cru'
+SECTION_KEYS = [
+    "btn_comparativos_macros", "btn_fracoes_macros", "btn_minerais", "btn_vitaminas_lipossoluveis",
+    "btn_complexo_b", "btn_precursores_vit_a", "btn_outras_vitaminas"
+]
+
+# Fragmentos de primeiro nível na ordem de registro em app.py
+FRAGMENT_ORDER = ['picker_left', 'picker_right', 'similar_left', 'similar_right', 'sections']
+
+@contextlib.contextmanager
+def fragment_scope(fragment_id):
+    """
+    Faz a próxima execução do AppTest reexecutar apenas o fragmento informado
+    """
+    local_script_runner.RerunData = functools.partial(
+        RerunData, fragment_id_queue=[fragment_id], is_fragment_scoped_rerun=True
+    )
+    try:
+        yield
+    finally:
+        local_script_runner.RerunData = RerunData
+
+def prepare_app():
+    """
+    Sessão com dois alimentos comparados e todas as seções abertas
+    """
+    at = AppTest.from_file(APP_PATH, default_timeout=60).run()
+    at.selectbox[0].select(FOOD1).run()
+    at.selectbox[1].select(FOOD2).run()
+    for key in SECTION_KEYS:
+        at.button(key=key).click().run()
+    return at
+
+def top_level_fragments(at):
+    """
+    Mapeia nome lógico → id dos fragmentos de primeiro nível registrados
+    """
+    storage = at._fragment_storage
+    ids = [fid for fid in storage._fragments if storage._parent_by_id.get(fid) is None]
+    ids.sort(key=lambda fid: storage._registration_sequence_by_id[fid])
+    return dict(zip(FRAGMENT_ORDER, ids))
+
+def interactions():
+    """
+    Interações medidas: (nome, fragmento, ação)
+    """
+    counter = iter(range(1_000_000))
+    toggle = lambda at: at.toggle(key="similar_same_group_left").set_value(
+        not at.toggle(key="similar_same_group_left").value
+    )
+    return [
+        ('chip (slot esquerdo)', 'picker_left', lambda at: at.button(key="chip:left:Leguminosa").click()),
+        ('busca (slot direito)', 'picker_right', lambda at: at.text_input(key="busca_right").input(f"arroz {next(counter) % 5}")),
+        ('toggle similares', 'similar_left', toggle),
+        ('seção (minerais)', 'sections', lambda at: at.button(key="btn_minerais").click())
+    ]
+
+def measure(repeats=8):
+    """
+    Retorna {interação: (mediana antes em ms, mediana depois em ms)}
+    """
+    at = prepare_app()
+
+    results = {}
+    for name, fragment, action in interactions():
+        before, after = [], []
+        at.run()
+        for _ in range(repeats):
+            element = action(at)
+            start = time.perf_counter()
+            element.run()
+            before.append((time.perf_counter() - start) * 1000)
+
+        for _ in range(repeats):
+            # Execução completa entre medições para a árvore refletir o estado atual
+            at.run()
+            fragments = top_level_fragments(at)
+            element = action(at)
+            with fragment_scope(fragments[fragment]):
+                start = time.perf_counter()
+                element.run()
+                after.append((time.perf_counter() - start) * 1000)
+
+        results[name] = (statistics.median(before), statistics.median(after))
+    return results
+
+if __name__ == "__main__":
+    repeats = int(sys.argv[1]) if len(sys.argv) > 1 else 8
+    print(f"{'interação':<22} {'antes (ms)':>11} {'depois (ms)':>12}")
+    for name, (before, after) in measure(repeats).items():
+        print(f"{name:<22} {before:>11.1f} {after:>12.1f}")
@@ -0,0 +1,208 @@
+"""
+Tempo das funções críticas sobre catálogos sintéticos de 2k, 50k e 1M alimentos.
+
+Para cada tamanho, o catálogo é gravado em CSV (mesmo esquema do dataset real)
+e cada função é executada repetidamente; o resultado (mediana, p95, mínimo)
+é gravado em JSON para comparação entre commits. Os construtores de gráficos
+são chamados sem o cache de figuras (função original, sem decoradores).
+
+Uso:
+    python -m benchmarks.bench_hot_paths [--sizes 2k 50k 1m] [--output arquivo.json]
+    python -m benchmarks.bench_hot_paths --compare antes.json depois.json
+"""
+
+import argparse
+import inspect
+import json
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from benchmarks.synthetic import CATALOG_SIZES, ROOT, load_base_catalog, write_catalog
+
+RESULTS_DIR = ROOT / "benchmarks" / "results"
+
+# Tempo mínimo de medição por função (s) e limites de repetições.
+# Funções lentas (ex.: carga de 1M linhas) param em MAX_TIME mesmo sem MIN_REPEATS amostras.
+MIN_TIME = 0.5
+MAX_TIME = 20.0
+MIN_REPEATS = 5
+MAX_REPEATS = 200
+
+def time_call(func, min_time=MIN_TIME, min_repeats=MIN_REPEATS, max_repeats=MAX_REPEATS, max_time=MAX_TIME):
+    """
+    Executa `func` até acumular `min_time` segundos (respeitando os limites de
+    repetições e o teto `max_time`) e retorna {median_ms, p95_ms, min_ms, repeats}
+    """
+    samples = []
+    total = 0.0
+    while len(samples) < max_repeats and (total < min_time or (len(samples) < min_repeats and total < max_time)):
+        start = time.perf_counter()
+        func()
+        elapsed = time.perf_counter() - start
+        samples.append(elapsed * 1000)
+        total += elapsed
+    samples = np.array(samples)
+    return {
+        'median_ms': round(float(np.median(samples)), 4),
+        'p95_ms': round(float(np.percentile(samples, 95)), 4),
+        'min_ms': round(float(samples.min()), 4),
+        'repeats': len(samples)
+    }
+
+def pick_rows(store):
+    """
+    Os dois alimentos com mais nutrientes preenchidos (gráficos e tabelas completos)
+    """
+    filled = (~np.isnan(store.matrix)).sum(axis=1)
+    rows = np.argsort(-filled, kind='stable')[:2]
+    return [store.row(store.keys[r]) for r in rows]
+
+def hot_paths(csv_path):
+    """
+    Lista (nome, função sem argumentos) das funções medidas para um catálogo.
+    Os estágios de carga rodam uma vez aqui para preparar as entradas das demais.
+    """
+    from data.loader import sanitize_data
+    from data.store import FoodStore
+    from domain.nutrients import (
+        get_complexo_b_mapping, get_lipid_fractions, get_macronutrients,
+        get_protein_fractions, MICROS_BY_CATEGORY
+    )
+    from logic.comparison import ComparisonResult, compute_sections
+    from logic.filters import get_food_names, row_by_food, row_view_by_food
+    from logic.tables import create_micronutrient_tables, paired_table
+    from ui import charts
+
+    raw = pd.read_csv(csv_path)
+    df = sanitize_data(raw)
+    store = FoodStore(df, version='bench')
+    store.warm()
+
+    row1, row2 = pick_rows(store)
+    food1, food2 = row1.label, row2.label
+    group = store.meta['grupo'][row1.index]
+    minerals = MICROS_BY_CATEGORY['Minerais']
+    multi_rows = np.linspace(0, len(store) - 1, 10).astype(np.intp)
+    multi_foods = [store.labels[r] for r in multi_rows]
+    grupo = df['grupo']
+    long_table = store.long_table
+
+    # Construtores sem o cache de figuras compartilhado (nem a instrumentação)
+    build = {name: inspect.unwrap(getattr(charts, name)) for name in (
+        'pie_macros', 'bar_single', 'bar_compare', 'bar_compare_multi',
+        'bar_compare_aminoacidos', 'bar_compare_fractions'
+    )}
+
+    return [
+        ('load_data.read_csv', lambda: pd.read_csv(csv_path)),
+        ('sanitize_data', lambda: sanitize_data(raw)),
+        ('FoodStore', lambda: FoodStore(df)),
+        ('FoodStore.warm', lambda: FoodStore(df).warm()),
+        ('get_food_names[df]', lambda: get_food_names(df, [group])),
+        ('get_food_names[store]', lambda: get_food_names(store, [group])),
+        ('row_by_food', lambda: row_by_food(df, row1.name)),
+        ('row_view_by_food', lambda: row_view_by_food(store, row1.key)),
+        ('top_foods[pandas]', lambda: df[grupo == group].nlargest(10, 'ferro_mg')[['alimento', 'ferro_mg']]),
+        ('top_foods[sql]', lambda: long_table.top_foods('ferro_mg', group, limit=10)),
+        ('paired_table', lambda: paired_table(row1, row2, minerals, food1, food2)),
+        ('paired_table[badges]', lambda: paired_table(row1, row2, minerals, food1, food2, badges=True)),
+        ('create_micronutrient_tables', lambda: create_micronutrient_tables(row1, row2, food1, food2)),
+        ('ComparisonResult[minerais]', lambda: ComparisonResult(row1, row2, food1, food2).micronutrient_table('Minerais')),
+        ('compute_sections', lambda: compute_sections((row1, row2))),
+        ('pie_macros', lambda: build['pie_macros'](row1, food1)),
+        ('bar_single', lambda: build['bar_single'](row1, "Macronutrientes", get_macronutrients(), "g")),
+        ('bar_compare', lambda: build['bar_compare'](row1, row2, food1, food2, minerals, "Minerais", "mg")),
+        ('bar_compare[complexo_b]', lambda: build['bar_compare'](row1, row2, food1, food2, get_complexo_b_mapping(), "Complexo B", "mg")),
+        ('bar_compare_multi', lambda: build['bar_compare_multi'](store, multi_rows, multi_foods, minerals, "Minerais", "mg")),
+        ('bar_compare_aminoacidos', lambda: build['bar_compare_aminoacidos'](row1, row2, food1, food2, get_protein_fractions(), "Aminoácidos", "g")),
+        ('bar_compare_fractions', lambda: build['bar_compare_fractions'](row1, row2, food1, food2, get_lipid_fractions(), "Frações lipídicas", "g"))
+    ]
+
+def git_commit():
+    """
+    Commit atual do repositório (ou None fora de um checkout git)
+    """
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT,
+            capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def run(sizes, min_time=MIN_TIME):
+    """
+    Mede todas as funções para cada tamanho de catálogo.
+
+    Returns:
+        Dicionário serializável com metadados do ambiente e {tamanho: {função: estatísticas}}
+    """
+    base = load_base_catalog()
+    results = {
+        'commit': git_commit(),
+        'created_at': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'numpy': np.__version__,
+        'pandas': pd.__version__,
+        'machine': platform.machine(),
+        'sizes': {}
+    }
+
+    with tempfile.TemporaryDirectory() as directory:
+        for label in sizes:
+            n_rows = CATALOG_SIZES[label]
+            csv_path = write_catalog(n_rows, directory, base=base)
+            timings = {}
+            for name, func in hot_paths(csv_path):
+                timings[name] = time_call(func, min_time=min_time)
+                print(f"  {label:>4} {name:<30} p50 {timings[name]['median_ms']:>10.3f} ms"
+                      f"  p95 {timings[name]['p95_ms']:>10.3f} ms", file=sys.stderr)
+            results['sizes'][label] = {'rows': n_rows, 'functions': timings}
+            csv_path.unlink()
+    return results
+
+def compare(before_path, after_path, metric='p95_ms'):
+    """
+    Imprime a razão depois/antes de cada função presente nos dois arquivos
+    """
+    before = json.loads(Path(before_path).read_text())
+    after = json.loads(Path(after_path).read_text())
+    print(f"{before.get('commit')} → {after.get('commit')} ({metric})")
+    print(f"{'tamanho':<8} {'função':<30} {'antes':>11} {'depois':>11} {'razão':>7}")
+    for label, size in after['sizes'].items():
+        previous = before['sizes'].get(label, {}).get('functions', {})
+        for name, stats in size['functions'].items():
+            if name not in previous:
+                continue
+            old, new = previous[name][metric], stats[metric]
+            ratio = new / old if old else float('nan')
+            print(f"{label:<8} {name:<30} {old:>11.3f} {new:>11.3f} {ratio:>6.2f}x")
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--sizes', nargs='+', choices=list(CATALOG_SIZES), default=list(CATALOG_SIZES))
+    parser.add_argument('--output', type=Path, help="arquivo JSON (padrão: benchmarks/results/hot_paths-<commit>.json)")
+    parser.add_argument('--min-time', type=float, default=MIN_TIME, help="segundos de medição por função")
+    parser.add_argument('--compare', nargs=2, metavar=('ANTES', 'DEPOIS'), help="compara dois arquivos de resultados")
+    args = parser.parse_args(argv)
+
+    if args.compare:
+        compare(*args.compare)
+        return
+
+    results = run(args.sizes, min_time=args.min_time)
+    output = args.output or RESULTS_DIR / f"hot_paths-{results['commit'] or 'local'}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(results, indent=2, ensure_ascii=False))
+    print(output)
+
+if __name__ == "__main__":
+    main()
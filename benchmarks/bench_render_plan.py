@@ -0,0 +1,81 @@
+"""
+Construção das figuras e tabelas de todas as seções: em série vs. no pool do planejador.
+
+Para cada tamanho de pool, os caches (figuras e ComparisonResult) são esvaziados
+e as tarefas de todas as seções (funções "plan" de SECTIONS_REGISTRY) são
+executadas; o tempo medido é o de parede até a última tarefa terminar.
+
+Uso:
+    python -m benchmarks.bench_render_plan [repeticoes] [--pools 1 2 4 8]
+"""
+
+import argparse
+import statistics
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from streamlit import config
+from streamlit.logger import set_log_level
+
+from data.loader import load_store
+from logic.comparison import clear_comparisons
+from ui.figure_cache import get_figure_cache
+from ui.sections import SECTIONS_REGISTRY
+
+def pick_rows(store):
+    """
+    Os dois alimentos com mais nutrientes preenchidos (todas as seções com gráficos)
+    """
+    filled = store.has_data(range(len(store)), store.columns).sum(axis=1)
+    first, second = filled.argsort(kind='stable')[::-1][:2]
+    return store.row(store.keys[first]), store.row(store.keys[second])
+
+def section_tasks(row1, row2):
+    food1, food2 = row1.label, row2.label
+    return [
+        task
+        for entry in SECTIONS_REGISTRY.values()
+        for task in entry['plan'](row1, row2, food1, food2).values()
+    ]
+
+def measure(row1, row2, pool_size, repeats):
+    """
+    Mediana (ms) do tempo de parede para construir todas as tarefas com `pool_size` threads
+    """
+    samples = []
+    with ThreadPoolExecutor(max_workers=pool_size) as pool:
+        for _ in range(repeats):
+            get_figure_cache().clear()
+            clear_comparisons()
+            start = time.perf_counter()
+            if pool_size <= 1:
+                for task in section_tasks(row1, row2):
+                    task.run()
+            else:
+                for future in [pool.submit(task.run) for task in section_tasks(row1, row2)]:
+                    future.result()
+            samples.append((time.perf_counter() - start) * 1000)
+    return statistics.median(samples)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('repeats', nargs='?', type=int, default=10)
+    parser.add_argument('--pools', nargs='+', type=int, default=[1, 2, 4, 8])
+    args = parser.parse_args(argv)
+
+    # Avisos de "missing ScriptRunContext" (cache_resource fora do servidor)
+    config.get_config_options()
+    set_log_level('error')
+
+    store = load_store()
+    row1, row2 = pick_rows(store)
+    print(f"{len(section_tasks(row1, row2))} tarefas ({row1.label} × {row2.label})")
+    baseline = None
+    print(f"{'threads':>7} {'mediana (ms)':>13} {'ganho':>7}")
+    for pool_size in args.pools:
+        elapsed = measure(row1, row2, pool_size, args.repeats)
+        baseline = baseline or elapsed
+        print(f"{pool_size:>7} {elapsed:>13.1f} {baseline / elapsed:>6.2f}x")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,132 @@
+"""
+Construções de tabelas pareadas por renderização das seções de micronutrientes.
+
+"antes": cada seção chamava create_micronutrient_tables, que monta as tabelas de
+todas as categorias e usa só uma. "depois": as seções leem a tabela da sua
+categoria no ComparisonResult do par, construída uma única vez e reaproveitada
+nos reruns seguintes.
+
+O tempo compara só o acesso às tabelas; a contagem por tabela vem da
+renderização real das cinco seções fora do servidor (modo "bare" do Streamlit:
+os elementos não são exibidos, mas o código de tabelas e gráficos é executado).
+
+Uso:
+    python -m benchmarks.bench_tables [repeticoes]
+"""
+
+import sys
+import time
+from collections import Counter
+from contextlib import contextmanager
+
+from streamlit import config
+from streamlit.logger import set_log_level
+
+from data.loader import load_store
+from logic import tables
+from logic.comparison import ComparisonResult, clear_comparisons, get_comparison
+from ui import sections
+
+# Seções de micronutrientes (a de Complexo B usa uma tabela própria)
+MICRO_SECTIONS = (
+    sections.render_minerais,
+    sections.render_vitaminas_lipossoluveis,
+    sections.render_complexo_b,
+    sections.render_precursores_vitamina_a,
+    sections.render_outras_vitaminas
+)
+
+@contextmanager
+def count_builds():
+    """
+    Conta as tabelas construídas durante o bloco: chamadas a paired_table (caminho
+    anterior) e a ComparisonResult._section_table (tabelas montadas do payload)
+    """
+    counter = Counter()
+    originals = (
+        (tables, 'paired_table', tables.paired_table),
+        (ComparisonResult, '_section_table', ComparisonResult._section_table)
+    )
+
+    def counting(original):
+        def counted(*args, **kwargs):
+            counter['tabelas'] += 1
+            return original(*args, **kwargs)
+        return counted
+
+    for owner, name, original in originals:
+        setattr(owner, name, counting(original))
+    try:
+        yield counter
+    finally:
+        for owner, name, original in originals:
+            setattr(owner, name, original)
+
+def legacy_render(row1, row2, food1, food2):
+    """
+    Construções de tabela do caminho anterior: todas as categorias em cada seção
+    de micronutrientes, mais a tabela do Complexo B
+    """
+    for badges in (True, False, False, False):
+        tables.create_micronutrient_tables(row1, row2, food1, food2, badges=badges)
+    tables.create_complexo_b_table(row1, row2, food1, food2, badges=True)
+
+def comparison_render(row1, row2, food1, food2):
+    """
+    Acesso às tabelas como as seções fazem hoje (ComparisonResult compartilhado)
+    """
+    comparison = get_comparison(row1, row2, food1, food2)
+    comparison.micronutrient_table('Minerais', badges=True)
+    comparison.micronutrient_table('Vitaminas Lipossolúveis')
+    comparison.complexo_b_table(badges=True)
+    comparison.micronutrient_table('Precursores da Vitamina A')
+    comparison.micronutrient_table('Outras Vitaminas')
+
+def render_sections(row1, row2, food1, food2, reruns=2):
+    """
+    Renderiza as seções `reruns` vezes e retorna as construções por tabela do par
+    """
+    clear_comparisons()
+    for _ in range(reruns):
+        for section in MICRO_SECTIONS:
+            section(row1, row2, food1, food2)
+    return get_comparison(row1, row2, food1, food2).builds
+
+def measure(func, repeats):
+    """
+    Retorna (construções na primeira execução, construções por execução seguinte, ms por execução)
+    """
+    with count_builds() as counter:
+        func()
+        first = counter['tabelas']
+        start = time.perf_counter()
+        for _ in range(repeats):
+            func()
+        elapsed_ms = (time.perf_counter() - start) * 1000 / repeats
+        following = (counter['tabelas'] - first) / repeats
+    return first, following, elapsed_ms
+
+def run(repeats=20):
+    store = load_store()
+    row1, row2 = store.row(store.keys[0]), store.row(store.keys[1])
+    food1, food2 = row1.label, row2.label
+
+    clear_comparisons()
+    before = measure(lambda: legacy_render(row1, row2, food1, food2), repeats)
+    clear_comparisons()
+    after = measure(lambda: comparison_render(row1, row2, food1, food2), repeats)
+    return before, after, render_sections(row1, row2, food1, food2)
+
+if __name__ == "__main__":
+    # Avisos de "missing ScriptRunContext" a cada elemento fora do servidor; a
+    # configuração é lida antes, pois sua leitura redefine o nível dos loggers
+    config.get_config_options()
+    set_log_level('error')
+    repeats = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+    before, after, builds = run(repeats)
+    print(f"{'':<8} {'1ª renderização':>16} {'reruns':>8} {'ms/rerun':>10}")
+    for name, (first, following, elapsed) in (('antes', before), ('depois', after)):
+        print(f"{name:<8} {first:>16} {following:>8.0f} {elapsed:>10.2f}")
+    print("construções no ComparisonResult do par (seções renderizadas duas vezes):")
+    for name, count in builds.items():
+        print(f"  {name}: {count}")
@@ -0,0 +1,217 @@
+"""
+Carga headless: várias sessões simultâneas do app.py via AppTest, em threads.
+
+Cada sessão executa uma jornada roteirizada (carga inicial, chips de grupo,
+escolha dos dois alimentos e abertura de todas as seções de SECTIONS_CONFIG).
+Os recursos compartilhados (st.cache_resource: dataset, FoodStore, cache de
+figuras) são comuns a todas as sessões, como em um worker real. Tudo roda
+localmente, sem servidor nem rede.
+
+Relatório: percentis de latência por etapa, RSS de pico do processo e tamanho
+do session_state (pickle) ao fim de cada jornada.
+
+Uso:
+    python -m benchmarks.load_harness [--sessions 32] [--concurrency 8] [--output arquivo.json]
+"""
+
+import argparse
+import json
+import pickle
+import random
+import resource
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from unittest.mock import MagicMock
+
+import numpy as np
+from streamlit import config
+from streamlit.runtime import Runtime
+from streamlit.runtime.caching.storage.dummy_cache_storage import MemoryCacheStorageManager
+from streamlit.runtime.media_file_manager import MediaFileManager
+from streamlit.runtime.memory_media_file_storage import MemoryMediaFileStorage
+from streamlit.testing.v1 import AppTest
+
+from config.settings import SECTIONS_CONFIG
+from ui.state import StateKeys
+
+APP_PATH = str(Path(__file__).resolve().parent.parent / "app.py")
+
+# Teclas das seções na ordem de SECTIONS_CONFIG
+SECTION_KEYS = [section['key'] for category in SECTIONS_CONFIG.values() for section in category.values()]
+
+# Percentis reportados por etapa
+PERCENTILES = (50, 90, 95, 99)
+
+def peak_rss_bytes():
+    """
+    RSS de pico do processo (ru_maxrss é KB no Linux e bytes no macOS)
+    """
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == 'darwin' else peak * 1024
+
+def session_state_bytes(at):
+    """
+    Tamanho serializado (pickle) das chaves do session_state; valores não
+    serializáveis contam pelo sys.getsizeof
+    """
+    total = 0
+    for _, value in at.session_state.items():
+        try:
+            total += len(pickle.dumps(value))
+        except Exception:
+            total += sys.getsizeof(value)
+    return total
+
+def pin_runtime():
+    """
+    O AppTest instala um Runtime simulado global no início de cada execução e o
+    remove ao final; com sessões em threads, o fim de uma execução apagaria o
+    runtime de outra ainda em andamento. Instala um runtime simulado de reserva
+    para esses intervalos (API interna do Streamlit, sujeita a mudanças).
+    """
+    fallback = MagicMock(spec=Runtime)
+    fallback.media_file_mgr = MediaFileManager(MemoryMediaFileStorage("/mock/media"))
+    fallback.cache_storage_manager = MemoryCacheStorageManager()
+    Runtime.instance = classmethod(lambda cls: cls._instance or fallback)
+    Runtime.exists = classmethod(lambda cls: True)
+    # Cada execução restaura a opção ao terminar; com o valor global já ativo,
+    # uma sessão terminando não a desliga para as demais
+    config.set_option("global.appTest", True)
+
+class Journey:
+    """
+    Jornada roteirizada de um usuário; registra a latência de cada etapa
+    """
+
+    def __init__(self, seed, timeout=120):
+        self.rng = random.Random(seed)
+        self.at = AppTest.from_file(APP_PATH, default_timeout=timeout)
+        self.timings = []
+
+    def step(self, name, action):
+        start = time.perf_counter()
+        action()
+        self.timings.append((name, (time.perf_counter() - start) * 1000))
+        if self.at.exception:
+            raise RuntimeError(f"{name}: {self.at.exception[0].message}")
+
+    def toggle_chips(self, slot, count):
+        prefix = StateKeys.get_chip_key(slot, '')
+        chips = [b.key for b in self.at.button if b.key and b.key.startswith(prefix)]
+        for key in self.rng.sample(chips, min(count, len(chips))):
+            self.step('chip', lambda: self.at.button(key=key).click().run())
+
+    def pick_food(self, key, other_key):
+        # As opções exibidas são rótulos; o valor selecionado (chave) vem do índice
+        options = [o for o in self.at.selectbox(key=key).options if o]
+        other_box = self.at.selectbox(key=other_key)
+        other = other_box.options[other_box.index] if other_box.value else None
+        choice = self.rng.choice([o for o in options if o != other] or options)
+        self.step('alimento', lambda: self.at.selectbox(key=key).select_index(
+            self.at.selectbox(key=key).options.index(choice)
+        ).run())
+
+    def run(self):
+        self.step('carga', self.at.run)
+        self.toggle_chips('left', 2)
+        self.toggle_chips('right', 1)
+        # Com os chips ativos, as listas ficam restritas aos grupos escolhidos
+        self.pick_food(StateKeys.ALIMENTO_1, StateKeys.ALIMENTO_2)
+        self.pick_food(StateKeys.ALIMENTO_2, StateKeys.ALIMENTO_1)
+        for key in SECTION_KEYS:
+            self.step('seção', lambda: self.at.button(key=key).click().run())
+        self.step('rerun', self.at.run)
+        return self.timings, session_state_bytes(self.at)
+
+def summarize(samples):
+    """
+    {n, média e percentis em ms} de uma lista de latências
+    """
+    values = np.array(samples)
+    summary = {'n': len(values), 'mean_ms': round(float(values.mean()), 2)}
+    for p in PERCENTILES:
+        summary[f'p{p}_ms'] = round(float(np.percentile(values, p)), 2)
+    return summary
+
+def run(sessions=32, concurrency=8, seed=0):
+    """
+    Executa `sessions` jornadas com até `concurrency` sessões simultâneas.
+
+    Returns:
+        Dicionário com latências por etapa, RSS de pico, tamanho do session_state e falhas
+    """
+    pin_runtime()
+
+    # Primeira sessão fora da medição: carrega o dataset e aquece os índices compartilhados
+    Journey(seed - 1).run()
+    rss_before = peak_rss_bytes()
+
+    by_step = {}
+    state_sizes = []
+    failures = []
+    lock = threading.Lock()
+
+    def worker(i):
+        try:
+            timings, state_size = Journey(seed + i).run()
+        except Exception as exc:
+            with lock:
+                failures.append(f"sessão {i}: {exc}")
+            return
+        with lock:
+            for name, elapsed in timings:
+                by_step.setdefault(name, []).append(elapsed)
+            by_step.setdefault('jornada', []).append(sum(elapsed for _, elapsed in timings))
+            state_sizes.append(state_size)
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        list(pool.map(worker, range(sessions)))
+    wall = time.perf_counter() - start
+
+    return {
+        'sessions': sessions,
+        'concurrency': concurrency,
+        'wall_s': round(wall, 2),
+        'steps': {name: summarize(samples) for name, samples in by_step.items()},
+        'peak_rss_mb': round(peak_rss_bytes() / 2**20, 1),
+        'peak_rss_growth_mb': round((peak_rss_bytes() - rss_before) / 2**20, 1),
+        'session_state_bytes': {
+            'mean': int(np.mean(state_sizes)) if state_sizes else 0,
+            'max': int(max(state_sizes)) if state_sizes else 0
+        },
+        'failures': failures
+    }
+
+def report(results):
+    print(f"{results['sessions']} sessões, {results['concurrency']} simultâneas, {results['wall_s']:.1f} s")
+    header = ' '.join(f"{f'p{p} (ms)':>10}" for p in PERCENTILES)
+    print(f"{'etapa':<10} {'n':>5} {header}")
+    for name, summary in results['steps'].items():
+        values = ' '.join(f"{summary[f'p{p}_ms']:>10.1f}" for p in PERCENTILES)
+        print(f"{name:<10} {summary['n']:>5} {values}")
+    print(f"RSS de pico: {results['peak_rss_mb']} MB (+{results['peak_rss_growth_mb']} MB durante a carga)")
+    sizes = results['session_state_bytes']
+    print(f"session_state: média {sizes['mean']} bytes, máximo {sizes['max']} bytes")
+    for failure in results['failures']:
+        print(f"falha: {failure}")
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--sessions', type=int, default=32)
+    parser.add_argument('--concurrency', type=int, default=8)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', type=Path, help="grava o resultado em JSON")
+    args = parser.parse_args(argv)
+
+    results = run(args.sessions, args.concurrency, args.seed)
+    report(results)
+    if args.output:
+        args.output.parent.mkdir(parents=True, exist_ok=True)
+        args.output.write_text(json.dumps(results, indent=2, ensure_ascii=False))
+
+if __name__ == "__main__":
+    main()
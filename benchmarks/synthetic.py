@@ -0,0 +1,81 @@
+"""
+Catálogos sintéticos com o mesmo esquema de taco_usda_normalizado.csv.
+
+As linhas são reamostradas do catálogo real (mantendo grupo, fonte e o padrão
+de nutrientes ausentes de cada alimento) e os valores numéricos recebem ruído
+multiplicativo, de modo que a distribuição se pareça com a do dataset real.
+"""
+
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from config.settings import DATA_FILE_PATH
+
+ROOT = Path(__file__).resolve().parent.parent
+
+# Tamanhos padrão dos catálogos (número de alimentos)
+CATALOG_SIZES = {'2k': 2_000, '50k': 50_000, '1m': 1_000_000}
+
+# Desvio do ruído log-normal aplicado aos nutrientes
+NOISE_SIGMA = 0.15
+
+# Colunas que não recebem ruído
+_FIXED_COLUMNS = {'alimento_id'}
+
+def load_base_catalog():
+    """
+    CSV real usado como modelo do esquema e das distribuições
+    """
+    return pd.read_csv(ROOT / DATA_FILE_PATH)
+
+def make_catalog(n_rows, base=None, seed=0):
+    """
+    Gera um DataFrame bruto (como lido do CSV) com `n_rows` alimentos.
+
+    Args:
+        n_rows: Número de alimentos do catálogo
+        base: DataFrame modelo (padrão: CSV real)
+        seed: Semente do gerador
+
+    Returns:
+        DataFrame com as mesmas colunas e dtypes do CSV, nomes únicos e
+        alimento_id sequencial
+    """
+    if base is None:
+        base = load_base_catalog()
+    rng = np.random.default_rng(seed)
+    sample = rng.integers(0, len(base), size=n_rows)
+
+    columns = {}
+    for col in base.columns:
+        values = base[col].to_numpy()[sample]
+        if col in _FIXED_COLUMNS:
+            continue
+        if pd.api.types.is_float_dtype(base[col]):
+            noise = rng.lognormal(0.0, NOISE_SIGMA, size=n_rows)
+            values = values * noise
+        columns[col] = values
+
+    if 'alimento' in columns:
+        # Os primeiros len(base) alimentos mantêm o nome; os demais recebem sufixo
+        names = columns['alimento'].astype(object)
+        copy = np.arange(n_rows) // max(len(base), 1)
+        suffixed = copy > 0
+        names[suffixed] = [f"{name} #{c}" for name, c in zip(names[suffixed], copy[suffixed])]
+        columns['alimento'] = names
+    if 'alimento_id' in base.columns:
+        columns['alimento_id'] = np.arange(1, n_rows + 1)
+
+    return pd.DataFrame(columns, columns=list(base.columns))
+
+def write_catalog(n_rows, directory, base=None, seed=0):
+    """
+    Grava o catálogo sintético em CSV e retorna o caminho
+    """
+    directory = Path(directory)
+    directory.mkdir(parents=True, exist_ok=True)
+    path = directory / f"catalogo_{n_rows}.csv"
+    make_catalog(n_rows, base=base, seed=seed).to_csv(path, index=False)
+    return path
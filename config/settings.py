@@ -2,6 +2,7 @@
 Configurações da aplicação Streamlit
 """
 
+import os
 import streamlit as st
 
 def configure_page():
@@ -18,6 +19,22 @@ def configure_page():
 # Caminho do arquivo de dados
 DATA_FILE_PATH = "assets/taco_usda_normalizado.csv"
 
+# Diretório dos snapshots colunares (gerados a partir do CSV, versionados por hash)
+SNAPSHOT_DIR = "assets/.snapshot"
+
+# Modelo da visão longa (UNPIVOT) executado localmente em SQLite (data/long_table.py)
+SQL_MODEL_PATH = "assets/modelo view.sql"
+
+# Recarga a quente do dataset (thread observa o arquivo e troca a versão em segundo plano)
+DATA_HOT_RELOAD = True
+DATA_RELOAD_INTERVAL_SECONDS = 5.0
+
+# Instrumentação por rerun (tempo, chamadas e memória): ativar com APP_PROFILING=1
+PROFILING_ENABLED = os.environ.get("APP_PROFILING", "") == "1"
+PROFILING_LOG_PATH = "logs/profiling.jsonl"
+PROFILING_LOG_MAX_BYTES = 5 * 1024 * 1024
+PROFILING_LOG_BACKUPS = 3
+
 # Configurações de visualização
 CHART_HEIGHT = 400
 CHART_HEIGHT_SMALL = 300
@@ -37,6 +54,43 @@ COLORS = {
     'alimento2': '#4ECDC4'
 }
 
+# Número máximo de resultados da busca por nome
+SEARCH_RESULT_LIMIT = 100
+
+# Número de alimentos exibidos no painel de similares
+SIMILAR_FOODS_K = 5
+
+# Número máximo de figuras no cache compartilhado entre sessões
+FIGURE_CACHE_SIZE = 512
+
+# Número máximo de comparações (par de alimentos com suas tabelas) em memória
+COMPARISON_CACHE_SIZE = 64
+
+# Threads que constroem em paralelo as figuras e tabelas das seções selecionadas
+# (APP_RENDER_POOL_SIZE; 0 ou 1 desativa o planejador e tudo é construído na thread do script).
+# Desativado por padrão: a construção das figuras Plotly é Python puro e disputa o GIL.
+# benchmarks/bench_render_plan.py (48 tarefas, mediana de 10): 338 ms em série,
+# 474/476/480 ms com 2/4/8 threads. Ative só se o benchmark mostrar ganho no servidor.
+RENDER_POOL_SIZE = int(os.environ.get("APP_RENDER_POOL_SIZE", "1"))
+
+# Espera máxima (s) pelas tarefas de uma seção no pool; ao expirar, a seção é
+# construída na thread do script
+RENDER_PLAN_TIMEOUT_SECONDS = float(os.environ.get("APP_RENDER_PLAN_TIMEOUT", "5"))
+
+# Limites da comparação múltipla (modo N alimentos)
+MULTI_COMPARE_MIN = 3
+MULTI_COMPARE_MAX = 10
+
+# Nutrientes com filtro por faixa na barra lateral {coluna: rótulo}
+RANGE_FILTERS = {
+    'energia_kcal': 'Energia (kcal)',
+    'proteina_g': 'Proteína (g)',
+    'carboidrato_g': 'Carboidratos (g)',
+    'lipideos_g': 'Lipídeos (g)',
+    'fibra_alimentar_g': 'Fibra alimentar (g)',
+    'sodio_mg': 'Sódio (mg)'
+}
+
 # Configurações de formatação
 NUMBER_FORMAT = {
     'decimal_places': 1,
@@ -52,13 +106,32 @@ UI_CONFIG = {
     'food2_label': 'Alimento 2',
     'select_food1_placeholder': 'Selecione o primeiro alimento:',
     'select_food2_placeholder': 'Selecione o segundo alimento:',
+    'search_label': 'Buscar alimento:',
+    'search_placeholder': 'Digite parte do nome (ex.: feijao, acucar)',
     'clear_button_text': 'Limpar',
     'filter_groups_text': 'Clique nos grupos para filtrar:',
     'sections_title': 'Seções Disponíveis',
     'sections_subtitle': 'Selecione as seções que deseja visualizar:',
     'macros_title': 'Macros',
     'micros_title': 'Micros',
-    'clear_all_sections_text': 'Limpar Todas as Seleções'
+    'clear_all_sections_text': 'Limpar Todas as Seleções',
+    'similar_title': 'Alimentos similares',
+    'similar_same_group': 'Apenas substitutos do mesmo grupo',
+    'similar_empty': 'Nenhum alimento com dados suficientes para comparação.',
+    'range_filters_title': 'Filtrar por nutrientes',
+    'range_filters_clear': 'Limpar filtros',
+    'range_filters_count': '{count} alimentos atendem aos filtros',
+    'percentile_badge': 'P{pct} em {grupo}',
+    'percentile_badge_global': 'P{pct} no catálogo',
+    'coverage_badge': '{food}: {filled}/{total} nutrientes com dados',
+    'compare_mode_label': 'Modo de comparação:',
+    'compare_mode_pair': 'Dois alimentos',
+    'compare_mode_multi': 'Vários alimentos (3 a 10)',
+    'multi_select_label': 'Selecione de 3 a 10 alimentos:',
+    'multi_select_hint': 'Selecione pelo menos 3 alimentos para a comparação múltipla.',
+    'profiling_title': '⏱️ Perfil do rerun',
+    'profiling_wall': 'Rerun completo: {ms:.1f} ms',
+    'profiling_cache': 'Cache de figuras: {hits} acertos, {misses} falhas ({rate:.0%}), {size}/{max_entries} entradas'
 }
 
 # Ordem fixa das seções no relatório (layout esperado)
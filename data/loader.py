@@ -2,46 +2,146 @@
 Centralização de cache e carregamento de dados
 """
 
+import numpy as np
 import streamlit as st
 import pandas as pd
-from config.settings import DATA_FILE_PATH
+from config.settings import DATA_FILE_PATH, DATA_HOT_RELOAD, DATA_RELOAD_INTERVAL_SECONDS
+from data.snapshot import ID_COLUMNS
+from data.watcher import DatasetWatcher
+from domain.groups import normalize_group_name
+from logic.profiling import profiled
 
-@st.cache_data(persist="disk")
+@st.cache_resource
+def get_dataset_watcher():
+    """
+    Observador do arquivo de dados, único por processo.
+    Carrega a primeira versão de forma síncrona e depois recarrega em segundo plano.
+    A cada troca, as comparações da versão anterior (que seguram a matriz antiga) são descartadas.
+    """
+    from logic.comparison import clear_comparisons
+    
+    return DatasetWatcher(
+        DATA_FILE_PATH,
+        sanitize_data,
+        interval=DATA_RELOAD_INTERVAL_SECONDS,
+        start=DATA_HOT_RELOAD,
+        on_swap=[lambda dataset: clear_comparisons(keep_version=dataset.version)]
+    )
+
+@profiled
+def get_dataset():
+    """
+    Retorna a versão atual do dataset (DataFrame + FoodStore + versão).
+    Deve ser chamada uma vez por rerun para que todo o script use a mesma versão.
+    """
+    return get_dataset_watcher().current
+
+@profiled
 def load_data():
     """
-    Carrega os dados do CSV com cache persistente em disco para melhor performance.
-    Ideal para CSVs grandes que mudam pouco.
+    Retorna o DataFrame saneado da versão atual do dataset.
+    O CSV só é parseado quando o hash do seu conteúdo muda; o DataFrame
+    resultante vem do snapshot (memory-map) e é compartilhado entre as sessões.
+    """
+    return get_dataset().df
+
+@profiled
+def load_store():
+    """
+    Retorna o FoodStore (matriz de nutrientes + índices) da versão atual do dataset,
+    construído uma única vez por versão e compartilhado por todas as sessões.
+    """
+    return get_dataset().store
+
+# Colunas de texto codificadas como categóricas no saneamento
+CATEGORICAL_COLUMNS = ['grupo', 'tabela_fonte', 'origem_animal']
+
+# Colunas lógicas (True/ausente) convertidas para o dtype booleano anulável
+BOOLEAN_COLUMNS = ['ivn']
+
+def _normalize_categorical(series, normalize=None):
+    """
+    Converte uma coluna de texto em categórica, aplicando a normalização
+    apenas sobre as categorias únicas (não sobre cada linha).
+    Categorias que normalizam para o mesmo nome são fundidas via remapeamento de códigos.
     """
-    df = pd.read_csv(DATA_FILE_PATH)
-    return sanitize_data(df)
+    cat = pd.Categorical(series)
+    categories = list(cat.categories)
+    
+    normalized = []
+    for category in categories:
+        value = normalize(category) if normalize else (category.strip() if isinstance(category, str) else category)
+        normalized.append(value if value not in ('', None) else None)
+    
+    new_categories = sorted({value for value in normalized if value is not None}, key=str)
+    position = {value: i for i, value in enumerate(new_categories)}
+    code_map = np.array([position.get(value, -1) for value in normalized] + [-1], dtype=np.int32)
+    
+    # Código -1 (ausente) mapeia para a última posição do code_map, que também é -1
+    codes = code_map[cat.codes]
+    return pd.Categorical.from_codes(codes, categories=new_categories)
 
+@profiled
 def sanitize_data(df):
     """
-    Aplica saneamento leve nos dados:
+    Aplica saneamento vetorizado nos dados, sem cópias intermediárias do DataFrame:
     - Remove espaços em branco desnecessários
-    - Normaliza nomes de grupos
+    - Normaliza nomes de grupos (capitalização + tabela de aliases)
+    - Codifica grupo/tabela_fonte/origem_animal como categóricas e ivn como booleano
+    - Reduz colunas numéricas para float32
     - Remove linhas com dados inválidos
     """
-    # Criar uma cópia para não modificar o original
-    df_clean = df.copy()
-    
-    # Limpar espaços em branco em colunas de texto
-    text_columns = ['alimento', 'grupo']
-    for col in text_columns:
-        if col in df_clean.columns:
-            df_clean[col] = df_clean[col].astype(str).str.strip()
+    columns = {}
+    for col in df.columns:
+        series = df[col]
+        if col == 'grupo':
+            columns[col] = _normalize_categorical(series, normalize_group_name)
+        elif col in CATEGORICAL_COLUMNS:
+            columns[col] = _normalize_categorical(series)
+        elif col in BOOLEAN_COLUMNS:
+            columns[col] = series.astype('boolean')
+        elif col == 'alimento':
+            columns[col] = series.str.strip() if pd.api.types.is_string_dtype(series) else series
+        elif pd.api.types.is_numeric_dtype(series) and not pd.api.types.is_bool_dtype(series) and col not in ID_COLUMNS:
+            # Inteiros também: a matriz do snapshot/FoodStore é float32
+            columns[col] = series.to_numpy(dtype=np.float32, na_value=np.nan)
+        else:
+            columns[col] = series.to_numpy()
     
-    # Normalizar nomes de grupos (primeira letra maiúscula, resto minúscula)
-    if 'grupo' in df_clean.columns:
-        df_clean['grupo'] = df_clean['grupo'].str.title()
+    # Remover linhas com dados inválidos (uma única máscara, uma única seleção)
+    valid = np.ones(len(df), dtype=bool)
+    if 'alimento' in columns:
+        alimento = columns['alimento']
+        valid &= alimento.notna().to_numpy() & (alimento != '').to_numpy()
+    if 'grupo' in columns:
+        valid &= columns['grupo'].codes >= 0
     
-    # Remover linhas com dados inválidos
-    df_clean = df_clean.dropna(subset=['alimento', 'grupo'])
-    df_clean = df_clean[df_clean['alimento'] != '']
-    df_clean = df_clean[df_clean['grupo'] != '']
+    df_clean = pd.DataFrame(columns, copy=False)
+    if not valid.all():
+        df_clean = df_clean[valid].reset_index(drop=True)
     
     return df_clean
 
+def get_memory_usage(df):
+    """
+    Retorna o uso de memória do DataFrame em bytes (incluindo objetos Python)
+    """
+    if df is None:
+        return 0
+    return int(df.memory_usage(deep=True).sum())
+
+def get_memory_report(df_raw, df_clean):
+    """
+    Compara o uso de memória antes e depois do saneamento
+    """
+    before = get_memory_usage(df_raw)
+    after = get_memory_usage(df_clean)
+    return {
+        'before_bytes': before,
+        'after_bytes': after,
+        'reduction_pct': (1 - after / before) * 100 if before else 0.0
+    }
+
 def get_food_data(df, food_name):
     """
     Retorna dados de um alimento específico
@@ -170,6 +270,7 @@ def get_data_info(df):
             'total_columns': 0,
             'groups_count': 0,
             'foods_count': 0,
+            'memory_bytes': 0,
             'columns': []
         }
     
@@ -178,6 +279,7 @@ def get_data_info(df):
         'total_columns': len(df.columns),
         'groups_count': len(get_groups(df)),
         'foods_count': len(df['alimento'].unique()) if 'alimento' in df.columns else 0,
+        'memory_bytes': get_memory_usage(df),
         'columns': list(df.columns)
     }
 
@@ -0,0 +1,182 @@
+"""
+Motor analítico local: a visão longa de `assets/modelo view.sql` materializada
+em SQLite em memória (sem rede, sem dependências além da biblioteca padrão).
+
+O UNPIVOT do modelo (BigQuery) é feito sobre a matriz do FoodStore; os rótulos,
+categorias e subcategorias vêm das expressões CASE do próprio arquivo SQL,
+executadas pelo SQLite. A tabela resultante tem uma linha por (alimento,
+nutriente) preenchido e índices em (nutriente, valor) e (categoria), de modo
+que consultas entre alimentos (ex.: maiores teores de ferro em um grupo) são
+buscas indexadas em vez de varreduras no DataFrame.
+"""
+
+import re
+import sqlite3
+import threading
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from config.settings import SQL_MODEL_PATH
+
+# Nome da tabela longa (mesmo papel da visão food_data_nutrients_long)
+LONG_TABLE = 'nutrientes_longo'
+
+# Colunas descritivas copiadas para cada linha da tabela longa
+_DESCRIPTIVE = ('tabela_fonte', 'alimento_id', 'alimento', 'grupo', 'ivn', 'origem_animal')
+
+class SQLModel:
+    """
+    Partes do modelo SQL usadas localmente: colunas do UNPIVOT e o SELECT final
+    (CASE de rótulos/categorias), já no dialeto aceito pelo SQLite
+    """
+
+    def __init__(self, text):
+        unpivot = re.search(r"UNPIVOT\s*\(\s*valor\s+FOR\s+nutriente\s+IN\s*\((.*?)\)\s*\)", text, re.S)
+        select = re.search(r"\)\s*SELECT\s+(.*?)\s+FROM\s+longo\s+(WHERE\s+.*?)\s*;", text, re.S)
+        if not unpivot or not select:
+            raise ValueError("Modelo SQL sem o UNPIVOT ou o SELECT final da visão longa")
+
+        self.nutrients = [col.strip() for col in unpivot.group(1).split(',') if col.strip()]
+        # A fonte fixa do modelo ('DIR') vira a tabela de origem de cada alimento
+        columns = re.sub(r"^'\w+'\s+AS\s+fonte\s*,", "tabela_fonte AS fonte,", select.group(1).strip())
+        self.select = f"SELECT linha, {columns} FROM longo {select.group(2)}"
+
+    @classmethod
+    def from_file(cls, path=SQL_MODEL_PATH):
+        return cls(Path(path).read_text(encoding='utf-8'))
+
+class LongTable:
+    """
+    Tabela longa (alimento × nutriente) em SQLite em memória, construída a
+    partir de um FoodStore. A coluna `linha` é a posição do alimento na matriz.
+    """
+
+    def __init__(self, store, model=None):
+        model = model or SQLModel.from_file()
+        self.version = store.version
+        self.nutrients = [col for col in model.nutrients if col in store.col_pos]
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(':memory:', check_same_thread=False)
+
+        with self._conn:
+            self._conn.execute(
+                "CREATE TEMP TABLE longo (linha INTEGER, tabela_fonte TEXT, alimento_id INTEGER, alimento TEXT, "
+                "grupo TEXT, ivn INTEGER, origem_animal TEXT, nutriente TEXT, valor REAL)"
+            )
+            self._conn.executemany("INSERT INTO longo VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)", self._unpivot(store))
+            self._conn.execute(f"CREATE TABLE {LONG_TABLE} AS {model.select}")
+            self._conn.execute("DROP TABLE longo")
+            self._conn.execute(f"CREATE INDEX idx_nutriente_valor ON {LONG_TABLE} (nutriente, valor)")
+            self._conn.execute(f"CREATE INDEX idx_categoria ON {LONG_TABLE} (categoria)")
+            self._conn.execute(f"ANALYZE {LONG_TABLE}")
+
+    def _unpivot(self, store):
+        """
+        Gera as linhas (alimento, nutriente, valor) não nulas, nutriente a nutriente
+        """
+        meta = [
+            [_plain(v) for v in store.meta[col]] if col in store.meta else [None] * len(store)
+            for col in _DESCRIPTIVE
+        ]
+        for nutrient in self.nutrients:
+            values = store.matrix[:, store.col_pos[nutrient]]
+            rows = np.flatnonzero(~np.isnan(values))
+            for row, value in zip(rows.tolist(), values[rows].astype(np.float64).tolist()):
+                yield (row, *(column[row] for column in meta), nutrient, value)
+
+    def __len__(self):
+        return self.execute(f"SELECT COUNT(*) FROM {LONG_TABLE}")[0][0]
+
+    def execute(self, sql, params=()):
+        """
+        Executa uma consulta e retorna a lista de tuplas
+        """
+        with self._lock:
+            return self._conn.execute(sql, params).fetchall()
+
+    def query(self, sql, params=()):
+        """
+        Executa uma consulta e retorna um DataFrame
+        """
+        with self._lock:
+            return pd.read_sql_query(sql, self._conn, params=params)
+
+    def explain(self, sql, params=()):
+        """
+        Plano de execução do SQLite (para conferir o uso dos índices)
+        """
+        return [row[-1] for row in self.execute(f"EXPLAIN QUERY PLAN {sql}", params)]
+
+    def top_foods(self, nutrient, group=None, limit=10, ascending=False):
+        """
+        Alimentos com maior (ou menor) teor de um nutriente, opcionalmente em um grupo.
+
+        Returns:
+            Lista de (linha, alimento, valor) ordenada pelo valor
+        """
+        order = 'ASC' if ascending else 'DESC'
+        sql = f"SELECT linha, alimento, valor FROM {LONG_TABLE} WHERE nutriente = ?"
+        params = [nutrient]
+        if group:
+            sql += " AND grupo = ?"
+            params.append(group)
+        sql += f" ORDER BY valor {order}, linha LIMIT ?"
+        params.append(int(limit))
+        return self.execute(sql, params)
+
+    def foods_in_range(self, nutrient, low=None, high=None, group=None):
+        """
+        Posições dos alimentos com o nutriente na faixa [low, high] (limites opcionais)
+        """
+        sql = f"SELECT linha FROM {LONG_TABLE} WHERE nutriente = ?"
+        params = [nutrient]
+        if low is not None:
+            sql += " AND valor >= ?"
+            params.append(float(low))
+        if high is not None:
+            sql += " AND valor <= ?"
+            params.append(float(high))
+        if group:
+            sql += " AND grupo = ?"
+            params.append(group)
+        rows = [row for (row,) in self.execute(sql, params)]
+        return np.array(sorted(rows), dtype=np.intp)
+
+    def category_profile(self, row, categoria):
+        """
+        Nutrientes de uma categoria do modelo (ex.: 'Micronutriente - Mineral') para um alimento
+
+        Returns:
+            Lista de (nutriente, nutriente_label, valor)
+        """
+        return self.execute(
+            f"SELECT nutriente, nutriente_label, valor FROM {LONG_TABLE} WHERE categoria = ? AND linha = ?",
+            (categoria, int(row))
+        )
+
+    def group_stats(self, nutrient):
+        """
+        Contagem, média e máximo de um nutriente por grupo
+
+        Returns:
+            DataFrame (grupo, alimentos, media, maximo), do maior para o menor teor médio
+        """
+        return self.query(
+            f"SELECT grupo, COUNT(*) AS alimentos, AVG(valor) AS media, MAX(valor) AS maximo "
+            f"FROM {LONG_TABLE} WHERE nutriente = ? GROUP BY grupo ORDER BY media DESC",
+            (nutrient,)
+        )
+
+def _plain(value):
+    """
+    Converte metadados (numpy, pandas NA, booleanos) em tipos aceitos pelo sqlite3
+    """
+    if value is None or value is pd.NA or (isinstance(value, float) and value != value):
+        return None
+    if isinstance(value, (bool, np.bool_)):
+        return int(value)
+    if isinstance(value, np.generic):
+        return value.item()
+    return value
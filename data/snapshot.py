@@ -0,0 +1,235 @@
+"""
+Snapshot colunar versionado da tabela de alimentos.
+
+O CSV é parseado e saneado uma única vez; o resultado é gravado em arquivos
+.npy (matriz float32 de nutrientes + códigos categóricos) dentro de um
+diretório identificado pelo hash do conteúdo do CSV. Nas inicializações
+seguintes o snapshot é aberto com memory-map, sem parse de texto.
+
+Uso como etapa de build:
+    python -m data.snapshot [caminho_do_csv]
+"""
+
+import hashlib
+import json
+import os
+import shutil
+import sys
+import tempfile
+
+import numpy as np
+import pandas as pd
+
+from config.settings import DATA_FILE_PATH, SNAPSHOT_DIR
+
+# Incrementar sempre que o layout do snapshot ou o saneamento mudar
+SNAPSHOT_FORMAT_VERSION = 3
+
+# Colunas numéricas que não entram na matriz float32 (identificadores)
+ID_COLUMNS = ['alimento_id']
+
+MATRIX_FILE = 'nutrientes.npy'
+META_FILE = 'meta.json'
+
+def file_content_hash(file_path, chunk_size=1 << 20):
+    """
+    Calcula o hash SHA-256 do conteúdo de um arquivo
+    """
+    digest = hashlib.sha256()
+    with open(file_path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def snapshot_dir_for(content_hash, base_dir=SNAPSHOT_DIR):
+    """
+    Retorna o diretório do snapshot correspondente a um hash de conteúdo
+    """
+    return os.path.join(base_dir, f"v{SNAPSHOT_FORMAT_VERSION}-{content_hash[:16]}")
+
+def _column_kind(series):
+    """
+    Classifica uma coluna do DataFrame saneado para fins de armazenamento
+    """
+    if series.name in ID_COLUMNS:
+        return 'id'
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        return 'category'
+    if pd.api.types.is_bool_dtype(series):
+        return 'bool'
+    if pd.api.types.is_numeric_dtype(series) and not pd.api.types.is_bool_dtype(series):
+        return 'numeric'
+    non_null = series.dropna()
+    if len(non_null) and non_null.map(lambda v: isinstance(v, (bool, np.bool_))).all():
+        return 'bool'
+    return 'text'
+
+def write_snapshot(df, directory, content_hash, source_path=None):
+    """
+    Grava o DataFrame saneado como snapshot colunar.
+    A escrita é feita em diretório temporário e renomeada ao final (atômica).
+
+    Args:
+        df: DataFrame já saneado
+        directory: Diretório de destino do snapshot
+        content_hash: Hash do CSV de origem
+        source_path: Caminho do CSV de origem (apenas informativo)
+    """
+    parent = os.path.dirname(directory) or '.'
+    os.makedirs(parent, exist_ok=True)
+    tmp_dir = tempfile.mkdtemp(prefix='.tmp-', dir=parent)
+
+    try:
+        columns = []
+        numeric_cols = []
+        categories = {}
+
+        for col in df.columns:
+            kind = _column_kind(df[col])
+            columns.append({'name': col, 'kind': kind})
+
+            if kind == 'numeric':
+                numeric_cols.append(col)
+            elif kind == 'id':
+                # Mantém o dtype do saneamento (int64 sem ausentes, float64 com NaN)
+                values = df[col].to_numpy()
+                if values.dtype.kind not in 'iuf':
+                    values = df[col].to_numpy(dtype=np.float64, na_value=np.nan)
+                np.save(os.path.join(tmp_dir, f"{col}.npy"), values)
+            elif kind == 'category':
+                cat = df[col].astype('category')
+                categories[col] = [str(c) for c in cat.cat.categories]
+                np.save(os.path.join(tmp_dir, f"{col}.codes.npy"), cat.cat.codes.to_numpy(dtype=np.int32))
+            elif kind == 'bool':
+                # -1 representa ausente
+                values = df[col].map({True: 1, False: 0}).fillna(-1)
+                np.save(os.path.join(tmp_dir, f"{col}.npy"), values.to_numpy(dtype=np.int8))
+            else:
+                nulls = df[col].isna().to_numpy()
+                values = df[col].fillna('').astype(str).to_numpy(dtype=str)
+                np.save(os.path.join(tmp_dir, f"{col}.npy"), values)
+                np.save(os.path.join(tmp_dir, f"{col}.nulls.npy"), nulls)
+
+        # Matriz de nutrientes contígua (linhas = alimentos)
+        matrix = np.ascontiguousarray(df[numeric_cols].to_numpy(dtype=np.float32, na_value=np.nan))
+        np.save(os.path.join(tmp_dir, MATRIX_FILE), matrix)
+
+        meta = {
+            'format_version': SNAPSHOT_FORMAT_VERSION,
+            'content_hash': content_hash,
+            'source_path': source_path,
+            'rows': int(len(df)),
+            'columns': columns,
+            'numeric_columns': numeric_cols,
+            'categories': categories
+        }
+        with open(os.path.join(tmp_dir, META_FILE), 'w', encoding='utf-8') as f:
+            json.dump(meta, f, ensure_ascii=False)
+
+        if os.path.isdir(directory):
+            shutil.rmtree(directory)
+        os.replace(tmp_dir, directory)
+    except BaseException:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+        raise
+
+def read_snapshot(directory, mmap=True):
+    """
+    Lê um snapshot colunar e reconstrói o DataFrame.
+    A matriz de nutrientes é mapeada em memória (sem cópia).
+
+    Returns:
+        DataFrame com as mesmas colunas (na mesma ordem) e dtypes do DataFrame saneado
+    """
+    with open(os.path.join(directory, META_FILE), 'r', encoding='utf-8') as f:
+        meta = json.load(f)
+
+    if meta.get('format_version') != SNAPSHOT_FORMAT_VERSION:
+        raise ValueError(f"Versão de snapshot incompatível: {meta.get('format_version')}")
+
+    mmap_mode = 'r' if mmap else None
+    matrix = np.load(os.path.join(directory, MATRIX_FILE), mmap_mode=mmap_mode)
+
+    other = {}
+    for column in meta['columns']:
+        name, kind = column['name'], column['kind']
+        if kind == 'numeric':
+            continue
+        if kind == 'id':
+            other[name] = np.load(os.path.join(directory, f"{name}.npy"), mmap_mode=mmap_mode)
+        elif kind == 'category':
+            codes = np.load(os.path.join(directory, f"{name}.codes.npy"), mmap_mode=mmap_mode)
+            other[name] = pd.Categorical.from_codes(codes, categories=meta['categories'][name])
+        elif kind == 'bool':
+            raw = np.load(os.path.join(directory, f"{name}.npy"))
+            other[name] = pd.array(np.where(raw < 0, None, raw == 1), dtype='boolean')
+        else:
+            values = np.load(os.path.join(directory, f"{name}.npy")).astype(object)
+            nulls = np.load(os.path.join(directory, f"{name}.nulls.npy"))
+            values[nulls] = np.nan
+            other[name] = values
+
+    # Matriz entra como um único bloco float32, sem cópia
+    numeric_df = pd.DataFrame(matrix, columns=meta['numeric_columns'], copy=False)
+    other_df = pd.DataFrame(other, columns=[c['name'] for c in meta['columns'] if c['kind'] != 'numeric'])
+
+    df = pd.concat([other_df, numeric_df], axis=1)
+    # Ordem original das colunas (só reordena, com cópia, se o CSV intercalar colunas)
+    names = [c['name'] for c in meta['columns']]
+    if list(df.columns) != names:
+        df = df[names]
+    return df
+
+def load_or_build_snapshot(csv_path, sanitize, base_dir=SNAPSHOT_DIR):
+    """
+    Retorna o DataFrame a partir do snapshot correspondente ao conteúdo atual do CSV.
+    Se o hash mudou (ou não há snapshot), faz o parse do CSV, aplica o saneamento
+    e grava um novo snapshot antes de lê-lo com memory-map.
+
+    Args:
+        csv_path: Caminho do CSV de origem
+        sanitize: Função de saneamento aplicada ao DataFrame bruto
+        base_dir: Diretório base dos snapshots
+
+    Returns:
+        tuple: (DataFrame, hash do conteúdo)
+    """
+    content_hash = file_content_hash(csv_path)
+    directory = snapshot_dir_for(content_hash, base_dir)
+
+    if os.path.isfile(os.path.join(directory, META_FILE)):
+        try:
+            return read_snapshot(directory), content_hash
+        except (OSError, ValueError, KeyError):
+            # Snapshot corrompido ou incompatível: reconstruir
+            pass
+
+    df = sanitize(pd.read_csv(csv_path))
+    try:
+        write_snapshot(df, directory, content_hash, source_path=csv_path)
+    except OSError:
+        # Sistema de arquivos somente leitura: seguir com o CSV parseado
+        return df, content_hash
+
+    return read_snapshot(directory), content_hash
+
+def build_snapshot(csv_path=DATA_FILE_PATH, base_dir=SNAPSHOT_DIR):
+    """
+    Etapa de build: gera (ou regenera) o snapshot do CSV informado
+    """
+    from data.loader import sanitize_data, get_memory_report
+
+    content_hash = file_content_hash(csv_path)
+    directory = snapshot_dir_for(content_hash, base_dir)
+    df_raw = pd.read_csv(csv_path)
+    df = sanitize_data(df_raw)
+    write_snapshot(df, directory, content_hash, source_path=csv_path)
+    return directory, get_memory_report(df_raw, df)
+
+if __name__ == "__main__":
+    path = sys.argv[1] if len(sys.argv) > 1 else DATA_FILE_PATH
+    directory, report = build_snapshot(path)
+    print(f"Snapshot gerado em: {directory}")
+    print(f"Memória antes do saneamento: {report['before_bytes'] / 1e6:.2f} MB")
+    print(f"Memória depois do saneamento: {report['after_bytes'] / 1e6:.2f} MB "
+          f"(-{report['reduction_pct']:.1f}%)")
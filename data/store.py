@@ -0,0 +1,395 @@
+"""
+Estrutura de dados central: matriz densa de nutrientes com índices O(1)
+"""
+
+import numpy as np
+import pandas as pd
+from collections import Counter
+from functools import cached_property
+from domain.nutrients import NUTRIENT_UNITS, NutrientIndex, presence_words
+
+# Colunas descritivas mantidas ao lado da matriz (uma entrada por alimento)
+META_COLUMNS = ['alimento', 'grupo', 'tabela_fonte', 'alimento_id']
+
+# Linhas processadas por vez ao montar a bitmask de presença (limita o array booleano temporário)
+_PRESENCE_CHUNK = 65_536
+
+def presence_bitmask(matrix):
+    """
+    Bitmask de presença: o bit j da linha i fica ligado se a coluna j tem valor > 0
+    (ausentes, nulos e negativos ficam desligados).
+
+    Returns:
+        np.ndarray uint64 com shape (linhas, presence_words(colunas))
+    """
+    n_rows, n_cols = matrix.shape
+    words = presence_words(n_cols)
+    result = np.empty((n_rows, words), dtype='<u8')
+    bits = np.zeros((min(n_rows, _PRESENCE_CHUNK), words * 64), dtype=bool)
+    for start in range(0, n_rows, _PRESENCE_CHUNK):
+        chunk = matrix[start:start + _PRESENCE_CHUNK]
+        block = bits[:len(chunk)]
+        with np.errstate(invalid='ignore'):
+            np.greater(chunk, 0, out=block[:, :n_cols])
+        result[start:start + len(chunk)] = np.packbits(block, axis=1, bitorder='little').view('<u8')
+    return result
+
+def popcount(words):
+    """
+    Bits ligados por linha de um array de palavras uint64 (shape (linhas, palavras)).
+    np.bitwise_count só existe a partir do NumPy 2.0; no 1.26 conta pelos bytes.
+    """
+    if hasattr(np, 'bitwise_count'):
+        return np.bitwise_count(words).sum(axis=1, dtype=np.int64)
+    as_bytes = np.ascontiguousarray(words, dtype='<u8').view(np.uint8)
+    return np.unpackbits(as_bytes, axis=1).sum(axis=1, dtype=np.int64)
+
+def food_identities(names, sources=None, ids=None):
+    """
+    Chave canônica e rótulo de exibição de cada linha.
+
+    A chave é "<tabela_fonte>:<alimento_id>" (ou "<tabela_fonte>:<nome>" sem id),
+    estável entre recargas do dataset; repetições recebem o sufixo "#n" na ordem
+    das linhas. O rótulo é o nome do alimento, acrescido da fonte (e do id ou
+    ordinal) apenas quando o nome se repete.
+
+    Returns:
+        (chaves, rótulos) como arrays de objetos alinhados às linhas
+    """
+    n = len(names)
+    sources = ['-' if s is None or s != s or s == '' else str(s) for s in sources] if sources is not None else ['-'] * n
+    ids = [None if i is None or i != i else int(i) for i in ids] if ids is not None else [None] * n
+
+    keys = np.empty(n, dtype=object)
+    seen = {}
+    for pos, (name, source, food_id) in enumerate(zip(names, sources, ids)):
+        key = f"{source}:{food_id if food_id is not None else name}"
+        count = seen.get(key, 0) + 1
+        seen[key] = count
+        keys[pos] = key if count == 1 else f"{key}#{count}"
+
+    name_counts = Counter(names)
+    labels = np.empty(n, dtype=object)
+    by_source = Counter((name, source) for name, source in zip(names, sources) if name_counts[name] > 1)
+    ordinals = Counter()
+    for pos, (name, source, food_id) in enumerate(zip(names, sources, ids)):
+        if name_counts[name] == 1:
+            labels[pos] = name
+        elif by_source[(name, source)] == 1:
+            labels[pos] = f"{name} ({source})"
+        elif food_id is not None:
+            labels[pos] = f"{name} ({source} {food_id})"
+        else:
+            ordinals[(name, source)] += 1
+            labels[pos] = f"{name} ({source} #{ordinals[(name, source)]})"
+    return keys, labels
+
+class FoodRow:
+    """
+    Visão leve de um alimento dentro do FoodStore.
+    Expõe o vetor de nutrientes como fatia da matriz (sem cópia) e mantém
+    a interface mínima usada pelas camadas logic/ e ui/ (`empty`, `columns`).
+    """
+
+    __slots__ = ('store', 'index')
+
+    # Uma visão de linha nunca é vazia (alimentos inexistentes retornam None)
+    empty = False
+
+    def __init__(self, store, index):
+        self.store = store
+        self.index = index
+
+    @property
+    def name(self):
+        return self.store.names[self.index]
+
+    @property
+    def key(self):
+        return self.store.keys[self.index]
+
+    @property
+    def label(self):
+        return self.store.labels[self.index]
+
+    @property
+    def digest(self):
+        """
+        Impressão dos valores do alimento: igual entre versões do dataset se a linha não mudou
+        """
+        return hash(self.values.tobytes())
+
+    @property
+    def values(self):
+        """
+        Vetor de nutrientes do alimento (fatia da matriz, somente leitura)
+        """
+        return self.store.matrix[self.index]
+
+    @property
+    def columns(self):
+        """
+        Colunas disponíveis (nutrientes + metadados), com teste de pertinência O(1)
+        """
+        return self.store.all_columns
+
+    def nutrient(self, column, default=0):
+        """
+        Retorna o valor de um nutriente, ou `default` se ausente, NaN ou negativo
+        """
+        pos = self.store.col_pos.get(column)
+        if pos is None:
+            return default
+        value = float(self.store.matrix[self.index, pos])
+        if value != value or value < 0:
+            return default
+        return value
+
+    def raw(self, column):
+        """
+        Retorna o valor bruto (float ou metadado) de uma coluna, NaN se ausente
+        """
+        pos = self.store.col_pos.get(column)
+        if pos is not None:
+            return float(self.store.matrix[self.index, pos])
+        meta = self.store.meta.get(column)
+        if meta is not None:
+            return meta[self.index]
+        return np.nan
+
+    def __getitem__(self, column):
+        return self.raw(column)
+
+    def __contains__(self, column):
+        return column in self.store.all_columns
+
+    def __eq__(self, other):
+        return isinstance(other, FoodRow) and other.store is self.store and other.index == self.index
+
+    def __hash__(self):
+        return hash((id(self.store), self.index))
+
+    def __repr__(self):
+        return f"FoodRow({self.name!r})"
+
+    def to_frame(self):
+        """
+        Converte a visão para um DataFrame de uma linha (compatibilidade)
+        """
+        data = {col: [values[self.index]] for col, values in self.store.meta.items()}
+        data.update({col: [self.values[pos]] for col, pos in self.store.col_pos.items()})
+        return pd.DataFrame(data)
+
+class FoodStore:
+    """
+    Matriz contígua (alimentos × colunas de NUTRIENT_UNITS) construída uma única
+    vez a partir do DataFrame saneado, com mapas nome→linha e coluna→posição.
+    """
+
+    # Índices derivados calculados sob demanda (cached_property); `warm()` os constrói
+    DERIVED_INDEXES = ('group_index', 'search_index', 'similarity_index', 'query_planner', 'percentile_index')
+
+    def __init__(self, df, columns=None, version=None):
+        # Versão do dataset (hash do conteúdo), usada como parte de chaves de cache
+        self.version = version
+        if columns is None:
+            columns = [col for col in NUTRIENT_UNITS if col in df.columns]
+
+        self.columns = list(columns)
+        self.col_pos = {col: pos for pos, col in enumerate(self.columns)}
+        self.matrix = np.ascontiguousarray(
+            df[self.columns].to_numpy(dtype=np.float32, na_value=np.nan)
+        )
+        self.matrix.setflags(write=False)
+        # Quais nutrientes cada alimento tem (consultas sem ler a matriz)
+        self.presence = presence_bitmask(self.matrix)
+        self.presence.setflags(write=False)
+
+        # Registro de nutrientes validado contra o esquema, com posições por seção
+        numeric = [col for col in df.columns if col not in META_COLUMNS and pd.api.types.is_float_dtype(df[col])]
+        self.nutrients = NutrientIndex(self.col_pos, numeric)
+
+        self.meta = {
+            col: df[col].to_numpy(dtype=object)
+            for col in META_COLUMNS if col in df.columns
+        }
+        self.names = self.meta.get('alimento', np.array([], dtype=object))
+        self.all_columns = frozenset(self.columns) | frozenset(self.meta)
+
+        # Nome → primeira linha com aquele nome (mesma semântica de .iloc[0])
+        self.index = {}
+        for pos, name in enumerate(self.names):
+            if isinstance(name, str) and name not in self.index:
+                self.index[name] = pos
+
+        # Identidade canônica (tabela_fonte, alimento_id) e rótulo único de exibição por linha
+        self.keys, self.labels = food_identities(
+            self.names, self.meta.get('tabela_fonte'), self.meta.get('alimento_id')
+        )
+        self.key_index = {key: pos for pos, key in enumerate(self.keys)}
+        self.label_index = {label: pos for pos, label in enumerate(self.labels)}
+
+    def __len__(self):
+        return self.matrix.shape[0]
+
+    @cached_property
+    def group_index(self):
+        """
+        Índice invertido grupo → rótulos/chaves ordenados (ver logic.filters.GroupIndex)
+        """
+        from logic.filters import GroupIndex
+        return GroupIndex(self.labels, self.meta.get('grupo', np.full(len(self), None, dtype=object)), keys=self.keys)
+
+    @cached_property
+    def search_index(self):
+        """
+        Índice de trigramas sobre os rótulos normalizados, respondendo com chaves (ver logic.search.SearchIndex)
+        """
+        from logic.search import SearchIndex
+        return SearchIndex(self.labels, keys=self.keys)
+
+    @cached_property
+    def similarity_index(self):
+        """
+        Vetores padronizados com máscaras de presença (ver logic.similarity.SimilarityIndex)
+        """
+        from logic.similarity import SimilarityIndex
+        return SimilarityIndex(self.matrix, self.meta.get('grupo'))
+
+    @cached_property
+    def query_planner(self):
+        """
+        Colunas contíguas + histogramas para filtros por faixa (ver logic.query.QueryPlanner)
+        """
+        from logic.query import QueryPlanner
+        return QueryPlanner(self)
+
+    @cached_property
+    def percentile_index(self):
+        """
+        Percentis por nutriente no catálogo e no grupo (ver logic.percentiles.PercentileIndex)
+        """
+        from logic.percentiles import PercentileIndex
+        return PercentileIndex(self.matrix, self.meta.get('grupo'))
+
+    @cached_property
+    def long_table(self):
+        """
+        Visão longa do modelo SQL em SQLite em memória (ver data.long_table.LongTable).
+        Fora de DERIVED_INDEXES: só é construída na primeira consulta.
+        """
+        from data.long_table import LongTable
+        return LongTable(self)
+
+    def warm(self):
+        """
+        Constrói antecipadamente todos os índices derivados.
+        Chamado pela recarga em segundo plano antes de publicar uma nova versão.
+        """
+        for name in self.DERIVED_INDEXES:
+            getattr(self, name)
+        return self
+
+    @property
+    def empty(self):
+        return len(self) == 0
+
+    def __contains__(self, food):
+        return self.row_index(food) is not None
+
+    def row_index(self, food):
+        """
+        Retorna a posição do alimento na matriz, ou None se não existir.
+        `food` é a chave canônica (ver food_identities); rótulos de exibição e
+        nomes (primeira linha com o nome) são aceitos por compatibilidade.
+        """
+        pos = self.key_index.get(food)
+        if pos is None:
+            pos = self.label_index.get(food)
+            if pos is None:
+                pos = self.index.get(food)
+        return pos
+
+    def row(self, food):
+        """
+        Retorna a visão (FoodRow) de um alimento, ou None se não existir
+        """
+        pos = self.row_index(food)
+        return FoodRow(self, pos) if pos is not None else None
+
+    def vector(self, food):
+        """
+        Retorna o vetor completo de nutrientes de um alimento (uma única fatia)
+        """
+        pos = self.row_index(food)
+        return self.matrix[pos] if pos is not None else None
+
+    def label_for(self, key):
+        """
+        Rótulo de exibição de uma chave (format_func dos seletores); outros valores voltam inalterados
+        """
+        pos = self.key_index.get(key)
+        return self.labels[pos] if pos is not None else key
+
+    def positions(self, columns):
+        """
+        Converte nomes de colunas em posições da matriz (-1 para colunas ausentes)
+        """
+        return np.array([self.col_pos.get(col, -1) for col in columns], dtype=np.intp)
+
+    def gather(self, rows, columns):
+        """
+        Extrai a sub-matriz (linhas × colunas) em uma única operação.
+        Colunas ausentes são retornadas como NaN.
+
+        Args:
+            rows: Sequência de posições de linha (ou FoodRow)
+            columns: Sequência de nomes de colunas
+
+        Returns:
+            np.ndarray float32 com shape (len(rows), len(columns))
+        """
+        row_idx = np.array([r.index if isinstance(r, FoodRow) else r for r in rows], dtype=np.intp)
+        col_idx = self.positions(columns)
+        # take em dois eixos: mesma cópia que np.ix_, com menos overhead para poucas linhas
+        result = self.matrix.take(row_idx, axis=0).take(np.maximum(col_idx, 0), axis=1)
+        if (col_idx < 0).any():
+            result[:, col_idx < 0] = np.nan
+        return result
+
+    def has_data(self, rows, columns):
+        """
+        Presença (valor > 0) de cada coluna em cada linha, lida da bitmask.
+        Colunas ausentes do dataset são sempre False.
+
+        Returns:
+            np.ndarray bool com shape (len(rows), len(columns))
+        """
+        row_idx = np.array([r.index if isinstance(r, FoodRow) else r for r in rows], dtype=np.intp)
+        col_idx = self.positions(columns)
+        safe = np.maximum(col_idx, 0)
+        words = self.presence.take(row_idx, axis=0).take(safe >> 6, axis=1)
+        bits = (words >> (safe & 63).astype(np.uint64)) & np.uint64(1)
+        return (bits != 0) & (col_idx >= 0)
+
+    def coverage(self, rows, section):
+        """
+        Nutrientes preenchidos de uma seção do registro (ver NutrientIndex) por linha
+
+        Returns:
+            (np.ndarray com a contagem por linha, total de colunas da seção no dataset)
+        """
+        row_idx = np.array([r.index if isinstance(r, FoodRow) else r for r in rows], dtype=np.intp)
+        section = self.nutrients[section]
+        filled = popcount(self.presence.take(row_idx, axis=0) & section.mask)
+        return filled, len(section.positions)
+
+    def section_values(self, rows, section):
+        """
+        Valores das colunas de uma seção do registro (ver NutrientIndex), sem resolver nomes
+
+        Returns:
+            np.ndarray float32 com shape (len(rows), colunas presentes da seção)
+        """
+        row_idx = np.array([r.index if isinstance(r, FoodRow) else r for r in rows], dtype=np.intp)
+        return self.matrix.take(row_idx, axis=0).take(self.nutrients[section].positions, axis=1)
@@ -0,0 +1,152 @@
+"""
+Recarga a quente do dataset sem reiniciar os workers.
+
+Uma thread em segundo plano observa o arquivo de dados (mtime/tamanho e, se
+mudarem, hash do conteúdo). Quando o conteúdo muda, o novo DataFrame e os
+índices derivados (FoodStore) são reconstruídos fora da thread do script e
+trocados atomicamente; enquanto isso as sessões continuam servindo a versão
+anterior.
+"""
+
+import logging
+import os
+import threading
+import time
+
+from data.snapshot import file_content_hash, load_or_build_snapshot
+from data.store import FoodStore
+
+logger = logging.getLogger(__name__)
+
+class Dataset:
+    """
+    Versão imutável do dataset: DataFrame saneado + FoodStore + identificação
+    """
+
+    __slots__ = ('df', 'store', 'version', 'content_hash', 'mtime', 'loaded_at')
+
+    def __init__(self, df, store, content_hash, mtime):
+        self.df = df
+        self.store = store
+        self.content_hash = content_hash
+        self.version = content_hash[:12]
+        self.mtime = mtime
+        self.loaded_at = time.time()
+
+def _file_signature(path):
+    """
+    Assinatura barata do arquivo (mtime em ns, tamanho) usada antes do hash
+    """
+    stat = os.stat(path)
+    return stat.st_mtime_ns, stat.st_size
+
+def build_dataset(path, sanitize, signature=None):
+    """
+    Carrega o dataset (via snapshot) e constrói todos os índices derivados.
+    `signature` é a assinatura do arquivo lida antes da carga (padrão: lida aqui).
+    """
+    mtime, _ = signature or _file_signature(path)
+    df, content_hash = load_or_build_snapshot(path, sanitize)
+    store = FoodStore(df, version=content_hash[:12])
+    # Divergências entre o registro de nutrientes e o esquema não impedem a carga
+    report = store.nutrients.report()
+    if report:
+        logger.warning("Esquema de %s (versão %s):\n%s", path, store.version, report)
+    store.warm()
+    return Dataset(df, store, content_hash, mtime)
+
+class DatasetWatcher:
+    """
+    Mantém a versão atual do dataset e a substitui quando o arquivo muda.
+    A leitura de `current` é uma simples leitura de referência (atômica);
+    a reconstrução acontece inteiramente na thread de segundo plano.
+    Cada função de `on_swap` é chamada com o novo Dataset logo após a troca
+    (ex.: descartar caches das camadas acima presos à versão anterior).
+    """
+
+    def __init__(self, path, sanitize, interval=5.0, start=True, on_swap=()):
+        self.path = path
+        self.sanitize = sanitize
+        self.interval = interval
+        self.last_error = None
+        self.reload_count = 0
+        self.on_swap = list(on_swap)
+
+        # Assinatura lida antes da carga: uma mudança durante a carga inicial é detectada no primeiro ciclo
+        self._signature = _file_signature(path)
+        self._current = build_dataset(path, sanitize, self._signature)
+        self._swap_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+
+        if start:
+            self.start()
+
+    @property
+    def current(self):
+        return self._current
+
+    def start(self):
+        """
+        Inicia a thread de observação (daemon)
+        """
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="dataset-watcher", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """
+        Interrompe a thread de observação
+        """
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=self.interval + 1)
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self.check()
+
+    def check(self):
+        """
+        Verifica o arquivo e, se o conteúdo mudou, reconstrói e troca o dataset.
+        Retorna True se uma nova versão foi publicada.
+        """
+        with self._swap_lock:
+            try:
+                signature = _file_signature(self.path)
+                if signature == self._signature:
+                    return False
+
+                # mtime/tamanho mudaram: confirmar pelo hash antes de reconstruir
+                if file_content_hash(self.path) == self._current.content_hash:
+                    self._signature = signature
+                    return False
+
+                new_dataset = build_dataset(self.path, self.sanitize, signature)
+
+                # Arquivo mudou durante a reconstrução (cópia em andamento): tentar no próximo ciclo
+                if _file_signature(self.path) != signature:
+                    return False
+
+                self._signature = signature
+                self._current = new_dataset
+                self.reload_count += 1
+                self.last_error = None
+                self._notify(new_dataset)
+                return True
+            except Exception as e:
+                # Mantém a versão anterior em caso de falha (arquivo em escrita, CSV inválido...)
+                self.last_error = str(e)
+                return False
+
+    def _notify(self, dataset):
+        """
+        Chama os ouvintes de `on_swap`; a falha de um deles não desfaz a troca
+        """
+        for listener in self.on_swap:
+            try:
+                listener(dataset)
+            except Exception:
+                logger.exception("Falha ao notificar a troca do dataset (versão %s)", dataset.version)
@@ -0,0 +1,38 @@
+"""
+Normalização de nomes de grupos de alimentos
+"""
+
+# Tabela de aliases: forma já capitalizada → nome canônico do grupo
+GROUP_ALIASES = {
+    'Verduras': 'Verdura',
+    'Cereais': 'Cereal',
+    'Frutas': 'Fruta',
+    'Legumes': 'Legume',
+    'Leguminosas': 'Leguminosa',
+    'Bebidas': 'Bebida',
+    'Doces': 'Doce',
+    'Oleaginosas': 'Oleaginosa',
+    'Condimentos': 'Condimento',
+    'Laticínios': 'Laticínio',
+    'Óleos': 'Óleo',
+    'Amiláceos': 'Amiláceo',
+    'Ovos': 'Ovo'
+}
+
+def normalize_group_name(name):
+    """
+    Normaliza um nome de grupo: remove espaços, aplica capitalização
+    (primeira letra maiúscula) e resolve aliases (ex.: 'Verduras' → 'Verdura')
+    """
+    if not isinstance(name, str):
+        return None
+    clean = name.strip().title()
+    if not clean:
+        return None
+    return GROUP_ALIASES.get(clean, clean)
+
+def get_group_aliases():
+    """
+    Retorna a tabela de aliases de grupos
+    """
+    return GROUP_ALIASES
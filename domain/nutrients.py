@@ -1,231 +1,340 @@
 """
-Mapeamentos de nutrientes e unidades centralizados
-"""
-
-# MACRONUTRIENTES PRINCIPAIS
-MACROS = {
-    'Carboidrato': 'carboidrato_g',
-    'Lipídio': 'lipideos_g',
-    'Proteína': 'proteina_g'
-}
+Mapeamentos de nutrientes e unidades centralizados.
 
-# NUTRIENTES BÁSICOS
-BASIC_NUTRIENTS = {
-    'Energia': 'energia_kcal',
-    'Fibra': 'fibra_alimentar_g',
-    'Umidade': 'umidade_pct'
-}
+Fonte única: NUTRIENT_REGISTRY (coluna, rótulo, unidade, categoria, cor,
+formatador, ordem de exibição, grupo de escala e atributos de tabela). Os
+dicionários e listas de colunas abaixo são todos derivados do registro; NutrientIndex o valida contra o esquema do dataset e
+resolve as posições das colunas na matriz uma única vez por carga.
+"""
 
-# MICRONUTRIENTES POR CATEGORIA
-MICROS_BY_CATEGORY = {
-    'Minerais': {
-        'Cálcio': 'calcio_mg',
-        'Cobre': 'cobre_mg',
-        'Ferro': 'ferro_mg',
-        'Fósforo': 'fosforo_mg',
-        'Magnésio': 'magnesio_mg',
-        'Manganês': 'manganes_mg',
-        'Potássio': 'potassio_mg',
-        'Selênio': 'se',
-        'Sódio': 'sodio_mg',
-        'Zinco': 'zinco_mg'
-    },
-    'Vitaminas Lipossolúveis': {
-        'Vitamina A': 'vit_a_ui',
-        'Vitamina D': 'vitamina_d',
-        'Vitamina E': 'vit_e_alfatocoferol',
-        'Vitamina K': 'vit_k_filoquinona'
-    },
-    'Precursores da Vitamina A': {
-        'Betacaroteno': 'betacaroteno',
-        'RAE': 'rae_mcg'
-    },
-    'Complexo B': {
-        'Vitamina B1': 'tiamina_mg',
-        'Vitamina B2': 'riboflavina_mg',
-        'Vitamina B3': 'niacina_mg',
-        'Vitamina B5': 'ac_pantontenico',
-        'Vitamina B6': 'piridoxina_mg',
-        'Vitamina B9': 'folato_dfe',
-        'Vitamina B12': 'vit_b12',
-        'Colina': 'colina_total'
-    },
-    'Outras Vitaminas': {
-        'Vitamina C': 'c_mg',
-        'Luteína + Zeaxantina': 'luteina_zeoxantina'
-    }
-}
+from typing import NamedTuple, Optional
 
-# FRAÇÕES DE LIPÍDIOS
-LIPID_FRACTIONS = {
-    'Colesterol': 'colesterol_mg',
-    'Ác. graxos total saturados': 'ac_graxos_total_saturados',
-    '18:1 indiferenciado': 'col_18_e_1_indifernciado',
-    '18:2 indiferenciado': 'col_18_e_2_indiferenciado',
-    '18:3 indiferenciado': 'col_18_e_3_indiferenciado',
-    '22:6 n-3 (DHA)': 'col_22_e_6_n3_dha',
-    '20:5 n-3 (EPA)': 'col_20_e_5_n3_epa',
-    'Ác. graxos totais monoinsaturados': 'ac_graxos_totais_monoinsaturados',
-    'Ác. graxos totais poliinsaturados': 'ac_graxos_totais_poliinsaturados'
-}
+import numpy as np
 
-# AMINOÁCIDOS
-AMINO_ACIDS = {
-    'Alanina': 'alanina',
-    'Arginina': 'arginina',
-    'Asparagina': 'asparagina',
-    'Ácido Aspártico': 'acido_aspartico',
-    'Aminoácidos': 'cisteina',
-    'Fenilalanina': 'fenilalanina',
-    'Glicina': 'glicina',
-    'Histidina': 'histidina',
-    'Isoleucina': 'isoleucina',
-    'Leucina': 'leucina',
-    'Lisina': 'lisina',
-    'Metionina': 'metionina',
-    'Prolina': 'prolina',
-    'Serina': 'serina',
-    'Tirosina': 'tirosina',
-    'Treonina': 'treonina',
-    'Triptofano': 'triptofano',
-    'Valina': 'valina'
+# PALETA DE CORES PADRÃO PARA GRÁFICOS
+# PALETA DE CORES TERROSA E CONSISTENTE
+CHART_COLORS = {
+    # Cores específicas por nutriente
+    'carboidrato': '#8FBC8F',      # Verde terroso
+    'lipideos': '#DAA520',          # Amarelo mostarda
+    'proteina': '#4682B4',         # Azul terroso
+    'energia': '#CD853F',          # Laranja terroso
+    'agua': '#20B2AA',             # Verde água
+    'fibras': '#D2B48C',           # Marrom trigo maduro
+    
+    # Cores para alimentos
+    'alimento1': '#CD853F',        # Terracota
+    'alimento2': '#9370DB',        # Roxo terroso
+    
+    # Paletas por categoria
+    'macros': ['#8FBC8F', '#DAA520', '#4682B4'],  # Carboidrato, Lipídios, Proteína
+    'minerais': ['#CD853F', '#8FBC8F', '#DAA520', '#4682B4', '#9370DB', '#D2B48C', '#20B2AA', '#A0522D'],
+    'vitaminas': ['#CD853F', '#8FBC8F', '#DAA520', '#4682B4', '#9370DB', '#D2B48C', '#20B2AA', '#A0522D'],
+    'lipidos': ['#DAA520', '#CD853F', '#8FBC8F', '#4682B4', '#9370DB', '#D2B48C', '#20B2AA', '#A0522D'],
+    'aminoacidos': ['#4682B4', '#8FBC8F', '#DAA520', '#CD853F', '#9370DB', '#D2B48C', '#20B2AA', '#A0522D'],
+    'default': ['#8FBC8F', '#DAA520', '#4682B4', '#CD853F', '#9370DB']
 }
 
-# DICIONÁRIO DE UNIDADES POR NUTRIENTE
-NUTRIENT_UNITS = {
+# CATEGORIAS DO REGISTRO (ordem de exibição)
+MACROS_CATEGORY = 'Macronutrientes'
+BASIC_CATEGORY = 'Nutrientes Básicos'
+MICRO_CATEGORIES = (
+    'Minerais', 'Vitaminas Lipossolúveis', 'Precursores da Vitamina A', 'Complexo B', 'Outras Vitaminas'
+)
+LIPID_CATEGORY = 'Frações de Lipídios'
+AMINO_CATEGORY = 'Aminoácidos'
+
+# Formatadores (resolvidos em logic.compute.registry_formatter): 'numero' (1 casa, milhares) e 'fracao' (3 casas)
+FORMAT_NUMBER = 'numero'
+FORMAT_FRACTION = 'fracao'
+
+class Nutrient(NamedTuple):
+    """
+    Entrada do registro de nutrientes
+    """
+    column: str
+    label: str
+    unit: str
+    category: str
+    color: Optional[str]
+    formatter: str
+    order: int
+    scale: Optional[str] = None
+    alias: Optional[str] = None
+    table_label: Optional[str] = None
+    total: bool = False
+
+# REGISTRO ÚNICO: (coluna, rótulo, unidade, categoria, cor[, atributos]), na ordem de exibição.
+# Cor None: o gráfico usa as cores dos alimentos comparados.
+# Atributos opcionais: 'scale' (grupo de escala, quando difere do da categoria),
+# 'alias' e 'table_label' (coluna "Conhecido como" e rótulo da tabela do Complexo B)
+# e 'total' (totais exibidos entre as frações de lipídios).
+_REGISTRY_TABLE = (
     # Macronutrientes
-    'carboidrato_g': 'g',
-    'lipideos_g': 'g',
-    'proteina_g': 'g',
-    'fibra_alimentar_g': 'g',
-    'energia_kcal': 'kcal',
-    'umidade_pct': '%',
+    ('carboidrato_g', 'Carboidrato', 'g', MACROS_CATEGORY, CHART_COLORS['carboidrato']),
+    ('lipideos_g', 'Lipídio', 'g', MACROS_CATEGORY, CHART_COLORS['lipideos']),
+    ('proteina_g', 'Proteína', 'g', MACROS_CATEGORY, CHART_COLORS['proteina']),
+    
+    # Nutrientes básicos (cada um com a própria escala)
+    ('energia_kcal', 'Energia', 'kcal', BASIC_CATEGORY, CHART_COLORS['energia'], {'scale': 'energy'}),
+    ('fibra_alimentar_g', 'Fibra', 'g', BASIC_CATEGORY, CHART_COLORS['fibras'], {'scale': 'fiber'}),
+    ('umidade_pct', 'Umidade', '%', BASIC_CATEGORY, CHART_COLORS['agua'], {'scale': 'water'}),
     
     # Minerais
-    'calcio_mg': 'mg',
-    'cobre_mg': 'mg',
-    'ferro_mg': 'mg',
-    'fosforo_mg': 'mg',
-    'magnesio_mg': 'mg',
-    'manganes_mg': 'mg',
-    'potassio_mg': 'mg',
-    'se': 'µg',
-    'sodio_mg': 'mg',
-    'zinco_mg': 'mg',
+    ('calcio_mg', 'Cálcio', 'mg', 'Minerais', None),
+    ('cobre_mg', 'Cobre', 'mg', 'Minerais', None),
+    ('ferro_mg', 'Ferro', 'mg', 'Minerais', None),
+    ('fosforo_mg', 'Fósforo', 'mg', 'Minerais', None),
+    ('magnesio_mg', 'Magnésio', 'mg', 'Minerais', None),
+    ('manganes_mg', 'Manganês', 'mg', 'Minerais', None),
+    ('potassio_mg', 'Potássio', 'mg', 'Minerais', None),
+    ('se', 'Selênio', 'µg', 'Minerais', None),
+    ('sodio_mg', 'Sódio', 'mg', 'Minerais', None),
+    ('zinco_mg', 'Zinco', 'mg', 'Minerais', None),
     
     # Vitaminas Lipossolúveis
-    'vit_a_ui': 'UI',
-    'vitamina_d': 'µg',
-    'vit_e_alfatocoferol': 'mg',
-    'vit_k_filoquinona': 'µg',
+    ('vit_a_ui', 'Vitamina A', 'UI', 'Vitaminas Lipossolúveis', None),
+    ('vitamina_d', 'Vitamina D', 'µg', 'Vitaminas Lipossolúveis', None),
+    ('vit_e_alfatocoferol', 'Vitamina E', 'mg', 'Vitaminas Lipossolúveis', None),
+    ('vit_k_filoquinona', 'Vitamina K', 'µg', 'Vitaminas Lipossolúveis', None),
     
     # Precursores Vitamina A
-    'betacaroteno': 'µg',
-    'rae_mcg': 'mcg',
+    ('betacaroteno', 'Betacaroteno', 'µg', 'Precursores da Vitamina A', None),
+    ('rae_mcg', 'RAE', 'mcg', 'Precursores da Vitamina A', None),
     
     # Complexo B
-    'tiamina_mg': 'mg',
-    'riboflavina_mg': 'mg',
-    'niacina_mg': 'mg',
-    'ac_pantontenico': 'mg',
-    'piridoxina_mg': 'mg',
-    'folato_dfe': 'mcg',
-    'vit_b12': 'µg',
-    'colina_total': 'mg',
+    ('tiamina_mg', 'Vitamina B1', 'mg', 'Complexo B', None,
+     {'alias': 'Vit B1', 'table_label': 'Vit B1 | Tiamina (mg)'}),
+    ('riboflavina_mg', 'Vitamina B2', 'mg', 'Complexo B', None,
+     {'alias': 'Vit B2', 'table_label': 'Vit B2 | Riboflavina (mg)'}),
+    ('niacina_mg', 'Vitamina B3', 'mg', 'Complexo B', None,
+     {'alias': 'Vit B3', 'table_label': 'Vit B3 | Niacina (mg)'}),
+    ('ac_pantontenico', 'Vitamina B5', 'mg', 'Complexo B', None,
+     {'alias': 'Vit B5', 'table_label': 'Vit B5 | Ác. Pantotênico (mg)'}),
+    ('piridoxina_mg', 'Vitamina B6', 'mg', 'Complexo B', None,
+     {'alias': 'Vit B6', 'table_label': 'Vit B6 | Piridoxina (mg)'}),
+    ('folato_dfe', 'Vitamina B9', 'mcg', 'Complexo B', None,
+     {'alias': 'Vit B9', 'table_label': 'Vit B9 | Folato DFE (mcg)'}),
+    ('vit_b12', 'Vitamina B12', 'µg', 'Complexo B', None,
+     {'alias': 'Vit B12', 'table_label': 'Vitamina B12 (µg)'}),
+    ('colina_total', 'Colina', 'mg', 'Complexo B', None,
+     {'alias': 'Colina', 'table_label': 'Colina Total (mg)'}),
     
     # Outras Vitaminas
-    'c_mg': 'mg',
-    'luteina_zeoxantina': 'µg',
+    ('c_mg', 'Vitamina C', 'mg', 'Outras Vitaminas', None),
+    ('luteina_zeoxantina', 'Luteína + Zeaxantina', 'µg', 'Outras Vitaminas', None),
     
     # Frações de Lipídios
-    'colesterol_mg': 'mg',
-    'ac_graxos_total_saturados': 'g',
-    'col_18_e_1_indifernciado': 'g',
-    'col_18_e_2_indiferenciado': 'g',
-    'col_18_e_3_indiferenciado': 'g',
-    'col_22_e_6_n3_dha': 'g',
-    'col_20_e_5_n3_epa': 'g',
-    'ac_graxos_totais_monoinsaturados': 'g',
-    'ac_graxos_totais_poliinsaturados': 'g',
+    ('colesterol_mg', 'Colesterol', 'mg', LIPID_CATEGORY, None, {'total': True}),
+    ('ac_graxos_total_saturados', 'Ác. graxos total saturados', 'g', LIPID_CATEGORY, None, {'total': True}),
+    ('col_18_e_1_indifernciado', '18:1 indiferenciado', 'g', LIPID_CATEGORY, None),
+    ('col_18_e_2_indiferenciado', '18:2 indiferenciado', 'g', LIPID_CATEGORY, None),
+    ('col_18_e_3_indiferenciado', '18:3 indiferenciado', 'g', LIPID_CATEGORY, None),
+    ('col_22_e_6_n3_dha', '22:6 n-3 (DHA)', 'g', LIPID_CATEGORY, None),
+    ('col_20_e_5_n3_epa', '20:5 n-3 (EPA)', 'g', LIPID_CATEGORY, None),
+    ('ac_graxos_totais_monoinsaturados', 'Ác. graxos totais monoinsaturados', 'g', LIPID_CATEGORY, None, {'total': True}),
+    ('ac_graxos_totais_poliinsaturados', 'Ác. graxos totais poliinsaturados', 'g', LIPID_CATEGORY, None, {'total': True}),
     
-    # Aminoácidos
-    'alanina': 'g',
-    'arginina': 'g',
-    'asparagina': 'g',
-    'acido_aspartico': 'g',
-    'cisteina': 'g',
-    'fenilalanina': 'g',
-    'glicina': 'g',
-    'histidina': 'g',
-    'isoleucina': 'g',
-    'leucina': 'g',
-    'lisina': 'g',
-    'metionina': 'g',
-    'prolina': 'g',
-    'serina': 'g',
-    'tirosina': 'g',
-    'treonina': 'g',
-    'triptofano': 'g',
-    'valina': 'g'
+    # Aminoácidos (alanina, arginina, asparagina, ácido aspártico, glicina,
+    # prolina e serina não existem no CSV atual: NutrientIndex.missing os lista)
+    ('alanina', 'Alanina', 'g', AMINO_CATEGORY, None),
+    ('arginina', 'Arginina', 'g', AMINO_CATEGORY, None),
+    ('asparagina', 'Asparagina', 'g', AMINO_CATEGORY, None),
+    ('acido_aspartico', 'Ácido Aspártico', 'g', AMINO_CATEGORY, None),
+    ('cisteina', 'Cisteína', 'g', AMINO_CATEGORY, None),
+    ('fenilalanina', 'Fenilalanina', 'g', AMINO_CATEGORY, None),
+    ('glicina', 'Glicina', 'g', AMINO_CATEGORY, None),
+    ('histidina', 'Histidina', 'g', AMINO_CATEGORY, None),
+    ('isoleucina', 'Isoleucina', 'g', AMINO_CATEGORY, None),
+    ('leucina', 'Leucina', 'g', AMINO_CATEGORY, None),
+    ('lisina', 'Lisina', 'g', AMINO_CATEGORY, None),
+    ('metionina', 'Metionina', 'g', AMINO_CATEGORY, None),
+    ('prolina', 'Prolina', 'g', AMINO_CATEGORY, None),
+    ('serina', 'Serina', 'g', AMINO_CATEGORY, None),
+    ('tirosina', 'Tirosina', 'g', AMINO_CATEGORY, None),
+    ('treonina', 'Treonina', 'g', AMINO_CATEGORY, None),
+    ('triptofano', 'Triptofano', 'g', AMINO_CATEGORY, None),
+    ('valina', 'Valina', 'g', AMINO_CATEGORY, None)
+)
+
+# Categorias exibidas com 3 casas decimais
+_FRACTION_CATEGORIES = {LIPID_CATEGORY, AMINO_CATEGORY}
+
+# Grupo de escala (eixo Y comum nos gráficos) de cada categoria; 'scale' na entrada tem precedência
+_CATEGORY_SCALES = {
+    MACROS_CATEGORY: 'macro',
+    'Minerais': 'mineral',
+    'Vitaminas Lipossolúveis': 'vitamin_liposoluble',
+    'Precursores da Vitamina A': 'precursores',
+    'Complexo B': 'complexo_b',
+    'Outras Vitaminas': 'outras_vitaminas'
 }
 
+NUTRIENT_REGISTRY = tuple(
+    Nutrient(
+        column, label, unit, category, color,
+        FORMAT_FRACTION if category in _FRACTION_CATEGORIES else FORMAT_NUMBER, order,
+        scale=extra.get('scale', _CATEGORY_SCALES.get(category)),
+        alias=extra.get('alias'),
+        table_label=extra.get('table_label'),
+        total=extra.get('total', False)
+    )
+    for order, (column, label, unit, category, color, *rest) in enumerate(_REGISTRY_TABLE)
+    for extra in (rest[0] if rest else {},)
+)
+
+# Coluna → entrada do registro
+NUTRIENTS_BY_COLUMN = {nutrient.column: nutrient for nutrient in NUTRIENT_REGISTRY}
+
+# Rótulo → cor (apenas nutrientes com cor própria)
+_COLORS_BY_LABEL = {n.label: n.color for n in NUTRIENT_REGISTRY if n.color}
+
+def category_mapping(category):
+    """
+    Mapeamento {rótulo: coluna} de uma categoria do registro, na ordem de exibição
+    """
+    return {n.label: n.column for n in NUTRIENT_REGISTRY if n.category == category}
+
+def category_columns(category):
+    """
+    Colunas de uma categoria do registro, na ordem de exibição
+    """
+    return [n.column for n in NUTRIENT_REGISTRY if n.category == category]
+
+# MAPEAMENTOS DERIVADOS DO REGISTRO
+MACROS = category_mapping(MACROS_CATEGORY)
+BASIC_NUTRIENTS = category_mapping(BASIC_CATEGORY)
+MICROS_BY_CATEGORY = {category: category_mapping(category) for category in MICRO_CATEGORIES}
+LIPID_FRACTIONS = category_mapping(LIPID_CATEGORY)
+AMINO_ACIDS = category_mapping(AMINO_CATEGORY)
+
+# DICIONÁRIO DE UNIDADES POR NUTRIENTE (também define as colunas da matriz do FoodStore)
+NUTRIENT_UNITS = {n.column: n.unit for n in NUTRIENT_REGISTRY}
+
+# GRUPOS DE COLUNAS COM ESCALA COMUM NOS GRÁFICOS (chaves de calculate_upper_limits)
+SCALE_GROUPS = {}
+for _nutrient in NUTRIENT_REGISTRY:
+    if _nutrient.scale:
+        SCALE_GROUPS.setdefault(_nutrient.scale, []).append(_nutrient.column)
+del _nutrient
+
 # LISTAS DE COLUNAS PARA MAPEAMENTOS DIRIGIDOS POR DADOS
-ENERGY_COLS = ["energia_kcal"]
+ENERGY_COLS = SCALE_GROUPS['energy']
 
-MACRO_COLS = ["carboidrato_g", "lipideos_g", "proteina_g"]
+MACRO_COLS = category_columns(MACROS_CATEGORY)
 
-FIBER_COLS = ["fibra_alimentar_g"]
+FIBER_COLS = SCALE_GROUPS['fiber']
 
-WATER_COLS = ["umidade_pct"]
+WATER_COLS = SCALE_GROUPS['water']
 
-# MINERAIS PRINCIPAIS
-MINERAL_COLS = [
-    "calcio_mg", "magnesio_mg", "fosforo_mg", "sodio_mg", "potassio_mg",
-    "ferro_mg", "cobre_mg", "zinco_mg", "manganes_mg", "selenio_mg"
-]
+MINERAL_COLS = category_columns('Minerais')
 
-# VITAMINAS LIPOSSOLÚVEIS
-VITAMIN_LIPOSOLUBLE_COLS = ["vit_a_ui", "vitamina_d", "vit_e_alfatocoferol", "vit_k_filoquinona"]
+VITAMIN_LIPOSOLUBLE_COLS = category_columns('Vitaminas Lipossolúveis')
 
-# COMPLEXO B
-COMPLEXO_B_COLS = ["tiamina_mg", "riboflavina_mg", "niacina_mg", "ac_pantontenico", "piridoxina_mg", "folato_dfe", "vit_b12", "colina_total"]
+COMPLEXO_B_COLS = category_columns('Complexo B')
 
-# PRECURSORES VITAMINA A
-PRECURSORES_VIT_A_COLS = ["betacaroteno", "rae_mcg"]
+PRECURSORES_VIT_A_COLS = category_columns('Precursores da Vitamina A')
 
-# OUTRAS VITAMINAS
-OUTRAS_VITAMINAS_COLS = ["c_mg", "luteina_zeoxantina"]
+OUTRAS_VITAMINAS_COLS = category_columns('Outras Vitaminas')
 
-# FRAÇÕES DE LIPÍDIOS
-LIPID_FRACTION_COLS = ["colesterol_mg", "ac_graxos_total_saturados", "ac_graxos_totais_monoinsaturados", "ac_graxos_totais_poliinsaturados"]
+# FRAÇÕES DE LIPÍDIOS (apenas os totais)
+LIPID_FRACTION_COLS = [n.column for n in NUTRIENT_REGISTRY if n.category == LIPID_CATEGORY and n.total]
 
-# AMINOÁCIDOS PRINCIPAIS
-AMINO_ACID_COLS = ["alanina", "arginina", "cisteina", "fenilalanina", "glicina", "histidina", "isoleucina", "leucina", "lisina", "metionina", "prolina", "serina", "tirosina", "treonina", "triptofano", "valina"]
+AMINO_ACID_COLS = category_columns(AMINO_CATEGORY)
 
-# PALETA DE CORES PADRÃO PARA GRÁFICOS
-# PALETA DE CORES TERROSA E CONSISTENTE
-CHART_COLORS = {
-    # Cores específicas por nutriente
-    'carboidrato': '#8FBC8F',      # Verde terroso
-    'lipideos': '#DAA520',          # Amarelo mostarda
-    'proteina': '#4682B4',         # Azul terroso
-    'energia': '#CD853F',          # Laranja terroso
-    'agua': '#20B2AA',             # Verde água
-    'fibras': '#D2B48C',           # Marrom trigo maduro
-    
-    # Cores para alimentos
-    'alimento1': '#CD853F',        # Terracota
-    'alimento2': '#9370DB',        # Roxo terroso
-    
-    # Paletas por categoria
-    'macros': ['#8FBC8F', '#DAA520', '#4682B4'],  # Carboidrato, Lipídios, Proteína
-    'minerais': ['#CD853F', '#8FBC8F', '#DAA520', '#4682B4', '#9370DB', '#D2B48C', '#20B2AA', '#A0522D'],
-    'vitaminas': ['#CD853F', '#8FBC8F', '#DAA520', '#4682B4', '#9370DB', '#D2B48C', '#20B2AA', '#A0522D'],
-    'lipidos': ['#DAA520', '#CD853F', '#8FBC8F', '#4682B4', '#9370DB', '#D2B48C', '#20B2AA', '#A0522D'],
-    'aminoacidos': ['#4682B4', '#8FBC8F', '#DAA520', '#CD853F', '#9370DB', '#D2B48C', '#20B2AA', '#A0522D'],
-    'default': ['#8FBC8F', '#DAA520', '#4682B4', '#CD853F', '#9370DB']
+# COMPLEXO B: rótulo da tabela → (coluna, "Conhecido como")
+COMPLEXO_B_TABLE = {
+    n.table_label: (n.column, n.alias) for n in NUTRIENT_REGISTRY if n.category == 'Complexo B'
 }
 
+def section_groups():
+    """
+    Seções do registro {nome: colunas}: cada categoria e cada grupo de escala
+    """
+    categories = dict.fromkeys(n.category for n in NUTRIENT_REGISTRY)
+    groups = {category: category_columns(category) for category in categories}
+    groups.update(SCALE_GROUPS)
+    return groups
+
+def presence_words(n_columns):
+    """
+    Palavras uint64 por alimento na bitmask de presença
+    """
+    return max(1, -(-n_columns // 64))
+
+def column_mask(positions, words):
+    """
+    Máscara uint64 (uma palavra por bloco de 64 colunas) com os bits das posições informadas
+    """
+    mask = np.zeros(words, dtype='<u8')
+    for pos in positions:
+        mask[pos >> 6] |= np.uint64(1) << np.uint64(pos & 63)
+    return mask
+
+class NutrientSection(NamedTuple):
+    """
+    Seção do registro resolvida contra o esquema: apenas colunas presentes,
+    com suas posições na matriz do FoodStore e a máscara correspondente na
+    bitmask de presença (FoodStore.presence)
+    """
+    columns: tuple
+    labels: tuple
+    units: tuple
+    positions: np.ndarray
+    mask: np.ndarray
+
+    def mapping(self):
+        return dict(zip(self.labels, self.columns))
+
+class NutrientIndex:
+    """
+    Registro validado contra as colunas de um dataset, construído uma vez por carga.
+    Cada categoria e grupo de escala vira um array de posições da matriz, de modo
+    que a renderização faz gathers em vez de percorrer dicionários e testar colunas.
+    """
+
+    def __init__(self, col_pos, dataset_columns=()):
+        """
+        Args:
+            col_pos: Mapa coluna → posição na matriz (FoodStore.col_pos)
+            dataset_columns: Colunas numéricas do dataset, para listar as que não estão no registro
+        """
+        # Colunas do registro ausentes do dataset (ex.: aminoácidos que o CSV não traz)
+        self.missing = [n.column for n in NUTRIENT_REGISTRY if n.column not in col_pos]
+        # Colunas do dataset sem entrada no registro (não entram na matriz)
+        self.unregistered = [col for col in dataset_columns if col not in NUTRIENTS_BY_COLUMN]
+
+        words = presence_words(len(col_pos))
+        self.sections = {}
+        for name, columns in section_groups().items():
+            present = [col for col in columns if col in col_pos]
+            positions = np.array([col_pos[col] for col in present], dtype=np.intp)
+            self.sections[name] = NutrientSection(
+                tuple(present),
+                tuple(NUTRIENTS_BY_COLUMN[col].label for col in present),
+                tuple(NUTRIENTS_BY_COLUMN[col].unit for col in present),
+                positions,
+                column_mask(positions, words)
+            )
+
+    def __getitem__(self, name):
+        return self.sections[name]
+
+    @property
+    def valid(self):
+        return not self.missing
+
+    def report(self):
+        """
+        Texto de diagnóstico do esquema (vazio se o dataset cobre todo o registro)
+        """
+        lines = []
+        if self.missing:
+            lines.append(f"Colunas do registro ausentes no dataset: {', '.join(self.missing)}")
+        if self.unregistered:
+            lines.append(f"Colunas numéricas fora do registro: {', '.join(self.unregistered)}")
+        return '\n'.join(lines)
+
 def get_micronutrient_categories():
     """
     Retorna as categorias de micronutrientes baseado no modelo SQL
@@ -236,16 +345,7 @@ def get_complexo_b_mapping():
     """
     Retorna mapeamento específico do Complexo B com coluna "Conhecido como"
     """
-    return {
-        'Vit B1 | Tiamina (mg)': ('tiamina_mg', 'Vit B1'),
-        'Vit B2 | Riboflavina (mg)': ('riboflavina_mg', 'Vit B2'),
-        'Vit B3 | Niacina (mg)': ('niacina_mg', 'Vit B3'),
-        'Vit B5 | Ác. Pantotênico (mg)': ('ac_pantontenico', 'Vit B5'),
-        'Vit B6 | Piridoxina (mg)': ('piridoxina_mg', 'Vit B6'),
-        'Vit B9 | Folato DFE (mcg)': ('folato_dfe', 'Vit B9'),
-        'Vitamina B12 (µg)': ('vit_b12', 'Vit B12'),
-        'Colina Total (mg)': ('colina_total', 'Colina')
-    }
+    return dict(COMPLEXO_B_TABLE)
 
 def get_lipid_fractions():
     """
@@ -277,6 +377,13 @@ def get_nutrient_unit(column_name):
     """
     return NUTRIENT_UNITS.get(column_name, '')
 
+def get_nutrient_label(column_name):
+    """
+    Retorna o rótulo de exibição de um nutriente (ou a própria coluna, se fora do registro)
+    """
+    nutrient = NUTRIENTS_BY_COLUMN.get(column_name)
+    return nutrient.label if nutrient else column_name
+
 def get_chart_colors(category='default'):
     """
     Retorna paleta de cores para uma categoria específica
@@ -287,6 +394,11 @@ def get_nutrient_color(nutrient_name):
     """
     Retorna cor específica para um nutriente baseado no nome
     """
+    # Rótulos do registro com cor própria
+    color = _COLORS_BY_LABEL.get(nutrient_name)
+    if color:
+        return color
+    
     nutrient_lower = nutrient_name.lower()
     
     # Carboidrato - sempre verde
@@ -2,6 +2,8 @@
 Sistema de paleta de cores por slot (alimento1/alimento2)
 """
 
+from typing import List
+
 # Gradientes por slot
 GRADIENTS = {
     'left': ('#667EEA', '#764BA2'),    # Roxo/azul para alimento1
@@ -26,6 +28,20 @@ SOLID_COLORS = {
     'right': '#34D399'     # Verde sólido para alimento2
 }
 
+# Paleta para a comparação de N alimentos (3 a 10): começa pelas cores dos slots
+MULTI_COLORS = [
+    '#667EEA',     # Azul (alimento1)
+    '#34D399',     # Verde (alimento2)
+    '#F472B6',     # Rosa
+    '#FBBF24',     # Amarelo
+    '#F87171',     # Vermelho
+    '#22D3EE',     # Ciano
+    '#A78BFA',     # Lilás
+    '#FB923C',     # Laranja
+    '#A3E635',     # Lima
+    '#94A3B8'      # Cinza
+]
+
 def get_slot_gradient(slot):
     """
     Retorna gradiente para um slot específico
@@ -60,3 +76,15 @@ def get_slot_colors(slot):
         'secondary': get_slot_secondary(slot),
         'solid': get_slot_solid(slot)
     }
+
+def get_multi_color(index):
+    """
+    Retorna a cor do i-ésimo alimento na comparação múltipla
+    """
+    return MULTI_COLORS[index % len(MULTI_COLORS)]
+
+def get_multi_colors(count) -> List[str]:
+    """
+    Retorna as cores dos `count` primeiros alimentos na comparação múltipla
+    """
+    return [get_multi_color(i) for i in range(count)]
@@ -0,0 +1,335 @@
+"""
+Resultado de uma comparação entre alimentos: dados de todas as seções e tabelas memoizadas.
+
+compute_sections lê todos os nutrientes do registro dos N alimentos em uma
+única passada (um gather na matriz do FoodStore) e deriva, por seção, valores
+limpos, máscara de validade, textos formatados e o limite do eixo Y (as
+diferenças entre alimentos saem do payload sob demanda). ComparisonResult guarda
+esse resultado para um par de alimentos e monta cada tabela (categoria de
+micronutrientes, Complexo B, frações...) a partir dos textos já formatados, na
+primeira leitura; os gráficos pareados recortam os valores dele. As seções da UI
+apenas consomem o que ele entrega. Os resultados são compartilhados entre
+sessões: quem os recebe não deve alterá-los.
+"""
+
+import threading
+from collections import Counter, OrderedDict
+from typing import NamedTuple
+
+import numpy as np
+import pandas as pd
+
+from config.settings import COMPARISON_CACHE_SIZE, NUMBER_FORMAT
+from data.store import FoodRow
+from domain.nutrients import (
+    AMINO_CATEGORY, BASIC_CATEGORY, LIPID_CATEGORY, MACROS_CATEGORY, NUTRIENT_REGISTRY, SCALE_GROUPS,
+    get_complexo_b_mapping, get_micronutrient_categories, section_groups
+)
+from logic.compute import format_columns, nutrient_matrix
+from logic.percentiles import percentile_badges
+from logic.profiling import profiled
+
+_cache = OrderedDict()
+_cache_lock = threading.Lock()
+
+# Todas as colunas do registro, lidas de uma vez; cada seção é um recorte por posição
+_COLUMNS = tuple(n.column for n in NUTRIENT_REGISTRY)
+_GROUPS = section_groups()
+_SECTIONS = {
+    name: np.array([_COLUMNS.index(col) for col in columns], dtype=np.intp)
+    for name, columns in _GROUPS.items()
+}
+
+# Coluna do registro → (seção da sua categoria, posição na seção)
+_LOCATIONS = {
+    column: (category, i)
+    for category in dict.fromkeys(n.category for n in NUTRIENT_REGISTRY)
+    for i, column in enumerate(_GROUPS[category])
+}
+
+class SectionPayload(NamedTuple):
+    """
+    Dados de uma seção para N alimentos (linhas na ordem dos alimentos).
+    Ausentes, nulos e negativos são NaN em `values` e falsos em `valid`.
+    """
+    name: str
+    columns: tuple
+    labels: tuple
+    units: tuple
+    values: np.ndarray
+    valid: np.ndarray
+    formatted: tuple
+    upper_limit: float
+
+    def nutrient(self, column):
+        """
+        (rótulo, unidade) de uma coluna da seção
+        """
+        i = self.columns.index(column)
+        return self.labels[i], self.units[i]
+
+    def mapping(self):
+        """
+        {rótulo: coluna} das colunas com dado em pelo menos um alimento
+        """
+        present = self.valid.any(axis=0)
+        return {label: col for label, col, keep in zip(self.labels, self.columns, present) if keep}
+
+    def differences(self):
+        """
+        Diferença de cada alimento para o primeiro (NaN se algum dos dois não tem dado)
+        """
+        return self.values - self.values[:1] if len(self.values) else self.values
+
+@profiled
+def compute_sections(rows):
+    """
+    Calcula os dados de todas as seções do registro para N alimentos em uma passada.
+    
+    Args:
+        rows: Sequência de FoodRow (ou DataFrames de uma linha)
+        
+    Returns:
+        dict: {seção: SectionPayload}, com as categorias do registro e os grupos de escala
+    """
+    values = nutrient_matrix(rows, _COLUMNS)
+    with np.errstate(invalid='ignore'):
+        valid = values > 0
+    values = np.where(valid, values, np.nan)
+    
+    # Textos formatados com o formatador de cada coluna no registro (ausentes viram o texto de N/A)
+    formatted = np.empty(values.shape, dtype=object)
+    formatted[:] = format_columns(values, _COLUMNS, na=NUMBER_FORMAT['na_value'])
+    
+    sections = {}
+    for name, positions in _SECTIONS.items():
+        section_values = values[:, positions]
+        section_valid = valid[:, positions]
+        max_value = float(section_values[section_valid].max()) if section_valid.any() else 0
+        columns = tuple(_COLUMNS[p] for p in positions)
+        nutrients = [NUTRIENT_REGISTRY[p] for p in positions]
+        sections[name] = SectionPayload(
+            name,
+            columns,
+            tuple(n.label for n in nutrients),
+            tuple(n.unit for n in nutrients),
+            section_values,
+            section_valid,
+            tuple(tuple(row) for row in formatted[:, positions].tolist()),
+            max_value * 1.1
+        )
+    return sections
+
+class ComparisonResult:
+    """
+    Par de alimentos comparados. Os dados das seções e as tabelas são
+    materializados sob demanda (uma construção cada) e mantidos pelo tempo de
+    vida do objeto.
+    """
+
+    __slots__ = ('data1', 'data2', 'food1', 'food2', 'builds', '_tables', '_lock')
+
+    def __init__(self, data1, data2, food1, food2):
+        self.data1 = data1
+        self.data2 = data2
+        self.food1 = food1
+        self.food2 = food2
+        # Construções por tabela (conferidas em benchmarks/bench_tables.py)
+        self.builds = Counter()
+        self._tables = {}
+        self._lock = threading.RLock()
+
+    def __repr__(self):
+        return f"ComparisonResult({self.food1!r}, {self.food2!r}, tabelas={len(self._tables)})"
+
+    def _memo(self, name, build):
+        table = self._tables.get(name)
+        if table is not None:
+            return table
+        # Um lock por par: sessões simultâneas com o mesmo par constroem a tabela uma vez
+        # (reentrante: as tabelas leem as seções, memoizadas pelo mesmo lock)
+        with self._lock:
+            table = self._tables.get(name)
+            if table is None:
+                table = build()
+                self.builds[name] += 1
+                self._tables[name] = table
+        return table
+
+    @property
+    def sections(self):
+        """
+        {seção: SectionPayload} do par, calculado em uma única passada
+        """
+        return self._memo('secoes', lambda: compute_sections((self.data1, self.data2)))
+
+    def section(self, name):
+        return self.sections[name]
+
+    @property
+    def upper_limits(self):
+        """
+        Limite do eixo Y por grupo de escala (chaves de SCALE_GROUPS)
+        """
+        sections = self.sections
+        return {group: sections[group].upper_limit for group in SCALE_GROUPS}
+
+    def values(self, columns):
+        """
+        Valores limpos (NaN sem dado) dos dois alimentos para colunas do registro,
+        recortados das seções já calculadas.
+        
+        Returns:
+            np.ndarray com shape (2, len(columns))
+        """
+        sections = self.sections
+        values = np.empty((2, len(columns)))
+        for j, column in enumerate(columns):
+            name, i = _LOCATIONS[column]
+            values[:, j] = sections[name].values[:, i]
+        return values
+
+    def _same_store(self):
+        return (isinstance(self.data1, FoodRow) and isinstance(self.data2, FoodRow)
+                and self.data1.store is self.data2.store)
+
+    def has_data(self, *columns, food=None):
+        """
+        True se alguma das colunas tem valor > 0 no alimento `food` (0 ou 1) ou,
+        sem `food`, em qualquer um dos dois. Com FoodRows, consulta a bitmask de
+        presença do FoodStore, sem ler a matriz.
+        """
+        rows = (self.data1, self.data2) if food is None else ((self.data1, self.data2)[food],)
+        if self._same_store():
+            return bool(self.data1.store.has_data(rows, columns).any())
+        with np.errstate(invalid='ignore'):
+            return bool((nutrient_matrix(rows, columns) > 0).any())
+
+    def coverage(self, sections):
+        """
+        Cobertura das seções do registro em cada alimento.
+        
+        Returns:
+            list: [(nutrientes com dado, total de nutrientes)] para os dois alimentos
+        """
+        filled = np.zeros(2, dtype=np.int64)
+        total = 0
+        for name in sections:
+            if self._same_store():
+                counts, size = self.data1.store.coverage((self.data1, self.data2), name)
+            else:
+                payload = self.section(name)
+                counts, size = payload.valid.sum(axis=1), len(payload.columns)
+            filled += counts
+            total += size
+        return [(int(count), total) for count in filled]
+
+    def _section_table(self, names, labels=None, badges=False):
+        """
+        Tabela pareada (Nutriente, alimento 1, alimento 2) com os textos já
+        formatados das seções, sem as linhas sem dado nos dois alimentos.
+        
+        Args:
+            names: Seções, na ordem das linhas
+            labels: {coluna: rótulo} para substituir os rótulos do registro (opcional)
+            badges: Acrescenta o badge de percentil aos valores com dado
+        """
+        labels = labels or {}
+        rows = []
+        for name in names:
+            payload = self.section(name)
+            keep = np.flatnonzero(payload.valid.any(axis=0)).tolist()
+            if not keep:
+                continue
+            columns = [payload.columns[j] for j in keep]
+            text = [[payload.formatted[i][j] for j in keep] for i in range(2)]
+            if badges:
+                for i, data in enumerate((self.data1, self.data2)):
+                    for k, badge in enumerate(percentile_badges(data, columns)):
+                        if badge and payload.valid[i, keep[k]]:
+                            text[i][k] = f"{text[i][k]} {badge}"
+            row_labels = [labels.get(col, payload.labels[j]) for col, j in zip(columns, keep)]
+            rows.extend(zip(row_labels, text[0], text[1]))
+        if not rows:
+            return pd.DataFrame()
+        return pd.DataFrame(rows, columns=['Nutriente', self.food1, self.food2])
+
+    def micronutrient_table(self, category, badges=False):
+        """
+        Tabela pareada de uma categoria de micronutrientes (DataFrame vazio se a categoria não existir)
+        """
+        def build():
+            if category not in get_micronutrient_categories():
+                return pd.DataFrame()
+            return self._section_table((category,), badges=badges)
+        return self._memo(('micro', category, badges), build)
+
+    def micronutrient_tables(self, badges=False):
+        """
+        Todas as categorias não vazias {categoria: tabela} (mesmo formato de create_micronutrient_tables)
+        """
+        result = {}
+        for category in get_micronutrient_categories():
+            table = self.micronutrient_table(category, badges)
+            if not table.empty:
+                result[category] = table
+        return result
+
+    def complexo_b_table(self, badges=False):
+        def build():
+            labels = {column: label for label, (column, _) in get_complexo_b_mapping().items()}
+            return self._section_table(('Complexo B',), labels=labels, badges=badges)
+        return self._memo(('complexo_b', badges), build)
+
+    def lipid_fractions_table(self):
+        return self._memo('fracoes_lipidios', lambda: self._section_table((LIPID_CATEGORY,)))
+
+    def protein_fractions_table(self):
+        return self._memo('fracoes_proteinas', lambda: self._section_table((AMINO_CATEGORY,)))
+
+    def macronutrient_table(self):
+        return self._memo('macronutrientes', lambda: self._section_table((MACROS_CATEGORY, BASIC_CATEGORY)))
+
+def _identity(data):
+    """
+    Identidade estável de um alimento (versão do dataset + chave + impressão dos
+    valores), ou None para entradas sem identidade (ex.: DataFrame). A versão entra
+    porque os badges de percentil dependem do dataset inteiro, não só da linha.
+    """
+    if isinstance(data, FoodRow):
+        return data.store.version, data.key, data.digest
+    return None
+
+def get_comparison(data1, data2, food1, food2):
+    """
+    Retorna o ComparisonResult do par, reaproveitando o existente (cache LRU
+    compartilhado, COMPARISON_CACHE_SIZE pares). Entradas sem identidade
+    estável (DataFrames) recebem um resultado novo, sem cache.
+    """
+    id1, id2 = _identity(data1), _identity(data2)
+    if id1 is None or id2 is None:
+        return ComparisonResult(data1, data2, food1, food2)
+
+    key = (id1, id2, food1, food2)
+    with _cache_lock:
+        result = _cache.get(key)
+        if result is not None:
+            _cache.move_to_end(key)
+            return result
+        result = _cache[key] = ComparisonResult(data1, data2, food1, food2)
+        while len(_cache) > COMPARISON_CACHE_SIZE:
+            _cache.popitem(last=False)
+    return result
+
+def clear_comparisons(keep_version=None):
+    """
+    Esvazia o cache de comparações. Com `keep_version`, remove apenas os pares de
+    outras versões do dataset (chamado na recarga a quente: as comparações antigas
+    mantêm viva a matriz da versão anterior).
+    """
+    with _cache_lock:
+        if keep_version is None:
+            _cache.clear()
+            return
+        for key in [key for key in _cache if key[0][0] != keep_version or key[1][0] != keep_version]:
+            del _cache[key]
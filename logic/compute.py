@@ -2,9 +2,12 @@
 Funcoes puras para calculos e formatacao
 """
 
+import numpy as np
 import pandas as pd
 from config.settings import NUMBER_FORMAT
+from domain.nutrients import FORMAT_FRACTION, FORMAT_NUMBER, NUTRIENTS_BY_COLUMN
 from domain.palette import get_slot_colors, get_slot_solid
+from data.store import FoodRow
 
 def format_number(value):
     """
@@ -27,6 +30,99 @@ def format_fractions(value):
     
     return f"{value:.3f}"
 
+def format_values(values, formatter=format_number, na="N/A"):
+    """
+    Formata uma matriz de valores (alimentos × nutrientes) com a semântica de
+    format_number/format_fractions em uma única passada sobre a lista de floats,
+    com o operador % direto e sem as checagens por valor do formatador
+    (np.char.mod também formata item a item e é mais lento).
+    
+    Args:
+        values: Array 2D de floats (NaN para ausentes)
+        formatter: format_number, format_fractions ou outra função valor → str
+        na: Texto para valores ausentes, nulos ou não positivos
+        
+    Returns:
+        Lista de listas de strings, uma por linha de `values`
+    """
+    rows = np.atleast_2d(np.asarray(values, dtype=np.float64)).tolist()
+    
+    # `v > 0` é falso para NaN: ausentes e não positivos viram `na`
+    if formatter is format_number:
+        small = f"%.{NUMBER_FORMAT['decimal_places']}f"
+        return [
+            [(small % v if v < 1000 else format_number(v)) if v > 0 else na for v in row]
+            for row in rows
+        ]
+    if formatter is format_fractions:
+        return [["%.3f" % v if v > 0 else na for v in row] for row in rows]
+    return [[formatter(v) if v > 0 else na for v in row] for row in rows]
+
+# Nome do formatador no registro → função
+_FORMATTERS = {FORMAT_NUMBER: format_number, FORMAT_FRACTION: format_fractions}
+
+def registry_formatter(column):
+    """
+    Formatador da coluna segundo o registro (format_number para colunas fora dele)
+    """
+    nutrient = NUTRIENTS_BY_COLUMN.get(column)
+    return _FORMATTERS[nutrient.formatter] if nutrient else format_number
+
+def format_columns(values, columns, na="N/A"):
+    """
+    Formata uma matriz (alimentos × colunas) com o formatador de cada coluna no
+    registro: uma chamada de format_values por formatador presente.
+    
+    Args:
+        values: Array 2D de floats (NaN para ausentes)
+        columns: Colunas de `values`, na ordem
+        na: Texto para valores ausentes, nulos ou não positivos
+        
+    Returns:
+        Lista de listas de strings, uma por linha de `values`
+    """
+    values = np.atleast_2d(np.asarray(values, dtype=np.float64))
+    formatters = [registry_formatter(column) for column in columns]
+    if len(set(formatters)) <= 1:
+        return format_values(values, formatters[0] if formatters else format_number, na=na)
+    
+    text = np.empty(values.shape, dtype=object)
+    for formatter in set(formatters):
+        mask = np.array([f is formatter for f in formatters])
+        text[:, mask] = format_values(values[:, mask], formatter, na=na)
+    return text.tolist()
+
+def nutrient_matrix(rows, columns):
+    """
+    Valores (float64) de vários alimentos para as colunas informadas, com NaN
+    para colunas ausentes, nulas ou negativas. FoodRows do mesmo FoodStore
+    são lidos com um único gather na matriz.
+    
+    Args:
+        rows: Sequência de FoodRow (ou DataFrames de uma linha)
+        columns: Sequência de nomes de colunas
+        
+    Returns:
+        np.ndarray com shape (len(rows), len(columns))
+    """
+    rows = list(rows)
+    columns = list(columns)
+    stores = {id(row.store) for row in rows if isinstance(row, FoodRow)}
+    if rows and len(stores) == 1 and all(isinstance(row, FoodRow) for row in rows):
+        values = rows[0].store.gather(rows, columns).astype(np.float64)
+    else:
+        values = np.full((len(rows), len(columns)), np.nan)
+        for i, row in enumerate(rows):
+            if isinstance(row, FoodRow):
+                values[i] = row.store.gather([row], columns)[0]
+            elif row is not None and not row.empty:
+                # Só as colunas pedidas (ausentes → NaN) da primeira linha do DataFrame
+                series = pd.to_numeric(row.reindex(columns=columns).iloc[0], errors='coerce')
+                values[i] = series.to_numpy(dtype=np.float64, na_value=np.nan)
+    
+    values[values < 0] = np.nan
+    return values
+
 def calculate_macro_percentages(carb, lip, prot):
     """
     Calcula percentuais de macronutrientes
@@ -57,6 +153,12 @@ def dynamic_upper_limit(df1, df2, columns, margin=0.1):
     """
     max_value = 0
     
+    # Visões do FoodStore: leitura direta da matriz
+    if isinstance(df1, FoodRow) and isinstance(df2, FoodRow):
+        for column in columns:
+            max_value = max(max_value, df1.nutrient(column), df2.nutrient(column))
+        return max_value * (1 + margin)
+    
     for column in columns:
         if column in df1.columns:
             value1 = df1[column].iloc[0]
@@ -95,6 +197,9 @@ def get_nutrient_value(data, column, default=0):
     """
     Obtem valor de um nutriente com valor padrao
     """
+    if isinstance(data, FoodRow):
+        return data.nutrient(column, default)
+    
     if data is None or data.empty or column not in data.columns:
         return default
     
@@ -154,11 +259,16 @@ def get_basic_metrics(data):
     """
     Obtem metricas basicas de um alimento
     """
+    if isinstance(data, FoodRow):
+        grupo = data['grupo'] if 'grupo' in data else "Nao informado"
+    else:
+        grupo = data['grupo'].iloc[0] if not data.empty and 'grupo' in data.columns else "Nao informado"
+    
     return {
         'energia': get_nutrient_value(data, 'energia_kcal'),
         'fibra': get_nutrient_value(data, 'fibra_alimentar_g'),
         'agua': get_nutrient_value(data, 'umidade_pct'),
-        'grupo': data['grupo'].iloc[0] if not data.empty and 'grupo' in data.columns else "Nao informado"
+        'grupo': grupo
     }
 
 def get_slot_scale(slot):
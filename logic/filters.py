@@ -2,9 +2,118 @@
 Funções puras para filtros e manipulação de dados
 """
 
+import threading
+import numpy as np
 import pandas as pd
+from collections import OrderedDict
 from typing import List, Optional, Union
+from data.store import FoodStore, FoodRow
+from logic.profiling import profiled
 
+class GroupIndex:
+    """
+    Índice invertido grupo → posições (já ordenadas) dos nomes de alimentos.
+    
+    Os nomes únicos são ordenados uma única vez; cada grupo guarda o array
+    ordenado das posições dos seus nomes nessa ordem. Uma combinação de chips
+    é respondida marcando os arrays dos grupos em um bitmap e lendo as posições
+    marcadas, que já saem em ordem alfabética (sem sort por consulta).
+    Com `keys` (uma chave por linha, nomes únicos), `keys_for` responde com as
+    chaves na mesma ordem dos nomes.
+    """
+    
+    CACHE_SIZE = 64
+    
+    def __init__(self, names, groups, keys=None):
+        names = np.asarray(names, dtype=object)
+        groups = np.asarray(groups, dtype=object)
+        
+        valid = np.array([isinstance(n, str) and bool(n.strip()) for n in names], dtype=bool)
+        self.sorted_names, first, inverse = np.unique(names[valid].astype(str), return_index=True, return_inverse=True)
+        self.sorted_names = self.sorted_names.astype(object)
+        self.sorted_keys = None
+        if keys is not None:
+            self.sorted_keys = np.asarray(keys, dtype=object)[valid][first]
+        
+        # Linha do FoodStore → posição do nome em sorted_names (-1 para nomes inválidos)
+        self.row_rank = np.full(len(names), -1, dtype=np.intp)
+        self.row_rank[valid] = inverse
+        
+        valid_groups = groups[valid]
+        self.by_group = {}
+        for group in pd.unique(valid_groups):
+            if not isinstance(group, str) or not group.strip():
+                continue
+            self.by_group[group] = np.unique(inverse[valid_groups == group])
+        
+        self.groups = sorted(self.by_group)
+        # Compartilhado entre sessões (FoodStore em st.cache_resource)
+        self._cache = OrderedDict()
+        self._cache_lock = threading.Lock()
+    
+    def names_for(self, groups: Optional[List[str]] = None, rows: Optional[np.ndarray] = None) -> List[str]:
+        """
+        Retorna os nomes (únicos, ordenados) dos alimentos nos grupos informados.
+        Sem grupos, retorna todos os alimentos. Com `rows` (posições de linha,
+        ex.: resultado do filtro por faixas de nutrientes), mantém apenas esses alimentos.
+        """
+        return self._select(self.sorted_names, groups, rows)
+    
+    def keys_for(self, groups: Optional[List[str]] = None, rows: Optional[np.ndarray] = None) -> List[str]:
+        """
+        Como `names_for`, mas retorna as chaves dos alimentos (na ordem dos nomes)
+        """
+        if self.sorted_keys is None:
+            raise ValueError("GroupIndex construído sem chaves")
+        return self._select(self.sorted_keys, groups, rows)
+    
+    def _select(self, values, groups, rows):
+        key = frozenset(groups) if groups else frozenset()
+        if rows is not None:
+            allowed = np.zeros(len(self.sorted_names), dtype=bool)
+            ranks = self.row_rank[rows]
+            allowed[ranks[ranks >= 0]] = True
+            group_ranks = self._group_ranks(key)
+            if isinstance(group_ranks, slice):
+                return values[allowed].tolist()
+            return values[group_ranks[allowed[group_ranks]]].tolist()
+        
+        cache_key = (values is self.sorted_keys, key)
+        with self._cache_lock:
+            cached = self._cache.get(cache_key)
+            if cached is not None:
+                self._cache.move_to_end(cache_key)
+                return list(cached)
+        
+        result = values[self._group_ranks(key)].tolist()
+        with self._cache_lock:
+            self._cache[cache_key] = result
+            self._cache.move_to_end(cache_key)
+            while len(self._cache) > self.CACHE_SIZE:
+                self._cache.popitem(last=False)
+        return list(result)
+    
+    def _group_ranks(self, key):
+        """
+        Posições ordenadas (em sorted_names) dos nomes nos grupos de `key`
+        """
+        if not key:
+            ranks = slice(None)
+        else:
+            arrays = [self.by_group[g] for g in key if g in self.by_group]
+            if not arrays:
+                ranks = np.empty(0, dtype=np.intp)
+            elif len(arrays) == 1:
+                ranks = arrays[0]
+            else:
+                # União de listas pré-ordenadas via bitmap: O(n) e já em ordem
+                bitmap = np.zeros(len(self.sorted_names), dtype=bool)
+                for array in arrays:
+                    bitmap[array] = True
+                ranks = np.flatnonzero(bitmap)
+        return ranks
+
+@profiled
 def filter_foods_by_groups(df: pd.DataFrame, groups: List[str]) -> pd.DataFrame:
     """
     Filtra alimentos por grupos selecionados.
@@ -21,6 +130,7 @@ def filter_foods_by_groups(df: pd.DataFrame, groups: List[str]) -> pd.DataFrame:
     
     return df[df['grupo'].isin(groups)]
 
+@profiled
 def row_by_food(df: pd.DataFrame, food_name: str) -> pd.DataFrame:
     """
     Retorna uma linha específica do DataFrame baseada no nome do alimento.
@@ -38,20 +148,46 @@ def row_by_food(df: pd.DataFrame, food_name: str) -> pd.DataFrame:
     filtered = df[df['alimento'] == food_name]
     return filtered.copy()
 
-def get_food_names(df: pd.DataFrame, groups: Optional[List[str]] = None) -> List[str]:
+@profiled
+def row_view_by_food(store: FoodStore, food_name: str) -> Optional[FoodRow]:
+    """
+    Retorna a visão de linha (FoodRow) de um alimento via índice O(1).
+    
+    Args:
+        store: FoodStore com a matriz de nutrientes
+        food_name: Chave canônica do alimento (rótulo ou nome também são aceitos)
+        
+    Returns:
+        FoodRow do alimento, ou None se não existir
+    """
+    if store is None or not food_name:
+        return None
+    
+    return store.row(food_name)
+
+@profiled
+def get_food_names(df: pd.DataFrame, groups: Optional[List[str]] = None, rows: Optional[np.ndarray] = None) -> List[str]:
     """
     Retorna lista de nomes de alimentos, opcionalmente filtrados por grupos.
     
     Args:
-        df: DataFrame com dados nutricionais
+        df: DataFrame com dados nutricionais (ou FoodStore, que usa o índice de grupos)
         groups: Lista opcional de grupos para filtrar
+        rows: Posições de linha permitidas (ex.: resultado de logic.query.filter_rows)
         
     Returns:
         Lista de nomes de alimentos únicos, ordenados alfabeticamente
+        (com um FoodStore, nomes repetidos vêm desambiguados pela fonte)
     """
+    if isinstance(df, FoodStore):
+        return df.group_index.names_for(groups, rows=rows)
+    
     if df.empty or 'alimento' not in df.columns:
         return []
     
+    if rows is not None:
+        df = df.iloc[rows]
+    
     if groups:
         filtered_df = filter_foods_by_groups(df, groups)
     else:
@@ -60,6 +196,23 @@ def get_food_names(df: pd.DataFrame, groups: Optional[List[str]] = None) -> List
     food_names = filtered_df['alimento'].dropna().unique()
     return sorted([name for name in food_names if name and str(name).strip()])
 
+@profiled
+def get_food_keys(store: FoodStore, groups: Optional[List[str]] = None, rows: Optional[np.ndarray] = None) -> List[str]:
+    """
+    Retorna as chaves canônicas dos alimentos (ordem alfabética dos rótulos),
+    opcionalmente filtradas por grupos e por posições de linha.
+    
+    Args:
+        store: FoodStore com o índice de grupos
+        groups: Lista opcional de grupos para filtrar
+        rows: Posições de linha permitidas (ex.: resultado de logic.query.filter_rows)
+        
+    Returns:
+        Lista de chaves "<tabela_fonte>:<alimento_id>" (ver data.store.food_identities)
+    """
+    return store.group_index.keys_for(groups, rows=rows)
+
+@profiled
 def get_available_groups(df: pd.DataFrame) -> List[str]:
     """
     Retorna lista de grupos únicos disponíveis no DataFrame.
@@ -70,12 +223,16 @@ def get_available_groups(df: pd.DataFrame) -> List[str]:
     Returns:
         Lista de grupos únicos, ordenados alfabeticamente
     """
+    if isinstance(df, FoodStore):
+        return list(df.group_index.groups)
+    
     if df.empty or 'grupo' not in df.columns:
         return []
     
     groups = df['grupo'].dropna().unique()
     return sorted([group for group in groups if group and str(group).strip()])
 
+@profiled
 def validate_food_exists(df: pd.DataFrame, food_name: str) -> bool:
     """
     Verifica se um alimento existe no DataFrame.
@@ -92,6 +249,7 @@ def validate_food_exists(df: pd.DataFrame, food_name: str) -> bool:
     
     return food_name in df['alimento'].values
 
+@profiled
 def get_food_count_by_group(df: pd.DataFrame, group: str) -> int:
     """
     Retorna o número de alimentos em um grupo específico.
@@ -108,6 +266,7 @@ def get_food_count_by_group(df: pd.DataFrame, group: str) -> int:
     
     return len(df[df['grupo'] == group])
 
+@profiled
 def get_groups_with_counts(df: pd.DataFrame) -> dict[str, int]:
     """
     Retorna dicionário com grupos e seus respectivos números de alimentos.
@@ -124,9 +283,10 @@ def get_groups_with_counts(df: pd.DataFrame) -> dict[str, int]:
     group_counts = df['grupo'].value_counts().to_dict()
     return {group: count for group, count in group_counts.items() if group and str(group).strip()}
 
+@profiled
 def filter_foods_by_name(df: pd.DataFrame, search_term: str) -> pd.DataFrame:
     """
-    Filtra alimentos por termo de busca no nome.
+    Filtra alimentos por termo de busca no nome (insensível a acentos).
     
     Args:
         df: DataFrame com dados nutricionais
@@ -138,22 +298,49 @@ def filter_foods_by_name(df: pd.DataFrame, search_term: str) -> pd.DataFrame:
     if df.empty or not search_term or 'alimento' not in df.columns:
         return df
     
-    search_lower = search_term.lower()
-    mask = df['alimento'].str.lower().str.contains(search_lower, na=False)
+    from logic.search import fold_text
+    folded_term = fold_text(search_term)
+    mask = df['alimento'].map(fold_text).str.contains(folded_term, regex=False, na=False)
     return df[mask]
 
+@profiled
+def search_food_labels(store: FoodStore, search_term: str) -> List[str]:
+    """
+    Rótulos dos alimentos do FoodStore que casam com o termo, ranqueados pelo
+    índice de trigramas (sem termo, todos os nomes em ordem alfabética).
+    
+    Args:
+        store: FoodStore com o índice de busca
+        search_term: Termo para buscar no nome do alimento
+        
+    Returns:
+        Lista de rótulos de exibição
+    """
+    if not search_term:
+        return get_food_names(store)
+    from logic.search import search_foods
+    return [store.label_for(key) for key in search_foods(store, search_term, limit=None)]
+
+@profiled
 def get_food_nutritional_data(df: pd.DataFrame, food_name: str, nutrients: List[str]) -> dict:
     """
     Retorna dados nutricionais específicos de um alimento.
     
     Args:
-        df: DataFrame com dados nutricionais
+        df: DataFrame com dados nutricionais (ou FoodStore)
         food_name: Nome do alimento
         nutrients: Lista de colunas de nutrientes
         
     Returns:
         Dicionário com {nutriente: valor}
     """
+    if isinstance(df, FoodStore):
+        row = row_view_by_food(df, food_name)
+        if row is None or not nutrients:
+            return {}
+        values = {nutrient: row.raw(nutrient) for nutrient in nutrients if nutrient in row}
+        return {nutrient: value if not pd.isna(value) else 0 for nutrient, value in values.items()}
+    
     if df.empty or not food_name or not nutrients:
         return {}
     
@@ -169,6 +356,7 @@ def get_food_nutritional_data(df: pd.DataFrame, food_name: str, nutrients: List[
     
     return result
 
+@profiled
 def compare_foods_nutrition(df: pd.DataFrame, food1: str, food2: str, nutrients: List[str]) -> pd.DataFrame:
     """
     Compara dados nutricionais de dois alimentos.
@@ -202,6 +390,7 @@ def compare_foods_nutrition(df: pd.DataFrame, food1: str, food2: str, nutrients:
     
     return pd.DataFrame(comparison_data)
 
+@profiled
 def get_food_groups_summary(df: pd.DataFrame) -> pd.DataFrame:
     """
     Retorna resumo dos grupos de alimentos com estatísticas.
@@ -0,0 +1,165 @@
+"""
+Ranks percentis de cada alimento por nutriente (no catálogo e dentro do grupo)
+"""
+
+import numpy as np
+from typing import Optional
+
+# Valor armazenado quando o alimento não tem o nutriente
+MISSING_PERCENTILE = 255
+
+# Grupos menores que isso usam o percentil do catálogo no badge
+MIN_GROUP_SIZE = 5
+
+def _percentile_ranks(values, keys=None):
+    """
+    Percentil (0-100, ranks médios para empates) de cada valor não nulo.
+    Com `keys`, o rank é calculado dentro de cada chave (grupo).
+
+    Todos os valores são ordenados uma única vez; a contagem de "menores" e
+    "menores ou iguais" de cada elemento vem de searchsorted sobre a chave
+    combinada (grupo, posição global), sem laço por grupo.
+    """
+    n = len(values)
+    result = np.full(n, MISSING_PERCENTILE, dtype=np.uint8)
+    valid = ~np.isnan(values)
+    if not valid.any():
+        return result
+
+    sorted_values = np.sort(values[valid])
+    below = np.searchsorted(sorted_values, values[valid], side='left')
+    at_or_below = np.searchsorted(sorted_values, values[valid], side='right')
+
+    if keys is None:
+        total = len(sorted_values)
+        counts_lt, counts_le, sizes = below, at_or_below, total
+    else:
+        # Chave combinada: grupo em ordem maior, posição global em ordem menor
+        stride = len(sorted_values) + 1
+        group_keys = keys[valid].astype(np.int64) * stride
+        combined = np.sort(group_keys + at_or_below)
+        group_start = np.searchsorted(combined, group_keys, side='left')
+        group_end = np.searchsorted(combined, group_keys + stride, side='left')
+        counts_lt = np.searchsorted(combined, group_keys + below, side='right') - group_start
+        counts_le = np.searchsorted(combined, group_keys + at_or_below, side='right') - group_start
+        sizes = group_end - group_start
+
+    pct = 100.0 * (counts_lt + counts_le) / (2.0 * sizes)
+    result[valid] = np.clip(np.rint(pct), 0, 100).astype(np.uint8)
+    return result
+
+class PercentileIndex:
+    """
+    Matrizes uint8 (alimentos × nutrientes) com o percentil de cada valor no
+    catálogo inteiro e dentro do grupo do alimento, calculadas uma única vez
+    por versão do dataset. Valores negativos são tratados como ausentes.
+    """
+
+    def __init__(self, matrix, groups=None):
+        values = np.asarray(matrix, dtype=np.float32)
+        values = np.where(values < 0, np.nan, values)
+        n_rows, n_cols = values.shape
+
+        self.groups = np.asarray(groups, dtype=object) if groups is not None else None
+        codes = None
+        self.group_sizes = {}
+        if self.groups is not None and n_rows:
+            labels = np.array([g if isinstance(g, str) else '' for g in self.groups], dtype=object)
+            categories, codes = np.unique(labels, return_inverse=True)
+            counts = np.bincount(codes, minlength=len(categories))
+            self.group_sizes = {c: int(counts[i]) for i, c in enumerate(categories) if c}
+
+        self.global_pct = np.empty((n_rows, n_cols), dtype=np.uint8)
+        self.group_pct = np.empty((n_rows, n_cols), dtype=np.uint8)
+        for pos in range(n_cols):
+            column = np.ascontiguousarray(values[:, pos])
+            self.global_pct[:, pos] = _percentile_ranks(column)
+            self.group_pct[:, pos] = _percentile_ranks(column, codes) if codes is not None else MISSING_PERCENTILE
+
+    def lookup(self, row: int, pos: int) -> tuple:
+        """
+        Retorna (percentil no catálogo, percentil no grupo); None quando ausente
+        """
+        global_pct = int(self.global_pct[row, pos])
+        group_pct = int(self.group_pct[row, pos])
+        return (
+            None if global_pct == MISSING_PERCENTILE else global_pct,
+            None if group_pct == MISSING_PERCENTILE else group_pct
+        )
+
+def get_percentiles(data, column) -> Optional[dict]:
+    """
+    Percentis de um nutriente para uma visão de linha (FoodRow).
+
+    Args:
+        data: FoodRow do alimento
+        column: Coluna do nutriente
+
+    Returns:
+        Dicionário {global, grupo, nome_grupo, tamanho_grupo} ou None
+        (alimento sem o nutriente ou dados que não são FoodRow)
+    """
+    store = getattr(data, 'store', None)
+    if store is None:
+        return None
+    pos = store.col_pos.get(column)
+    if pos is None:
+        return None
+
+    index = store.percentile_index
+    global_pct, group_pct = index.lookup(data.index, pos)
+    if global_pct is None:
+        return None
+
+    group = index.groups[data.index] if index.groups is not None else None
+    return {
+        'global': global_pct,
+        'grupo': group_pct,
+        'nome_grupo': group if isinstance(group, str) else None,
+        'tamanho_grupo': index.group_sizes.get(group, 0)
+    }
+
+def percentile_badges(data, columns) -> list:
+    """
+    Badges HTML de percentil (ex.: "P92 em Leguminosa") de várias colunas de
+    um alimento, com os percentis lidos das matrizes em uma única indexação.
+    Usa o percentil do catálogo quando o grupo é pequeno demais.
+    
+    Returns:
+        Lista com um badge por coluna (string vazia quando não há percentil)
+    """
+    from config.settings import UI_CONFIG
+    
+    store = getattr(data, 'store', None)
+    if store is None:
+        return [''] * len(columns)
+    
+    index = store.percentile_index
+    positions = store.positions(columns)
+    safe = np.maximum(positions, 0)
+    global_pcts = index.global_pct[data.index, safe].tolist()
+    group_pcts = index.group_pct[data.index, safe].tolist()
+    
+    group = index.groups[data.index] if index.groups is not None else None
+    use_group = isinstance(group, str) and bool(group) and index.group_sizes.get(group, 0) >= MIN_GROUP_SIZE
+    
+    badges = []
+    for pos, global_pct, group_pct in zip(positions.tolist(), global_pcts, group_pcts):
+        if pos < 0 or global_pct == MISSING_PERCENTILE:
+            badges.append('')
+            continue
+        catalog_text = UI_CONFIG['percentile_badge_global'].format(pct=global_pct)
+        if use_group and group_pct != MISSING_PERCENTILE:
+            text = UI_CONFIG['percentile_badge'].format(pct=group_pct, grupo=group)
+        else:
+            text = catalog_text
+        badges.append(f'<span class="pct-badge" title="{catalog_text}">{text}</span>')
+    return badges
+
+def percentile_badge(data, column) -> str:
+    """
+    Badge HTML com o percentil do valor (ex.: "P92 em Leguminosa").
+    Usa o percentil do catálogo quando o grupo é pequeno demais.
+    Retorna string vazia quando não há percentil disponível.
+    """
+    return percentile_badges(data, [column])[0]
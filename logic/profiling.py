@@ -0,0 +1,207 @@
+"""
+Instrumentação opcional por rerun: tempo, número de chamadas e memória das funções críticas.
+
+Ativada com a variável de ambiente APP_PROFILING=1 (config.settings.PROFILING_ENABLED).
+Desativada, `profiled` devolve a própria função e `profile_rerun` não faz nada,
+de modo que o custo em produção é nulo.
+
+Cada rerun completo (app.py) abre um RerunProfile na thread do script; as funções
+decoradas chamadas durante o rerun acumulam nele suas estatísticas. Reexecuções
+de fragmentos não abrem um perfil e não são registradas. A memória é medida com
+tracemalloc (pico acima do início da chamada), que é global ao processo: com
+sessões simultâneas, os bytes de uma sessão incluem alocações das demais.
+"""
+
+import functools
+import json
+import logging
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from logging.handlers import RotatingFileHandler
+from pathlib import Path
+
+from config.settings import (
+    PROFILING_ENABLED, PROFILING_LOG_PATH, PROFILING_LOG_MAX_BYTES, PROFILING_LOG_BACKUPS
+)
+
+_local = threading.local()
+_logger_lock = threading.Lock()
+_logger = None
+
+class RerunProfile:
+    """
+    Estatísticas acumuladas de um rerun: {função: [chamadas, total ms, máximo ms, pico de bytes]}
+    """
+
+    __slots__ = ('label', 'started_at', 'wall_ms', 'stats', '_frames')
+
+    def __init__(self, label='rerun'):
+        self.label = label
+        self.started_at = datetime.now(timezone.utc)
+        self.wall_ms = 0.0
+        self.stats = {}
+        # Pilha de [memória no início, pico observado] das chamadas em andamento
+        self._frames = []
+
+    def enter(self):
+        """
+        Abre a medição de memória de uma chamada (aninhada ou não)
+        """
+        current, peak = tracemalloc.get_traced_memory()
+        if self._frames:
+            # O reset abaixo apagaria o pico já atingido pela chamada externa
+            parent = self._frames[-1]
+            parent[1] = max(parent[1], peak)
+        tracemalloc.reset_peak()
+        frame = [current, current]
+        self._frames.append(frame)
+        return frame
+
+    def exit(self, name, frame, elapsed_ms):
+        """
+        Fecha a chamada e acumula tempo e pico de memória em `name`
+        """
+        _, peak = tracemalloc.get_traced_memory()
+        frame[1] = max(frame[1], peak)
+        self._frames.pop()
+        if self._frames:
+            parent = self._frames[-1]
+            parent[1] = max(parent[1], frame[1])
+
+        self.add(name, elapsed_ms, frame[1] - frame[0])
+
+    def add(self, name, elapsed_ms, peak_bytes=0):
+        """
+        Acumula uma medição já feita (ex.: tarefa executada em outra thread) em `name`
+        """
+        entry = self.stats.get(name)
+        if entry is None:
+            entry = self.stats[name] = [0, 0.0, 0.0, 0]
+        entry[0] += 1
+        entry[1] += elapsed_ms
+        entry[2] = max(entry[2], elapsed_ms)
+        entry[3] = max(entry[3], peak_bytes)
+
+    def summary(self):
+        """
+        Lista de {funcao, chamadas, total_ms, max_ms, pico_kb}, da mais custosa à menos
+        """
+        rows = [
+            {
+                'funcao': name,
+                'chamadas': calls,
+                'total_ms': round(total, 3),
+                'max_ms': round(longest, 3),
+                'pico_kb': round(peak / 1024, 1)
+            }
+            for name, (calls, total, longest, peak) in self.stats.items()
+        ]
+        return sorted(rows, key=lambda row: row['total_ms'], reverse=True)
+
+    def to_record(self):
+        """
+        Registro serializável (uma linha do log JSONL)
+        """
+        return {
+            'ts': self.started_at.isoformat(timespec='milliseconds'),
+            'label': self.label,
+            'wall_ms': round(self.wall_ms, 3),
+            'functions': self.summary()
+        }
+
+def current_profile():
+    """
+    Perfil do rerun em andamento na thread atual, ou None
+    """
+    return getattr(_local, 'profile', None)
+
+def _record(name, func, args, kwargs):
+    profile = current_profile()
+    if profile is None:
+        return func(*args, **kwargs)
+    frame = profile.enter()
+    start = time.perf_counter()
+    try:
+        return func(*args, **kwargs)
+    finally:
+        profile.exit(name, frame, (time.perf_counter() - start) * 1000)
+
+def profiled(func=None, *, name=None):
+    """
+    Decorador que registra a função no perfil do rerun atual.
+    Com a instrumentação desativada, retorna a própria função (sem wrapper).
+
+    Uso: @profiled ou @profiled(name="rótulo")
+    """
+    if func is None:
+        return functools.partial(profiled, name=name)
+    if not PROFILING_ENABLED:
+        return func
+
+    label = name or f"{func.__module__}.{func.__qualname__}"
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        return _record(label, func, args, kwargs)
+    return wrapper
+
+@contextmanager
+def profile_block(name):
+    """
+    Context manager equivalente a `profiled` para um trecho de código
+    """
+    profile = current_profile() if PROFILING_ENABLED else None
+    if profile is None:
+        yield
+        return
+    frame = profile.enter()
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        profile.exit(name, frame, (time.perf_counter() - start) * 1000)
+
+def _get_logger():
+    """
+    Logger com rotação por tamanho (uma linha JSON por rerun), criado uma vez por processo
+    """
+    global _logger
+    with _logger_lock:
+        if _logger is None:
+            path = Path(PROFILING_LOG_PATH)
+            path.parent.mkdir(parents=True, exist_ok=True)
+            handler = RotatingFileHandler(
+                path, maxBytes=PROFILING_LOG_MAX_BYTES, backupCount=PROFILING_LOG_BACKUPS, encoding='utf-8'
+            )
+            handler.setFormatter(logging.Formatter('%(message)s'))
+            logger = logging.getLogger('app.profiling')
+            logger.setLevel(logging.INFO)
+            logger.propagate = False
+            logger.addHandler(handler)
+            _logger = logger
+        return _logger
+
+@contextmanager
+def profile_rerun(label='rerun'):
+    """
+    Abre o perfil de um rerun na thread atual e grava seu registro no log ao final.
+    Produz o RerunProfile (ou None com a instrumentação desativada).
+    """
+    if not PROFILING_ENABLED:
+        yield None
+        return
+
+    if not tracemalloc.is_tracing():
+        tracemalloc.start()
+    profile = RerunProfile(label)
+    _local.profile = profile
+    start = time.perf_counter()
+    try:
+        yield profile
+    finally:
+        profile.wall_ms = (time.perf_counter() - start) * 1000
+        _local.profile = None
+        _get_logger().info(json.dumps(profile.to_record(), ensure_ascii=False))
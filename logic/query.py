@@ -0,0 +1,256 @@
+"""
+Filtro multicritério por faixas de nutrientes com planejador de consulta vetorizado
+"""
+
+import re
+import numpy as np
+from typing import List, NamedTuple, Optional
+
+class Predicate(NamedTuple):
+    """
+    Predicado sobre uma coluna: ex. Predicate('proteina_g', '>=', 20)
+    ou Predicate('grupo', 'in', ['Leguminosa', 'Cereal'])
+    """
+    column: str
+    op: str
+    value: object
+
+# Operadores de comparação suportados sobre colunas numéricas
+NUMERIC_OPERATORS = {
+    '>=': np.greater_equal,
+    '>': np.greater,
+    '<=': np.less_equal,
+    '<': np.less,
+    '==': np.equal,
+    '!=': np.not_equal
+}
+
+# Número de faixas (equi-depth) dos histogramas por coluna
+HISTOGRAM_BINS = 64
+
+class ColumnHistograms:
+    """
+    Histogramas equi-depth por coluna (quantis), usados para estimar a
+    seletividade de cada predicado sem varrer a tabela.
+    """
+
+    def __init__(self, matrix, bins=HISTOGRAM_BINS):
+        n_rows, n_cols = matrix.shape
+        self.n_rows = n_rows
+        self.non_null = np.zeros(n_cols, dtype=np.float64)
+        self.edges = []
+        self.cdf = []
+
+        levels = np.linspace(0, 1, bins + 1)
+        for pos in range(n_cols):
+            column = matrix[:, pos]
+            finite = column[~np.isnan(column)]
+            self.non_null[pos] = len(finite) / n_rows if n_rows else 0.0
+            if not len(finite):
+                self.edges.append(np.array([0.0]))
+                self.cdf.append(np.array([0.0]))
+                continue
+            edges = np.quantile(finite, levels)
+            # Quantis repetidos (ex.: muitos zeros) viram um único degrau da CDF
+            unique_edges, last = np.unique(edges[::-1], return_index=True)
+            self.edges.append(unique_edges)
+            self.cdf.append(levels[::-1][last])
+
+    def fraction_below(self, pos, value):
+        """
+        Fração estimada de linhas não nulas com valor <= value
+        """
+        edges = self.edges[pos]
+        if value < edges[0]:
+            return 0.0
+        return float(np.interp(value, edges, self.cdf[pos]))
+
+    def selectivity(self, pos, op, value):
+        """
+        Fração estimada de todas as linhas que satisfazem `coluna op value`
+        """
+        below = self.fraction_below(pos, value)
+        if op in ('<', '<='):
+            frac = below
+        elif op in ('>', '>='):
+            frac = 1.0 - below
+        elif op == '==':
+            frac = 1.0 / HISTOGRAM_BINS
+        else:
+            frac = 1.0 - 1.0 / HISTOGRAM_BINS
+        return float(frac * self.non_null[pos])
+
+class QueryPlanner:
+    """
+    Avalia conjunções de predicados sobre o armazenamento colunar do FoodStore.
+
+    Os predicados são ordenados pela seletividade estimada (mais restritivo
+    primeiro). O primeiro gera uma máscara sobre a coluna inteira; os demais
+    são avaliados apenas sobre as linhas sobreviventes, de modo que a tabela
+    não é varrida novamente a cada predicado.
+    """
+
+    def __init__(self, store):
+        self.store = store
+        # Colunas lidas como fatias da matriz do FoodStore (sem cópia coluna-major:
+        # a matriz, possivelmente mapeada do snapshot, não é duplicada em memória)
+        self.matrix = store.matrix
+        self.histograms = ColumnHistograms(self.matrix)
+
+        groups = store.meta.get('grupo')
+        self.group_codes = None
+        self.group_position = {}
+        self.group_fraction = {}
+        if groups is not None and len(groups):
+            labels = np.array(['' if not isinstance(g, str) else g for g in groups], dtype=object)
+            categories, codes = np.unique(labels, return_inverse=True)
+            self.group_codes = codes.astype(np.int32)
+            counts = np.bincount(self.group_codes, minlength=len(categories))
+            self.group_position = {c: i for i, c in enumerate(categories) if c}
+            self.group_fraction = {c: counts[i] / len(groups) for c, i in self.group_position.items()}
+
+    def estimate(self, predicate: Predicate) -> float:
+        """
+        Seletividade estimada (0 a 1) de um predicado
+        """
+        if predicate.column == 'grupo':
+            values = predicate.value if predicate.op == 'in' else [predicate.value]
+            return float(sum(self.group_fraction.get(v, 0.0) for v in values))
+
+        pos = self.store.col_pos.get(predicate.column)
+        if pos is None:
+            return 0.0
+        if predicate.op == 'between':
+            low, high = predicate.value
+            return max(0.0, self.histograms.selectivity(pos, '<=', high) - self.histograms.selectivity(pos, '<', low))
+        return self.histograms.selectivity(pos, predicate.op, predicate.value)
+
+    def plan(self, predicates: List[Predicate]) -> List[tuple]:
+        """
+        Ordena os predicados pela seletividade estimada.
+
+        Returns:
+            Lista de tuplas (predicado, seletividade estimada), mais seletivo primeiro
+        """
+        estimates = [(p, self.estimate(p)) for p in predicates]
+        return sorted(estimates, key=lambda item: item[1])
+
+    def _evaluate(self, predicate: Predicate, rows: Optional[np.ndarray]) -> np.ndarray:
+        """
+        Máscara do predicado sobre todas as linhas (rows=None) ou só sobre `rows`
+        """
+        if predicate.column == 'grupo':
+            if self.group_codes is None:
+                return np.zeros(len(self.store) if rows is None else len(rows), dtype=bool)
+            values = predicate.value if predicate.op == 'in' else [predicate.value]
+            wanted = np.zeros(len(self.group_position) + 1, dtype=bool)
+            for value in values:
+                if value in self.group_position:
+                    wanted[self.group_position[value]] = True
+            codes = self.group_codes if rows is None else self.group_codes[rows]
+            return wanted[codes]
+
+        pos = self.store.col_pos.get(predicate.column)
+        if pos is None:
+            raise KeyError(f"Coluna de nutriente desconhecida: {predicate.column}")
+
+        column = self.matrix[:, pos] if rows is None else self.matrix[rows, pos]
+        # NaN nunca satisfaz um predicado (comparações com NaN retornam False)
+        with np.errstate(invalid='ignore'):
+            if predicate.op == 'between':
+                low, high = predicate.value
+                return (column >= low) & (column <= high)
+            if predicate.op not in NUMERIC_OPERATORS:
+                raise ValueError(f"Operador não suportado: {predicate.op}")
+            return NUMERIC_OPERATORS[predicate.op](column, predicate.value)
+
+    def execute(self, predicates: List[Predicate]) -> np.ndarray:
+        """
+        Executa a conjunção (AND) dos predicados.
+
+        Returns:
+            Array ordenado com as posições das linhas que satisfazem todos os predicados
+        """
+        if not predicates:
+            return np.arange(len(self.store))
+
+        rows = None
+        for predicate, _ in self.plan(predicates):
+            mask = self._evaluate(predicate, rows)
+            rows = np.flatnonzero(mask) if rows is None else rows[mask]
+            if not len(rows):
+                break
+        return rows
+
+_CLAUSE = re.compile(
+    r"^\s*(?P<column>\w+)\s*(?:(?P<op>>=|<=|==|!=|>|<)\s*(?P<number>-?\d+(?:[.,]\d+)?)"
+    r"|(?P<in>IN)\s*\((?P<values>[^)]*)\))\s*$",
+    re.IGNORECASE
+)
+
+def parse_query(text: str) -> List[Predicate]:
+    """
+    Converte uma expressão textual em predicados.
+    Ex.: "proteina_g >= 20 AND sodio_mg < 200 AND grupo IN (Leguminosa, Cereal)"
+
+    Args:
+        text: Expressão com cláusulas unidas por AND
+
+    Returns:
+        Lista de predicados
+    """
+    predicates = []
+    if not text or not text.strip():
+        return predicates
+
+    for clause in re.split(r"\s+AND\s+", text.strip(), flags=re.IGNORECASE):
+        match = _CLAUSE.match(clause)
+        if not match:
+            raise ValueError(f"Cláusula inválida: {clause}")
+        if match.group('in'):
+            values = [v.strip().strip("'\"") for v in match.group('values').split(',') if v.strip()]
+            predicates.append(Predicate(match.group('column'), 'in', values))
+        else:
+            number = float(match.group('number').replace(',', '.'))
+            predicates.append(Predicate(match.group('column'), match.group('op'), number))
+    return predicates
+
+def range_predicates(ranges: dict, bounds: dict) -> List[Predicate]:
+    """
+    Converte faixas de sliders {coluna: (min, max)} em predicados 'between',
+    ignorando faixas que cobrem todo o intervalo da coluna (filtro inativo).
+
+    Args:
+        ranges: Faixas selecionadas {coluna: (min, max)}
+        bounds: Limites da coluna {coluna: (min, max)}
+    """
+    predicates = []
+    for column, (low, high) in ranges.items():
+        full_low, full_high = bounds.get(column, (low, high))
+        if low <= full_low and high >= full_high:
+            continue
+        predicates.append(Predicate(column, 'between', (low, high)))
+    return predicates
+
+def filter_rows(store, predicates: List[Predicate]) -> np.ndarray:
+    """
+    Retorna as posições dos alimentos que satisfazem todos os predicados
+    """
+    if store is None:
+        return np.empty(0, dtype=np.intp)
+    return store.query_planner.execute(predicates)
+
+def get_column_bounds(store, columns: List[str]) -> dict:
+    """
+    Retorna {coluna: (min, max)} dos valores não nulos de cada coluna
+    """
+    bounds = {}
+    for column in columns:
+        pos = store.col_pos.get(column)
+        if pos is None:
+            continue
+        values = store.matrix[:, pos]
+        finite = values[~np.isnan(values)]
+        if len(finite):
+            bounds[column] = (float(finite.min()), float(finite.max()))
+    return bounds
@@ -0,0 +1,154 @@
+"""
+Índice de busca por trigramas sobre nomes de alimentos (insensível a acentos)
+"""
+
+import re
+import unicodedata
+import numpy as np
+from typing import Iterable, List, Optional
+
+_NON_ALNUM = re.compile(r'[^a-z0-9]+')
+
+# Fração mínima de trigramas da consulta presentes no nome para um match aproximado
+FUZZY_MIN_SCORE = 0.5
+
+def fold_text(text: str) -> str:
+    """
+    Normaliza texto para busca: remove acentos, converte para minúsculas e
+    troca pontuação por espaço (ex.: "Feijão, preto" → "feijao preto").
+
+    Args:
+        text: Texto original
+
+    Returns:
+        Texto normalizado
+    """
+    if not isinstance(text, str):
+        return ''
+    decomposed = unicodedata.normalize('NFKD', text)
+    without_marks = ''.join(ch for ch in decomposed if not unicodedata.combining(ch))
+    return _NON_ALNUM.sub(' ', without_marks.lower()).strip()
+
+def _token_trigrams(token: str, closed: bool = True) -> List[str]:
+    """
+    Trigramas de um token com preenchimento à esquerda ("  a", " ab", "abc"...).
+    Com closed=False não há preenchimento à direita, permitindo casar prefixos.
+    """
+    padded = f"  {token} " if closed else f"  {token}"
+    return [padded[i:i + 3] for i in range(len(padded) - 2)]
+
+def query_trigrams(folded_query: str) -> List[str]:
+    """
+    Trigramas únicos de uma consulta já normalizada
+    """
+    tokens = folded_query.split()
+    trigrams = set()
+    for i, token in enumerate(tokens):
+        # O último token pode estar incompleto (busca enquanto digita)
+        trigrams.update(_token_trigrams(token, closed=i < len(tokens) - 1))
+    return sorted(trigrams)
+
+class SearchIndex:
+    """
+    Índice invertido trigrama → ids de nomes, construído uma única vez.
+
+    A busca conta, com um único bincount, quantos trigramas da consulta cada
+    nome contém; apenas esses candidatos são verificados (de forma vetorizada)
+    e ranqueados: prefixo do nome, depois todos os termos presentes, depois
+    matches aproximados por similaridade de trigramas.
+    """
+
+    def __init__(self, names: Iterable[str], keys: Optional[Iterable[str]] = None):
+        if keys is None:
+            unique = sorted({n for n in names if isinstance(n, str) and n.strip()})
+            values = unique
+        else:
+            # Nomes únicos com uma chave cada: a busca recebe e devolve chaves
+            pairs = sorted((n, k) for n, k in zip(names, keys) if isinstance(n, str) and n.strip())
+            unique = [n for n, _ in pairs]
+            values = [k for _, k in pairs]
+        self.names = np.array(unique, dtype=object)
+        self.values = np.array(values, dtype=object)
+        folded = [fold_text(n) for n in unique]
+        self.folded = np.array(folded, dtype=str) if folded else np.array([], dtype='<U1')
+        self.lengths = np.array([len(f) for f in folded], dtype=np.int32)
+        self.position = {value: i for i, value in enumerate(values)}
+
+        postings = {}
+        for i, text in enumerate(folded):
+            trigrams = set()
+            for token in text.split():
+                trigrams.update(_token_trigrams(token))
+            for trigram in trigrams:
+                postings.setdefault(trigram, []).append(i)
+        self.postings = {t: np.array(ids, dtype=np.int32) for t, ids in postings.items()}
+
+    def __len__(self):
+        return len(self.names)
+
+    def search(self, query: str, limit: Optional[int] = 100, allowed: Optional[Iterable[str]] = None) -> List[str]:
+        """
+        Busca nomes de alimentos para um termo digitado.
+
+        Args:
+            query: Termo de busca (acentos e maiúsculas são ignorados)
+            limit: Número máximo de resultados (None para todos)
+            allowed: Nomes (ou chaves, se o índice tem chaves) permitidos (ex.: resultado do filtro por grupos)
+
+        Returns:
+            Lista de nomes (ou chaves) ranqueados: prefixo > todos os termos > aproximado
+        """
+        folded_query = fold_text(query)
+        if not folded_query or not len(self.names):
+            return []
+
+        trigrams = query_trigrams(folded_query)
+        arrays = [self.postings[t] for t in trigrams if t in self.postings]
+        if not arrays:
+            return []
+
+        counts = np.bincount(np.concatenate(arrays), minlength=len(self.names))
+        if allowed is not None:
+            mask = np.zeros(len(self.names), dtype=bool)
+            ids = [self.position[n] for n in allowed if n in self.position]
+            mask[ids] = True
+            counts[~mask] = 0
+
+        score = counts / len(trigrams)
+        candidates = np.flatnonzero(score >= FUZZY_MIN_SCORE)
+        if not len(candidates):
+            return []
+
+        folded = self.folded[candidates]
+        is_prefix = np.char.startswith(folded, folded_query)
+        has_all_terms = np.ones(len(candidates), dtype=bool)
+        for token in folded_query.split():
+            has_all_terms &= np.char.find(folded, token) >= 0
+
+        # Tier 0: prefixo; 1: todos os termos; 2: aproximado
+        tier = np.where(is_prefix, 0, np.where(has_all_terms, 1, 2))
+
+        # Ordenação: tier, maior similaridade, nome mais curto, ordem alfabética (id)
+        order = np.lexsort((candidates, self.lengths[candidates], -score[candidates], tier))
+        ranked = candidates[order]
+        if limit is not None:
+            ranked = ranked[:limit]
+
+        return self.values[ranked].tolist()
+
+def search_foods(store, query: str, allowed: Optional[Iterable[str]] = None, limit: Optional[int] = 100) -> List[str]:
+    """
+    Busca alimentos usando o índice de trigramas do FoodStore.
+
+    Args:
+        store: FoodStore com o índice de busca
+        query: Termo digitado
+        allowed: Chaves permitidas (ex.: alimentos dos grupos selecionados)
+        limit: Número máximo de resultados
+
+    Returns:
+        Lista de chaves ranqueadas (ver FoodStore.label_for para o rótulo)
+    """
+    if store is None or not query:
+        return list(allowed) if allowed is not None else []
+    return store.search_index.search(query, limit=limit, allowed=allowed)
@@ -0,0 +1,163 @@
+"""
+Motor de "alimentos similares" sobre vetores de nutrientes normalizados
+"""
+
+import threading
+import numpy as np
+from collections import OrderedDict
+from typing import List, Optional
+
+# Tamanho do bloco de linhas nos produtos matriz-vetor (limita memória temporária)
+BLOCK_SIZE = 65536
+
+# Fração mínima das colunas disponíveis no alimento consultado que o candidato precisa compartilhar
+MIN_SHARED_FRACTION = 0.5
+MIN_SHARED_COLUMNS = 3
+
+class SimilarityIndex:
+    """
+    Índice de similaridade com vetores padronizados e máscaras de presença.
+
+    Cada nutriente passa por log1p (reduz a assimetria) e é padronizado
+    (z-score ignorando NaN). Colunas ausentes ficam zeradas e marcadas na
+    máscara, de modo que a distância entre dois alimentos considera apenas os
+    nutrientes presentes em ambos:
+
+        d²(x, q) = Σ m_x·m_q·(x - q)² / Σ m_x·m_q
+
+    O numerador é expandido em três produtos matriz-vetor por bloco de linhas,
+    sem laço Python por alimento.
+    """
+
+    CACHE_SIZE = 256
+
+    def __init__(self, matrix, groups=None):
+        values = np.asarray(matrix, dtype=np.float32)
+        present = ~np.isnan(values)
+
+        logged = np.log1p(np.clip(values, 0, None))
+        with np.errstate(invalid='ignore'):
+            mean = np.nanmean(logged, axis=0)
+            std = np.nanstd(logged, axis=0)
+        mean = np.nan_to_num(mean)
+        std = np.where(np.isfinite(std) & (std > 0), std, 1.0)
+
+        z = (logged - mean) / std
+        z[~present] = 0
+
+        self.z = np.ascontiguousarray(z, dtype=np.float32)
+        self.z2 = self.z * self.z
+        self.mask = present.astype(np.float32)
+        self.groups = np.asarray(groups, dtype=object) if groups is not None else None
+        # Compartilhado entre sessões (FoodStore em st.cache_resource)
+        self._cache = OrderedDict()
+        self._cache_lock = threading.Lock()
+
+    def __len__(self):
+        return self.z.shape[0]
+
+    def distances(self, row):
+        """
+        Distância quadrática média (sobre colunas compartilhadas) de todos os alimentos
+        para o alimento `row`, e o número de colunas compartilhadas.
+        """
+        q = self.z[row]
+        m = self.mask[row]
+        qm = q * m
+        q2m = qm * q
+
+        n = len(self)
+        dist = np.empty(n, dtype=np.float32)
+        shared = np.empty(n, dtype=np.float32)
+        for start in range(0, n, BLOCK_SIZE):
+            stop = min(start + BLOCK_SIZE, n)
+            mask_block = self.mask[start:stop]
+            shared[start:stop] = mask_block @ m
+            dist[start:stop] = self.z2[start:stop] @ m - 2 * (self.z[start:stop] @ qm) + mask_block @ q2m
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            dist = np.maximum(dist, 0) / shared
+        return dist, shared
+
+    def most_similar(self, row: int, k: int = 5, same_group: bool = False) -> List[tuple]:
+        """
+        Retorna os k alimentos mais similares a `row`.
+
+        Args:
+            row: Posição do alimento no FoodStore
+            k: Número de resultados
+            same_group: Restringe ao mesmo grupo (melhor substituto)
+
+        Returns:
+            Lista de tuplas (posição, distância RMS, colunas compartilhadas)
+        """
+        key = (row, k, same_group)
+        with self._cache_lock:
+            cached = self._cache.get(key)
+            if cached is not None:
+                self._cache.move_to_end(key)
+                return cached
+
+        dist, shared = self.distances(row)
+        available = self.mask[row].sum()
+        min_shared = max(MIN_SHARED_COLUMNS, MIN_SHARED_FRACTION * available)
+
+        invalid = (shared < min_shared) | ~np.isfinite(dist)
+        invalid[row] = True
+        if same_group and self.groups is not None:
+            invalid |= self.groups != self.groups[row]
+        dist = np.where(invalid, np.inf, dist)
+
+        valid_count = int((~invalid).sum())
+        k = min(k, valid_count)
+        if k <= 0:
+            result = []
+        else:
+            top = np.argpartition(dist, k - 1)[:k]
+            top = top[np.argsort(dist[top], kind='stable')]
+            result = [(int(i), float(np.sqrt(dist[i])), int(shared[i])) for i in top]
+
+        with self._cache_lock:
+            self._cache[key] = result
+            self._cache.move_to_end(key)
+            while len(self._cache) > self.CACHE_SIZE:
+                self._cache.popitem(last=False)
+        return result
+
+def similarity_score(distance: float) -> float:
+    """
+    Converte a distância RMS padronizada em um escore de 0 a 100
+    """
+    return 100.0 / (1.0 + distance)
+
+def find_similar_foods(store, food_name: str, k: int = 5, same_group: bool = False) -> List[dict]:
+    """
+    Busca os alimentos mais similares (ou melhores substitutos) a um alimento.
+
+    Args:
+        store: FoodStore com o índice de similaridade
+        food_name: Chave canônica do alimento consultado (rótulo ou nome também são aceitos)
+        k: Número de resultados
+        same_group: Restringe ao mesmo grupo do alimento
+
+    Returns:
+        Lista de dicionários {chave, alimento (rótulo), grupo, similaridade, nutrientes_comparados}
+    """
+    if store is None or not food_name:
+        return []
+
+    row = store.row_index(food_name)
+    if row is None:
+        return []
+
+    groups = store.meta.get('grupo')
+    results = []
+    for pos, distance, shared in store.similarity_index.most_similar(row, k=k, same_group=same_group):
+        results.append({
+            'chave': store.keys[pos],
+            'alimento': store.labels[pos],
+            'grupo': groups[pos] if groups is not None else None,
+            'similaridade': similarity_score(distance),
+            'nutrientes_comparados': shared
+        })
+    return results
@@ -2,8 +2,10 @@
 Funções para criação de tabelas padronizadas
 """
 
+import numpy as np
 import pandas as pd
 import streamlit as st
+from data.store import FoodRow
 from domain.nutrients import (
     get_micronutrient_categories,
     get_complexo_b_mapping,
@@ -13,9 +15,12 @@ from domain.nutrients import (
     get_basic_nutrients,
     get_nutrient_unit
 )
-from logic.compute import format_number, format_fractions, get_nutrient_value
+from logic.compute import format_columns, format_values, nutrient_matrix
+from logic.percentiles import percentile_badges
+from logic.profiling import profiled
 
-def paired_table(df1, df2, mapping: dict[str, str], food1: str, food2: str, formatter=format_number):
+@profiled
+def paired_table(df1, df2, mapping: dict[str, str], food1: str, food2: str, formatter=None, badges=False):
     """
     Função genérica para criar tabela pareada.
     
@@ -25,31 +30,79 @@ def paired_table(df1, df2, mapping: dict[str, str], food1: str, food2: str, form
         mapping: Dicionário {label: coluna}
         food1: Nome do primeiro alimento
         food2: Nome do segundo alimento
-        formatter: Função para formatar valores (padrão: format_number)
+        formatter: Função para formatar valores (padrão: o formatador de cada coluna no registro)
+        badges: Acrescenta o badge de percentil (ex.: "P92 em Leguminosa") aos valores
         
     Returns:
-        DataFrame: Tabela padronizada (Nutriente, Alimento1, Alimento2)
+        DataFrame: Tabela padronizada (Nutriente, Alimento1, Alimento2), sem as
+        linhas sem dado nos dois alimentos (vazia se nenhuma linha tiver dado)
     """
-    dados_combinados = []
+    # Com FoodRows, a bitmask de presença descarta as linhas vazias antes da leitura
+    from_store = isinstance(df1, FoodRow) and isinstance(df2, FoodRow) and df1.store is df2.store
+    if mapping and from_store:
+        present = df1.store.has_data((df1, df2), list(mapping.values())).any(axis=0)
+        mapping = {label: col for (label, col), keep in zip(mapping.items(), present) if keep}
+    if not mapping:
+        return pd.DataFrame()
     
-    for label, coluna in mapping.items():
-        # Valor do alimento 1
-        valor1 = get_nutrient_value(df1, coluna)
-        valor1_str = formatter(valor1) if valor1 > 0 else "N/A"
-        
-        # Valor do alimento 2
-        valor2 = get_nutrient_value(df2, coluna)
-        valor2_str = formatter(valor2) if valor2 > 0 else "N/A"
+    # Os dois alimentos × todas as colunas do mapeamento em uma única leitura
+    columns = list(mapping.values())
+    values = nutrient_matrix([df1, df2], columns)
+    if not from_store:
+        # DataFrames não têm bitmask: as linhas vazias saem pelos próprios valores
+        present = (values > 0).any(axis=0)
+        if not present.any():
+            return pd.DataFrame()
+        if not present.all():
+            mapping = {label: col for (label, col), keep in zip(mapping.items(), present) if keep}
+            columns = list(mapping.values())
+            values = values[:, present]
+    text = format_columns(values, columns) if formatter is None else format_values(values, formatter)
+    
+    # Percentis pré-calculados (apenas leitura por alimento)
+    if badges:
+        for i, data in enumerate((df1, df2)):
+            for j, badge in enumerate(percentile_badges(data, columns)):
+                if badge and values[i, j] > 0:
+                    text[i][j] = f"{text[i][j]} {badge}"
+    
+    # Linhas como tuplas: no pandas 3, mais rápido que um dict de colunas de strings
+    return pd.DataFrame(list(zip(mapping.keys(), text[0], text[1])), columns=['Nutriente', food1, food2])
+
+@profiled
+def multi_table(store, rows, mapping: dict[str, str], foods: list[str], formatter=None):
+    """
+    Tabela de comparação para N alimentos a partir de um único gather na matriz.
+    
+    Args:
+        store: FoodStore com a matriz de nutrientes
+        rows: Posições (ou FoodRow) dos alimentos, na ordem das colunas
+        mapping: Dicionário {label: coluna}
+        foods: Nomes dos alimentos (cabeçalhos das colunas)
+        formatter: Função para formatar valores (padrão: o formatador de cada coluna no registro)
         
-        dados_combinados.append({
-            'Nutriente': label,
-            food1: valor1_str,
-            food2: valor2_str
-        })
+    Returns:
+        DataFrame: (Nutriente, Alimento1, ..., AlimentoN)
+    """
+    # Linhas sem dado em nenhum dos alimentos ficam de fora (bitmask de presença)
+    if mapping and len(rows):
+        present = store.has_data(rows, list(mapping.values())).any(axis=0)
+        mapping = {label: col for (label, col), keep in zip(mapping.items(), present) if keep}
+    if not mapping or not len(rows):
+        return pd.DataFrame()
     
-    return pd.DataFrame(dados_combinados) if dados_combinados else pd.DataFrame()
+    # N alimentos × colunas selecionadas em uma única operação
+    columns = list(mapping.values())
+    values = store.gather(rows, columns)
+    text = format_columns(values, columns) if formatter is None else format_values(values, formatter)
+    
+    tabela = {'Nutriente': list(mapping.keys())}
+    for j, food in enumerate(foods):
+        tabela[food] = text[j]
+    return pd.DataFrame(tabela)
 
-def create_micronutrient_tables(data1, data2, food1, food2):
+@profiled
+def create_micronutrient_tables(data1, data2, food1, food2, badges=False):
     """
     Cria tabelas de micronutrientes pareadas usando a função genérica
     """
@@ -57,13 +110,14 @@ def create_micronutrient_tables(data1, data2, food1, food2):
     resultado = {}
     
     for categoria, nutrientes in categorias.items():
-        tabela = paired_table(data1, data2, nutrientes, food1, food2)
+        tabela = paired_table(data1, data2, nutrientes, food1, food2, badges=badges)
         if not tabela.empty:
             resultado[categoria] = tabela
     
     return resultado
 
-def create_complexo_b_table(data1, data2, food1, food2):
+@profiled
+def create_complexo_b_table(data1, data2, food1, food2, badges=False):
     """
     Cria tabela específica do Complexo B usando a função genérica
     """
@@ -72,22 +126,25 @@ def create_complexo_b_table(data1, data2, food1, food2):
     # Converter mapeamento complexo para formato simples
     simple_mapping = {nutriente: coluna for nutriente, (coluna, _) in complexo_b_mapping.items()}
     
-    return paired_table(data1, data2, simple_mapping, food1, food2)
+    return paired_table(data1, data2, simple_mapping, food1, food2, badges=badges)
 
+@profiled
 def create_lipid_fractions_table(data1, data2, food1, food2):
     """
-    Cria tabela de frações de lipídios usando a função genérica com formatação de 3 casas decimais
+    Cria tabela de frações de lipídios usando a função genérica (3 casas decimais, pelo registro)
     """
     fracoes_lipidios = get_lipid_fractions()
-    return paired_table(data1, data2, fracoes_lipidios, food1, food2, formatter=format_fractions)
+    return paired_table(data1, data2, fracoes_lipidios, food1, food2)
 
+@profiled
 def create_protein_fractions_table(data1, data2, food1, food2):
     """
-    Cria tabela de frações de proteínas (aminoácidos) usando a função genérica com formatação de 3 casas decimais
+    Cria tabela de frações de proteínas (aminoácidos) usando a função genérica (3 casas decimais, pelo registro)
     """
     aminoacidos = get_protein_fractions()
-    return paired_table(data1, data2, aminoacidos, food1, food2, formatter=format_fractions)
+    return paired_table(data1, data2, aminoacidos, food1, food2)
 
+@profiled
 def create_macronutrient_table(data1, data2, food1, food2):
     """
     Cria tabela de macronutrientes básicos usando a função genérica
@@ -112,6 +169,7 @@ def create_macronutrient_table(data1, data2, food1, food2):
     else:
         return pd.DataFrame()
 
+@profiled
 def standardize_table(df, food1, food2):
     """
     Padroniza tabelas para ter 3 colunas (Nutriente, alimento1, alimento2).
@@ -251,3 +309,52 @@ def display_colored_table(df, food1, food2):
     
     # Exibir tabela com estilo
     st.markdown(df.to_html(classes='colored-table', escape=False, index=False), unsafe_allow_html=True)
+
+def display_multi_table(df, foods):
+    """
+    Exibe a tabela da comparação múltipla com a cor de cada alimento no cabeçalho.
+    
+    Args:
+        df: DataFrame (Nutriente, Alimento1, ..., AlimentoN)
+        foods: Nomes dos alimentos na ordem das colunas
+    """
+    if df.empty:
+        st.info("Nenhum dado disponível para exibir")
+        return
+    
+    from domain.palette import get_multi_colors
+    
+    header_rules = "\n".join(
+        f".multi-table th:nth-child({i + 2}) {{ background-color: {color} !important; }}"
+        for i, color in enumerate(get_multi_colors(len(foods)))
+    )
+    css_style = f"""
+    <style>
+    .multi-table {{
+        border-collapse: collapse;
+        width: 100%;
+        background-color: #1e1e1e;
+        color: #ffffff;
+        font-size: 13px;
+    }}
+    .multi-table th {{
+        background-color: #2d2d2d;
+        border: 1px solid #444444;
+        padding: 6px 8px;
+        text-align: center;
+        color: #ffffff;
+    }}
+    .multi-table td {{
+        border: 1px solid #444444;
+        padding: 4px 6px;
+        text-align: center;
+    }}
+    .multi-table tr:nth-child(even) {{
+        background-color: #2a2a2a;
+    }}
+    {header_rules}
+    </style>
+    """
+    
+    st.markdown(css_style, unsafe_allow_html=True)
+    st.markdown(df.to_html(classes='multi-table', escape=False, index=False), unsafe_allow_html=True)
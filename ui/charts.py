@@ -2,11 +2,16 @@
 Funções genéricas para criação de gráficos - API única
 """
 
+import numpy as np
 import plotly.graph_objects as go
 import pandas as pd
 from config.settings import COLORS, CHART_HEIGHT, CHART_HEIGHT_SMALL, CHART_HEIGHT_MINI
-from logic.compute import calculate_macro_percentages, dynamic_upper_limit, get_nutrient_value, clean_nutrient_data, get_slot_scale, get_food_colors_by_slot
-from domain.palette import get_slot_solid
+from logic.comparison import get_comparison
+from logic.compute import calculate_macro_percentages, dynamic_upper_limit, get_nutrient_value, get_slot_scale, get_food_colors_by_slot
+from domain.palette import get_slot_solid, get_multi_colors
+from data.store import FoodRow
+from ui.figure_cache import cached_figure
+from logic.profiling import profiled
 
 def get_first_nutrient(nutrientes1, nutrientes2, default="Nutriente"):
     """
@@ -18,8 +23,10 @@ def get_first_nutrient(nutrientes1, nutrientes2, default="Nutriente"):
         return list(nutrientes2.keys())[0]
     else:
         return default
-from domain.nutrients import get_chart_colors, get_nutrient_color, get_macronutrients
+from domain.nutrients import NUTRIENTS_BY_COLUMN, get_chart_colors, get_nutrient_color, get_macronutrients
 
+@profiled
+@cached_figure
 def pie_macros(df_row, food_name, mapping=None, slot='left'):
     """
     Cria gráfico de pizza genérico para macronutrientes ou outros nutrientes.
@@ -37,14 +44,11 @@ def pie_macros(df_row, food_name, mapping=None, slot='left'):
     if mapping is None:
         mapping = get_macronutrients()
     
-    # Obter valores dos nutrientes
-    nutrientes = {}
-    for label, coluna in mapping.items():
-        valor = get_nutrient_value(df_row, coluna)
-        if valor > 0:
-            nutrientes[label] = valor
+    # Valores dos nutrientes em uma leitura (NaN sem dado, evita "undefined")
+    valores = _nutrient_arrays(df_row, mapping)
+    keep = ~np.isnan(valores)
     
-    if not nutrientes:
+    if not keep.any():
         fig = go.Figure()
         fig.add_annotation(
             text="Não há dados",
@@ -59,26 +63,8 @@ def pie_macros(df_row, food_name, mapping=None, slot='left'):
         )
         return fig
     
-    # Usar função de limpeza para evitar "undefined"
-    nutrientes = clean_nutrient_data(df_row, mapping)
-    
-    if not nutrientes:
-        fig = go.Figure()
-        fig.add_annotation(
-            text="Não há dados válidos",
-            xref="paper", yref="paper",
-            x=0.5, y=0.5, showarrow=False,
-            font=dict(size=16)
-        )
-        fig.update_layout(
-            title="Macronutrientes",
-            showlegend=False,
-            height=CHART_HEIGHT
-        )
-        return fig
-    
-    labels = list(nutrientes.keys())
-    values = list(nutrientes.values())
+    labels = [label for label, k in zip(mapping, keep) if k]
+    values = valores[keep].tolist()
     
     # Cores específicas por nutriente
     colors = []
@@ -120,6 +106,8 @@ def pie_macros(df_row, food_name, mapping=None, slot='left'):
     
     return fig
 
+@profiled
+@cached_figure
 def bar_single(df_row, title, columns, units, upper_limit=None):
     """
     Cria gráfico de barras genérico para um alimento com várias barras.
@@ -138,37 +126,36 @@ def bar_single(df_row, title, columns, units, upper_limit=None):
     if isinstance(columns, list):
         columns = {col: col for col in columns}
     
-    # Usar função de limpeza para evitar "undefined"
-    nutrientes = clean_nutrient_data(df_row, columns)
+    # Valores em uma leitura (NaN sem dado, evita "undefined")
+    valores = _nutrient_arrays(df_row, columns)
+    keep = ~np.isnan(valores)
     
-    if not nutrientes:
+    if not keep.any():
         return go.Figure()
     
+    labels = [label for label, k in zip(columns, keep) if k]
+    valores = valores[keep]
+    
     # Cores específicas por nutriente
     colors = []
-    for label in nutrientes.keys():
+    for label in labels:
         colors.append(get_nutrient_color(label))
     
-    fig = go.Figure()
-    
-    for i, (label, valor) in enumerate(nutrientes.items()):
-        fig.add_trace(go.Bar(
-            name=label,
-            x=[label],
-            y=[valor],
-            text=[f"<b>{valor:.1f}</b>"] if not pd.isna(valor) and valor is not None else [""],
-            textposition='auto',
-            marker_color=colors[i % len(colors)]
-        ))
+    # Um único trace com cor por barra
+    fig = go.Figure(go.Bar(
+        x=labels,
+        y=valores,
+        text=_bar_text(valores, 1),
+        textposition='auto',
+        marker_color=colors
+    ))
     
     # Calcular upper limit se não fornecido
     if upper_limit is None:
-        upper_limit = max(nutrientes.values()) * 1.1
-    
-    # Título será obtido pela função get_first_nutrient
+        upper_limit = float(valores.max()) * 1.1
     
     fig.update_layout(
-        title=get_first_nutrient(nutrientes, {}, "Nutriente"),  # Usar nome do nutriente como título
+        title=labels[0],  # Usar nome do nutriente como título
         xaxis_title=None,  # Remover "Nutrientes" redundante
         yaxis_title=f"Valor ({units})",
         yaxis=dict(range=[0, upper_limit]),
@@ -179,13 +166,83 @@ def bar_single(df_row, title, columns, units, upper_limit=None):
     
     return fig
 
+def _nutrient_arrays(df_row, columns):
+    """
+    Valores de um alimento para as colunas do mapeamento como array float
+    (NaN para colunas ausentes, nulas ou <= 0). Com FoodRow, é uma única
+    leitura vetorizada da matriz.
+    """
+    cols = list(columns.values())
+    if isinstance(df_row, FoodRow):
+        values = df_row.store.gather([df_row], cols)[0].astype(np.float64)
+    else:
+        values = np.array([get_nutrient_value(df_row, col, np.nan) for col in cols], dtype=np.float64)
+    with np.errstate(invalid='ignore'):
+        return np.where(values > 0, values, np.nan)
+
+def _bar_text(values, decimals):
+    """
+    Rótulos das barras (negrito) formatados de uma vez; vazio para NaN
+    """
+    text = np.char.mod(f"<b>%.{decimals}f</b>", np.nan_to_num(values))
+    return np.where(np.isnan(values), "", text)
+
+def _paired_bars(df1_row, df2_row, food1, food2, columns, slot1, slot2, decimals, width=None):
+    """
+    Monta a figura com um único trace por alimento (x/y/text em arrays).
+    `width` fixa a largura das barras (None: largura padrão do Plotly).
+    
+    Returns:
+        tuple: (figura, título, maior valor) ou (None, None, None) sem dados
+    """
+    if isinstance(columns, list):
+        columns = {col: col for col in columns}
+    
+    labels = np.array(list(columns.keys()), dtype=object)
+    cols = list(columns.values())
+    if all(col in NUTRIENTS_BY_COLUMN for col in cols):
+        # Colunas do registro: recorte dos valores já calculados para o par
+        values1, values2 = get_comparison(df1_row, df2_row, food1, food2).values(cols)
+    else:
+        values1 = _nutrient_arrays(df1_row, columns)
+        values2 = _nutrient_arrays(df2_row, columns)
+    
+    # Mantém apenas nutrientes com dado em pelo menos um dos alimentos
+    keep = ~(np.isnan(values1) & np.isnan(values2))
+    if not keep.any():
+        return None, None, None
+    labels, values1, values2 = labels[keep], values1[keep], values2[keep]
+    
+    fig = go.Figure()
+    for food, values, slot in ((food1, values1, slot1), (food2, values2, slot2)):
+        fig.add_trace(go.Bar(
+            name=food,
+            x=labels,
+            y=values,
+            text=_bar_text(values, decimals),
+            textposition='auto',
+            marker_color=get_slot_solid(slot),
+            width=width
+        ))
+    fig.update_layout(barmode='group')
+    
+    # Título: primeiro nutriente com dado no alimento 1 (ou no alimento 2)
+    first = np.flatnonzero(~np.isnan(values1))
+    if not len(first):
+        first = np.flatnonzero(~np.isnan(values2))
+    
+    return fig, labels[first[0]], float(np.nanmax(np.concatenate([values1, values2])))
+
+@profiled
+@cached_figure
 def bar_compare(df1_row, df2_row, food1, food2, columns, title, unit, upper_limit=None, slot1='left', slot2='right'):
     """
     Cria gráfico de barras comparativo genérico para dois alimentos.
+    Um trace por alimento, com todos os nutrientes em arrays.
     
     Args:
-        df1_row: DataFrame com uma linha do primeiro alimento
-        df2_row: DataFrame com uma linha do segundo alimento
+        df1_row: DataFrame (ou FoodRow) com uma linha do primeiro alimento
+        df2_row: DataFrame (ou FoodRow) com uma linha do segundo alimento
         food1: Nome do primeiro alimento
         food2: Nome do segundo alimento
         columns: Lista de colunas ou dicionário {label: coluna}
@@ -198,57 +255,16 @@ def bar_compare(df1_row, df2_row, food1, food2, columns, title, unit, upper_limi
     if df1_row is None or df1_row.empty or df2_row is None or df2_row.empty:
         return go.Figure()
     
-    # Converter columns para dicionário se for lista
-    if isinstance(columns, list):
-        columns = {col: col for col in columns}
-    
-    # Usar função de limpeza para evitar "undefined"
-    nutrientes1 = clean_nutrient_data(df1_row, columns)
-    nutrientes2 = clean_nutrient_data(df2_row, columns)
-    
-    if not nutrientes1 and not nutrientes2:
+    fig, chart_title, max_value = _paired_bars(df1_row, df2_row, food1, food2, columns, slot1, slot2, decimals=1)
+    if fig is None:
         return go.Figure()
     
-    # Cores por slot
-    color1 = get_slot_solid(slot1)
-    color2 = get_slot_solid(slot2)
-    
-    fig = go.Figure()
-    
-    # Adicionar barras do primeiro alimento
-    for i, (label, valor) in enumerate(nutrientes1.items()):
-        fig.add_trace(go.Bar(
-            name=food1,  # Nome simplificado
-            x=[label],
-            y=[valor],
-            text=[f"<b>{valor:.1f}</b>"] if not pd.isna(valor) and valor is not None else [""],
-            textposition='auto',
-            marker_color=color1,
-            showlegend=(i == 0)  # Mostrar legenda apenas na primeira barra
-        ))
-    
-    # Adicionar barras do segundo alimento
-    for i, (label, valor) in enumerate(nutrientes2.items()):
-        fig.add_trace(go.Bar(
-            name=food2,  # Nome simplificado
-            x=[label],
-            y=[valor],
-            text=[f"<b>{valor:.1f}</b>"] if not pd.isna(valor) and valor is not None else [""],
-            textposition='auto',
-            marker_color=color2,
-            showlegend=(i == 0)  # Mostrar legenda apenas na primeira barra
-        ))
-    
     # Calcular upper limit se não fornecido
     if upper_limit is None:
-        all_values = list(nutrientes1.values()) + list(nutrientes2.values())
-        if all_values:
-            upper_limit = max(all_values) * 1.1
-        else:
-            upper_limit = 100
+        upper_limit = max_value * 1.1
     
     fig.update_layout(
-        title=get_first_nutrient(nutrientes1, nutrientes2),  # Usar nome do nutriente como título
+        title=chart_title,  # Usar nome do nutriente como título
         xaxis_title=None,  # Remover "Nutrientes" redundante
         yaxis_title=f"Valor ({unit})",
         yaxis=dict(range=[0, upper_limit]),
@@ -259,78 +275,94 @@ def bar_compare(df1_row, df2_row, food1, food2, columns, title, unit, upper_limi
     
     return fig
 
-def bar_compare_aminoacidos(df1_row, df2_row, food1, food2, columns, title, unit, upper_limit=None, slot1='left', slot2='right'):
+@profiled
+@cached_figure
+def bar_compare_multi(store, rows, foods, columns, title, unit, upper_limit=None):
     """
-    Cria gráfico de barras comparativo específico para aminoácidos com altura maior e formatação adequada.
+    Gráfico de barras agrupadas para N alimentos: um trace por alimento,
+    com todos os nutrientes no eixo X.
     
     Args:
-        df1_row: DataFrame com uma linha do primeiro alimento
-        df2_row: DataFrame com uma linha do segundo alimento
-        food1: Nome do primeiro alimento
-        food2: Nome do segundo alimento
+        store: FoodStore com a matriz de nutrientes
+        rows: Posições (ou FoodRow) dos alimentos
+        foods: Nomes dos alimentos (legenda)
         columns: Lista de colunas ou dicionário {label: coluna}
         title: Título do gráfico
         unit: Unidade dos valores (ex: "g", "mg", "kcal")
         upper_limit: Limite superior do eixo Y (opcional)
     """
-    if df1_row is None or df1_row.empty or df2_row is None or df2_row.empty:
+    if store is None or not len(rows):
         return go.Figure()
     
     # Converter columns para dicionário se for lista
     if isinstance(columns, list):
         columns = {col: col for col in columns}
     
-    # Usar função de limpeza para evitar "undefined"
-    nutrientes1 = clean_nutrient_data(df1_row, columns)
-    nutrientes2 = clean_nutrient_data(df2_row, columns)
+    labels = list(columns.keys())
+    values = store.gather(rows, list(columns.values()))
+    values = np.where(values > 0, values, np.nan)
     
-    if not nutrientes1 and not nutrientes2:
+    if np.isnan(values).all():
         return go.Figure()
     
-    # Cores por slot
-    color1 = get_slot_solid(slot1)
-    color2 = get_slot_solid(slot2)
-    
+    text = _bar_text(values, 1)
     fig = go.Figure()
-    
-    # Adicionar barras do primeiro alimento
-    for i, (label, valor) in enumerate(nutrientes1.items()):
+    for food, color, food_values, food_text in zip(foods, get_multi_colors(len(foods)), values, text):
         fig.add_trace(go.Bar(
-            name=food1,  # Nome simplificado
-            x=[label],
-            y=[valor],
-            text=[f"<b>{valor:.3f}</b>"] if not pd.isna(valor) and valor is not None else [""],
+            name=food,
+            x=labels,
+            y=food_values,
+            text=food_text,
             textposition='auto',
-            marker_color=color1,
-            width=0.4,  # Largura das barras maior
-            showlegend=(i == 0)  # Mostrar legenda apenas na primeira barra
+            marker_color=color
         ))
     
-    # Adicionar barras do segundo alimento
-    for i, (label, valor) in enumerate(nutrientes2.items()):
-        fig.add_trace(go.Bar(
-            name=food2,  # Nome simplificado
-            x=[label],
-            y=[valor],
-            text=[f"<b>{valor:.3f}</b>"] if not pd.isna(valor) and valor is not None else [""],
-            textposition='auto',
-            marker_color=color2,
-            width=0.4,  # Largura das barras maior
-            showlegend=(i == 0)  # Mostrar legenda apenas na primeira barra
-        ))
+    if upper_limit is None:
+        upper_limit = float(np.nanmax(values)) * 1.1
+    
+    fig.update_layout(
+        title=title,
+        barmode='group',
+        xaxis_title=None,
+        yaxis_title=f"Valor ({unit})",
+        yaxis=dict(range=[0, upper_limit]),
+        height=CHART_HEIGHT,
+        font=dict(family="Arial, sans-serif"),
+        legend=dict(orientation="h", yanchor="bottom", y=1.02, xanchor="right", x=1)
+    )
+    
+    return fig
+
+@profiled
+@cached_figure
+def bar_compare_aminoacidos(df1_row, df2_row, food1, food2, columns, title, unit, upper_limit=None, slot1='left', slot2='right'):
+    """
+    Cria gráfico de barras comparativo específico para aminoácidos com altura maior e formatação adequada.
+    Um trace por alimento (antes eram 2 × 18 traces de uma barra).
+    
+    Args:
+        df1_row: DataFrame (ou FoodRow) com uma linha do primeiro alimento
+        df2_row: DataFrame (ou FoodRow) com uma linha do segundo alimento
+        food1: Nome do primeiro alimento
+        food2: Nome do segundo alimento
+        columns: Lista de colunas ou dicionário {label: coluna}
+        title: Título do gráfico
+        unit: Unidade dos valores (ex: "g", "mg", "kcal")
+        upper_limit: Limite superior do eixo Y (opcional)
+    """
+    if df1_row is None or df1_row.empty or df2_row is None or df2_row.empty:
+        return go.Figure()
+    
+    fig, chart_title, max_value = _paired_bars(df1_row, df2_row, food1, food2, columns, slot1, slot2, decimals=3, width=0.4)
+    if fig is None:
+        return go.Figure()
     
     # Calcular upper limit se não fornecido
     if upper_limit is None:
-        all_values = list(nutrientes1.values()) + list(nutrientes2.values())
-        if all_values:
-            upper_limit = max(all_values) * 1.1
-        else:
-            upper_limit = 100
-    
-    # Título será obtido pela função get_first_nutrient
+        upper_limit = max_value * 1.1
     
     fig.update_layout(
-        title=get_first_nutrient(nutrientes1, nutrientes2),  # Usar nome do nutriente como título
+        title=chart_title,  # Usar nome do nutriente como título
         xaxis_title=None,  # Remover "Aminoácidos" redundante
         yaxis_title=f"Valor ({unit})",
         yaxis=dict(
@@ -349,13 +381,16 @@ def bar_compare_aminoacidos(df1_row, df2_row, food1, food2, columns, title, unit
     
     return fig
 
+@profiled
+@cached_figure
 def bar_compare_fractions(df1_row, df2_row, food1, food2, columns, title, unit, upper_limit=None, slot1='left', slot2='right'):
     """
     Cria gráfico de barras comparativo específico para frações com 3 casas decimais.
+    Um trace por alimento, com todos os nutrientes em arrays.
     
     Args:
-        df1_row: DataFrame com uma linha do primeiro alimento
-        df2_row: DataFrame com uma linha do segundo alimento
+        df1_row: DataFrame (ou FoodRow) com uma linha do primeiro alimento
+        df2_row: DataFrame (ou FoodRow) com uma linha do segundo alimento
         food1: Nome do primeiro alimento
         food2: Nome do segundo alimento
         columns: Lista de colunas ou dicionário {label: coluna}
@@ -366,59 +401,16 @@ def bar_compare_fractions(df1_row, df2_row, food1, food2, columns, title, unit,
     if df1_row is None or df1_row.empty or df2_row is None or df2_row.empty:
         return go.Figure()
     
-    # Converter columns para dicionário se for lista
-    if isinstance(columns, list):
-        columns = {col: col for col in columns}
-    
-    # Usar função de limpeza para evitar "undefined"
-    nutrientes1 = clean_nutrient_data(df1_row, columns)
-    nutrientes2 = clean_nutrient_data(df2_row, columns)
-    
-    if not nutrientes1 and not nutrientes2:
+    fig, chart_title, max_value = _paired_bars(df1_row, df2_row, food1, food2, columns, slot1, slot2, decimals=3, width=0.4)
+    if fig is None:
         return go.Figure()
     
-    # Cores por slot
-    color1 = get_slot_solid(slot1)
-    color2 = get_slot_solid(slot2)
-    
-    fig = go.Figure()
-    
-    # Adicionar barras do primeiro alimento
-    for i, (label, valor) in enumerate(nutrientes1.items()):
-        fig.add_trace(go.Bar(
-            name=food1,
-            x=[label],
-            y=[valor],
-            text=[f"<b>{valor:.3f}</b>"] if not pd.isna(valor) and valor is not None else [""],  # 3 casas decimais
-            textposition='auto',
-            marker_color=color1,
-            width=0.4,
-            showlegend=(i == 0)
-        ))
-    
-    # Adicionar barras do segundo alimento
-    for i, (label, valor) in enumerate(nutrientes2.items()):
-        fig.add_trace(go.Bar(
-            name=food2,
-            x=[label],
-            y=[valor],
-            text=[f"<b>{valor:.3f}</b>"] if not pd.isna(valor) and valor is not None else [""],  # 3 casas decimais
-            textposition='auto',
-            marker_color=color2,
-            width=0.4,
-            showlegend=(i == 0)
-        ))
-    
     # Calcular upper limit se não fornecido
     if upper_limit is None:
-        all_values = list(nutrientes1.values()) + list(nutrientes2.values())
-        if all_values:
-            upper_limit = max(all_values) * 1.1
-        else:
-            upper_limit = 100
+        upper_limit = max_value * 1.1
     
     fig.update_layout(
-        title=get_first_nutrient(nutrientes1, nutrientes2),  # Usar nome do nutriente como título
+        title=chart_title,  # Usar nome do nutriente como título
         xaxis_title=None,  # Remover "Nutrientes" redundante
         yaxis_title=f"Valor ({unit})",
         yaxis=dict(range=[0, upper_limit]),
@@ -431,6 +423,7 @@ def bar_compare_fractions(df1_row, df2_row, food1, food2, columns, title, unit,
 
 # Funções auxiliares para compatibilidade (usando as genéricas)
 
+@profiled
 def bar_macros(data, food_name, upper_limit=None):
     """
     Função de compatibilidade - usa bar_single genérica
@@ -438,6 +431,7 @@ def bar_macros(data, food_name, upper_limit=None):
     mapping = get_macronutrients()
     return bar_single(data, "Macronutrientes", mapping, "g", upper_limit)
 
+@profiled
 def bar_multiple_compare(data1, data2, columns, titles, y_title, food1, food2, color1=None, color2=None):
     """
     Função de compatibilidade - usa bar_compare genérica
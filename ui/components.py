@@ -2,10 +2,12 @@
 Componentes de UI reutilizáveis
 """
 
+import html
 import streamlit as st
 from ui.state import get_selected_sections, toggle_section
-from config.settings import SECTIONS_CONFIG, UI_CONFIG
+from config.settings import SECTIONS_CONFIG, UI_CONFIG, SIMILAR_FOODS_K, RANGE_FILTERS
 from domain.palette import get_slot_gradient
+from logic.compute import get_nutrient_value
 
 def inject_css(path="styles/theme.css"):
     """
@@ -25,7 +27,7 @@ def food_card(df_row, food_name, slot='left'):
     Cria um card com informações básicas do alimento
     
     Args:
-        df_row: DataFrame com uma linha do alimento
+        df_row: Visão de linha (FoodRow) ou DataFrame com uma linha do alimento
         food_name: Nome do alimento
         slot: Slot do alimento ('left' ou 'right')
     """
@@ -34,12 +36,12 @@ def food_card(df_row, food_name, slot='left'):
         return
     
     # Obter valores básicos
-    energia = df_row['energia_kcal'].iloc[0] if 'energia_kcal' in df_row.columns else 0
-    proteina = df_row['proteina_g'].iloc[0] if 'proteina_g' in df_row.columns else 0
-    carboidrato = df_row['carboidrato_g'].iloc[0] if 'carboidrato_g' in df_row.columns else 0
-    lipideos = df_row['lipideos_g'].iloc[0] if 'lipideos_g' in df_row.columns else 0
-    fibra = df_row['fibra_alimentar_g'].iloc[0] if 'fibra_alimentar_g' in df_row.columns else 0
-    umidade = df_row['umidade_pct'].iloc[0] if 'umidade_pct' in df_row.columns else 0
+    energia = get_nutrient_value(df_row, 'energia_kcal')
+    proteina = get_nutrient_value(df_row, 'proteina_g')
+    carboidrato = get_nutrient_value(df_row, 'carboidrato_g')
+    lipideos = get_nutrient_value(df_row, 'lipideos_g')
+    fibra = get_nutrient_value(df_row, 'fibra_alimentar_g')
+    umidade = get_nutrient_value(df_row, 'umidade_pct')
     
     # Obter gradiente por slot
     gradient_colors = get_slot_gradient(slot)
@@ -94,6 +96,183 @@ def food_card(df_row, food_name, slot='left'):
     
     st.markdown(card_html, unsafe_allow_html=True)
 
+def coverage_badges(comparison, sections, food1, food2):
+    """
+    Badges com a cobertura de uma seção em cada alimento (nutrientes com dado / total),
+    lida da bitmask de presença calculada na carga
+    
+    Args:
+        comparison: ComparisonResult do par (logic.comparison)
+        sections: Seções do registro somadas no badge (ex.: ['Minerais'])
+        food1: Nome do primeiro alimento
+        food2: Nome do segundo alimento
+    """
+    badges = []
+    for (filled, total), food, slot in zip(comparison.coverage(sections), (food1, food2), ('left', 'right')):
+        text = html.escape(UI_CONFIG['coverage_badge'].format(food=food, filled=filled, total=total))
+        opacity = 1.0 if filled else 0.55
+        badges.append(
+            f'<span style="display: inline-block; margin: 0 6px 6px 0; padding: 2px 10px; border-radius: 12px; '
+            f'font-size: 12px; color: white; opacity: {opacity}; background-color: {get_slot_gradient(slot)[0]};">{text}</span>'
+        )
+    st.markdown(f'<div>{"".join(badges)}</div>', unsafe_allow_html=True)
+
+def profiling_sidebar(profile):
+    """
+    Painel de depuração na barra lateral com o perfil do rerun
+    (tempo, chamadas e pico de memória por função) e o estado do cache de figuras.
+    
+    Args:
+        profile: RerunProfile do rerun atual (logic.profiling.profile_rerun)
+    """
+    from ui.figure_cache import get_figure_cache_stats
+    
+    with st.sidebar.expander(UI_CONFIG['profiling_title']):
+        st.caption(UI_CONFIG['profiling_wall'].format(ms=profile.wall_ms))
+        st.dataframe(profile.summary(), hide_index=True)
+        
+        stats = get_figure_cache_stats()
+        st.caption(UI_CONFIG['profiling_cache'].format(rate=stats['hit_rate'], **stats))
+
+@st.fragment
+def similar_foods_panel(store, food_name, slot='left'):
+    """
+    Painel com os alimentos mais similares ao alimento do card (vizinhos mais próximos
+    nos vetores de nutrientes normalizados)
+    
+    Args:
+        store: FoodStore com o índice de similaridade
+        food_name: Chave canônica do alimento do card
+        slot: Slot do alimento ('left' ou 'right')
+    """
+    from logic.similarity import find_similar_foods
+    
+    with st.expander(UI_CONFIG['similar_title'], expanded=False):
+        same_group = st.toggle(UI_CONFIG['similar_same_group'], key=f"similar_same_group_{slot}")
+        similares = find_similar_foods(store, food_name, k=SIMILAR_FOODS_K, same_group=same_group)
+        
+        if not similares:
+            st.caption(UI_CONFIG['similar_empty'])
+            return
+        
+        primary = get_slot_gradient(slot)[0]
+        linhas = []
+        for item in similares:
+            linhas.append(f"""
+            <div style="display: flex; justify-content: space-between; padding: 4px 0; border-bottom: 1px solid rgba(128,128,128,0.2);">
+                <span>{html.escape(item['alimento'])} <small style="opacity: 0.7;">({html.escape(item['grupo'])})</small></span>
+                <span style="color: {primary}; font-weight: bold;">{item['similaridade']:.0f}%</span>
+            </div>
+            """)
+        st.markdown(''.join(linhas), unsafe_allow_html=True)
+
+def range_filters_sidebar(store):
+    """
+    Sliders de faixa por nutriente na barra lateral.
+    Faixas que cobrem todo o intervalo da coluna não geram predicado.
+    
+    Args:
+        store: FoodStore com o planejador de consultas
+        
+    Returns:
+        Posições das linhas aprovadas pelos filtros, ou None se nenhum filtro estiver ativo
+    """
+    import math
+    from ui.state import StateKeys, clear_range_filters
+    from logic.query import get_column_bounds, range_predicates, filter_rows
+    
+    bounds = get_column_bounds(store, list(RANGE_FILTERS))
+    bounds = {col: (math.floor(lo * 10) / 10, math.ceil(hi * 10) / 10) for col, (lo, hi) in bounds.items()}
+    
+    with st.sidebar:
+        st.markdown(f"### {UI_CONFIG['range_filters_title']}")
+        st.button(UI_CONFIG['range_filters_clear'], key=StateKeys.CLEAR_RANGE_FILTERS, on_click=clear_range_filters)
+        
+        ranges = {}
+        for column, label in RANGE_FILTERS.items():
+            if column not in bounds:
+                continue
+            low, high = bounds[column]
+            if low >= high:
+                continue
+            ranges[column] = st.slider(
+                label,
+                min_value=low,
+                max_value=high,
+                value=(low, high),
+                key=StateKeys.get_range_key(column)
+            )
+        
+        predicates = range_predicates(ranges, bounds)
+        if not predicates:
+            return None
+        
+        rows = filter_rows(store, predicates)
+        st.caption(UI_CONFIG['range_filters_count'].format(count=len(rows)))
+        return rows
+
+@st.fragment
+def food_picker(store, slot, range_rows=None):
+    """
+    Seletor de um slot (chips, busca e selectbox) como fragmento independente:
+    chips e busca reexecutam apenas este fragmento. Só uma nova escolha de
+    alimento dispara a reexecução completa, pois muda a comparação.
+    
+    Args:
+        store: FoodStore com os índices de grupos e busca
+        slot: Slot do seletor ('left' ou 'right')
+        range_rows: Linhas aprovadas pelo filtro por faixas (None = sem filtro)
+        
+    Returns:
+        Chave do alimento selecionado (apenas na execução completa do app)
+    """
+    from logic.filters import get_available_groups
+    from ui.state import (
+        StateKeys, clear_groups, handle_chips_interaction, get_selected_groups,
+        get_safe_food_keys, get_search_filtered_foods, handle_food_change_autoclear
+    )
+    
+    is_left = slot == "left"
+    st.markdown(f"### {UI_CONFIG['food1_label'] if is_left else UI_CONFIG['food2_label']}")
+    chips_grid(get_available_groups(store), slot)
+    st.button(
+        UI_CONFIG['clear_button_text'],
+        key=StateKeys.CLEAR_BUTTON_LEFT if is_left else StateKeys.CLEAR_BUTTON_RIGHT,
+        on_click=clear_groups,
+        args=(slot,)
+    )
+    
+    # Gerenciar interação das chips
+    handle_chips_interaction(slot)
+    
+    selected_groups = get_selected_groups(slot)
+    filtered_foods = get_safe_food_keys(store, selected_groups, slot, rows=range_rows)
+    
+    # Busca por nome (insensível a acentos) sobre os alimentos dos grupos
+    search = st.text_input(
+        UI_CONFIG['search_label'],
+        key=StateKeys.BUSCA_LEFT if is_left else StateKeys.BUSCA_RIGHT,
+        placeholder=UI_CONFIG['search_placeholder']
+    )
+    filtered_foods = get_search_filtered_foods(store, filtered_foods, search)
+    # Opções são as chaves canônicas; o rótulo (nome, desambiguado pela fonte) só é exibido
+    food = st.selectbox(
+        UI_CONFIG['select_food1_placeholder'] if is_left else UI_CONFIG['select_food2_placeholder'],
+        [''] + filtered_foods,
+        format_func=store.label_for,
+        key=StateKeys.ALIMENTO_1 if is_left else StateKeys.ALIMENTO_2
+    )
+    
+    # Autoclear quando alimento muda
+    if food:
+        handle_food_change_autoclear(slot, food)
+    
+    # Novo alimento escolhido dentro do fragmento: a comparação precisa ser refeita
+    if food and food != st.session_state.get(StateKeys.RENDERED_FOODS, {}).get(slot):
+        st.rerun(scope="app")
+    
+    return food
+
 def chips_grid(groups, slot):
     """
     Renderiza chips de grupos com layout responsivo em até 3 linhas
@@ -120,14 +299,15 @@ def chips_grid(groups, slot):
             for i, group in enumerate(row_groups):
                 with cols[i]:
                     is_selected = group in selected_groups
-                    if st.button(
+                    # Callback: o estado muda antes da reexecução do fragmento do seletor
+                    st.button(
                         group, 
                         key=StateKeys.get_chip_key(slot, group),
                         type="primary" if is_selected else "secondary",
-                        use_container_width=True
-                    ):
-                        toggle_group(slot, group)
-                        st.rerun()
+                        use_container_width=True,
+                        on_click=toggle_group,
+                        args=(slot, group)
+                    )
 
 def section_selector(available_sections):
     """
@@ -154,17 +334,15 @@ def section_selector(available_sections):
             
             with col_macro1:
                 macro_config = SECTIONS_CONFIG['macros']['comparativos_macros']
-                if st.button(macro_config['label'], key=macro_config['key'], 
-                           type="primary" if macro_config['id'] in selected_sections else "secondary"):
-                    toggle_section(macro_config['id'])
-                    st.rerun()
+                st.button(macro_config['label'], key=macro_config['key'],
+                          type="primary" if macro_config['id'] in selected_sections else "secondary",
+                          on_click=toggle_section, args=(macro_config['id'],))
             
             with col_macro2:
                 macro_config = SECTIONS_CONFIG['macros']['fracoes_macros']
-                if st.button(macro_config['label'], key=macro_config['key'], 
-                           type="primary" if macro_config['id'] in selected_sections else "secondary"):
-                    toggle_section(macro_config['id'])
-                    st.rerun()
+                st.button(macro_config['label'], key=macro_config['key'],
+                          type="primary" if macro_config['id'] in selected_sections else "secondary",
+                          on_click=toggle_section, args=(macro_config['id'],))
         
         # === SEÇÕES MICROS (LADO DIREITO) ===
         with col_right:
@@ -175,49 +353,79 @@ def section_selector(available_sections):
             
             with col_micro1:
                 micro_config = SECTIONS_CONFIG['micros']['minerais']
-                if st.button(micro_config['label'], key=micro_config['key'], 
-                           type="primary" if micro_config['id'] in selected_sections else "secondary"):
-                    toggle_section(micro_config['id'])
-                    st.rerun()
+                st.button(micro_config['label'], key=micro_config['key'],
+                          type="primary" if micro_config['id'] in selected_sections else "secondary",
+                          on_click=toggle_section, args=(micro_config['id'],))
             
             with col_micro2:
                 micro_config = SECTIONS_CONFIG['micros']['vitaminas_lipossoluveis']
-                if st.button(micro_config['label'], key=micro_config['key'], 
-                           type="primary" if micro_config['id'] in selected_sections else "secondary"):
-                    toggle_section(micro_config['id'])
-                    st.rerun()
+                st.button(micro_config['label'], key=micro_config['key'],
+                          type="primary" if micro_config['id'] in selected_sections else "secondary",
+                          on_click=toggle_section, args=(micro_config['id'],))
             
             # Segunda linha de botões Micros
             col_micro3, col_micro4 = st.columns(2)
             
             with col_micro3:
                 micro_config = SECTIONS_CONFIG['micros']['precursores_vitamina_a']
-                if st.button(micro_config['label'], key=micro_config['key'], 
-                           type="primary" if micro_config['id'] in selected_sections else "secondary"):
-                    toggle_section(micro_config['id'])
-                    st.rerun()
+                st.button(micro_config['label'], key=micro_config['key'],
+                          type="primary" if micro_config['id'] in selected_sections else "secondary",
+                          on_click=toggle_section, args=(micro_config['id'],))
             
             with col_micro4:
                 micro_config = SECTIONS_CONFIG['micros']['complexo_b']
-                if st.button(micro_config['label'], key=micro_config['key'], 
-                           type="primary" if micro_config['id'] in selected_sections else "secondary"):
-                    toggle_section(micro_config['id'])
-                    st.rerun()
+                st.button(micro_config['label'], key=micro_config['key'],
+                          type="primary" if micro_config['id'] in selected_sections else "secondary",
+                          on_click=toggle_section, args=(micro_config['id'],))
             
             # Terceira linha de botões Micros
             col_micro5, col_micro6 = st.columns(2)
             
             with col_micro5:
                 micro_config = SECTIONS_CONFIG['micros']['outras_vitaminas']
-                if st.button(micro_config['label'], key=micro_config['key'], 
-                           type="primary" if micro_config['id'] in selected_sections else "secondary"):
-                    toggle_section(micro_config['id'])
-                    st.rerun()
+                st.button(micro_config['label'], key=micro_config['key'],
+                          type="primary" if micro_config['id'] in selected_sections else "secondary",
+                          on_click=toggle_section, args=(micro_config['id'],))
             
             with col_micro6:
                 # Espaço vazio para manter layout
                 pass
 
+@st.fragment
+def sections_panel(data1, data2, food1, food2):
+    """
+    Seletor de seções + seções renderizadas como fragmento: ligar/desligar uma
+    seção reexecuta apenas este painel (cards e gráficos de pizza ficam intactos).
+    Cada seção é, por sua vez, um fragmento próprio.
+    """
+    from ui.state import get_ordered_sections
+    from ui.sections import render_section_fragment
+    from ui.render_plan import start_render_plan
+    
+    st.markdown("---")
+    st.markdown(f"### {UI_CONFIG['sections_title']}")
+    section_selector([])
+    
+    # Sticky menu para navegação rápida
+    sticky_sections_menu()
+    
+    # Usar ordenação inteligente baseada no layout esperado
+    ordered_sections = get_ordered_sections()
+    if ordered_sections:
+        st.markdown("---")
+        # Figuras e tabelas de todas as seções construídas em paralelo; cada seção
+        # é emitida, na ordem, assim que as suas tarefas terminam
+        plan = start_render_plan(ordered_sections, data1, data2, food1, food2)
+        for section_id in ordered_sections:
+            if plan is not None:
+                try:
+                    plan.wait(section_id)
+                except Exception as exc:
+                    # A seção cuja construção falhou mostra o erro no lugar do conteúdo
+                    st.exception(exc)
+                    continue
+            render_section_fragment(section_id, data1, data2, food1, food2)
+
 def sticky_sections_menu():
     """
     Renderiza um menu sticky compacto com as seções disponíveis
@@ -0,0 +1,158 @@
+"""
+Cache de figuras Plotly compartilhado entre sessões (LRU limitado)
+"""
+
+import functools
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+
+import streamlit as st
+
+from config.settings import FIGURE_CACHE_SIZE
+from data.store import FoodRow, FoodStore
+
+class _Uncacheable(Exception):
+    """
+    Argumento sem identidade estável (ex.: DataFrame): a figura é construída sem cache
+    """
+
+class FigureCache:
+    """
+    Mapa chave → figura com despejo LRU e contadores de acertos/falhas.
+    As figuras armazenadas são compartilhadas: quem as recebe não deve alterá-las.
+    """
+
+    def __init__(self, max_entries=FIGURE_CACHE_SIZE):
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get_or_build(self, key, build):
+        """
+        Retorna a figura da chave, construindo-a (fora do lock) em caso de falha
+        """
+        with self._lock:
+            figure = self._entries.get(key)
+            if figure is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return figure
+            self.misses += 1
+
+        figure = build()
+
+        with self._lock:
+            self._entries[key] = figure
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return figure
+
+    def stats(self):
+        """
+        Retorna {hits, misses, hit_rate, size, max_entries}
+        """
+        total = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / total if total else 0.0,
+            'size': len(self._entries),
+            'max_entries': self.max_entries
+        }
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+
+@st.cache_resource
+def get_figure_cache():
+    """
+    Instância única do cache de figuras (compartilhada por todas as sessões)
+    """
+    return FigureCache(FIGURE_CACHE_SIZE)
+
+def get_figure_cache_stats():
+    """
+    Contadores de acertos/falhas do cache de figuras
+    """
+    return get_figure_cache().stats()
+
+_local = threading.local()
+_UNSET = object()
+
+def current_theme():
+    """
+    Tema ativo no navegador ('light'/'dark'), ou None se indisponível.
+    Threads sem contexto do script (ver ui.render_plan) usam o tema de theme_scope.
+    """
+    theme = getattr(_local, 'theme', _UNSET)
+    if theme is not _UNSET:
+        return theme
+    try:
+        return st.context.theme.type
+    except Exception:
+        return None
+
+@contextmanager
+def theme_scope(theme):
+    """
+    Fixa o tema usado nas chaves do cache durante o bloco (na thread atual)
+    """
+    previous = getattr(_local, 'theme', _UNSET)
+    _local.theme = theme
+    try:
+        yield
+    finally:
+        _local.theme = previous
+
+def _freeze(value):
+    """
+    Converte um argumento do construtor em parte hashable da chave.
+    Alimentos entram como (chave canônica, impressão dos valores): a entrada
+    continua válida após uma recarga que não altere o alimento. Dicionários
+    entram como tuplas ordenadas.
+    """
+    if isinstance(value, FoodRow):
+        return ('row', value.key, value.digest)
+    if isinstance(value, FoodStore):
+        if value.version is None:
+            raise _Uncacheable()
+        return ('store', value.version)
+    if isinstance(value, dict):
+        return ('dict',) + tuple((k, _freeze(v)) for k, v in value.items())
+    if isinstance(value, (list, tuple, range)):
+        return tuple(_freeze(v) for v in value)
+    if value is None or isinstance(value, (str, int, float, bool)):
+        return value
+    try:
+        hash(value)
+    except TypeError:
+        raise _Uncacheable()
+    if hasattr(value, 'item'):
+        # Escalares numpy
+        return value.item()
+    raise _Uncacheable()
+
+def cached_figure(func):
+    """
+    Decorador para construtores de figuras: a chave combina o construtor, o tema,
+    os alimentos (chave + impressão dos valores) e os demais argumentos (seção,
+    mapeamento, limites). Com argumentos sem identidade estável, constrói sem cache.
+    """
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        try:
+            key = (func.__name__, current_theme(), _freeze(args), _freeze(dict(sorted(kwargs.items()))))
+        except _Uncacheable:
+            return func(*args, **kwargs)
+        return get_figure_cache().get_or_build(key, lambda: func(*args, **kwargs))
+    return wrapper
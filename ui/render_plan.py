@@ -0,0 +1,144 @@
+"""
+Planejador de renderização: figuras e tabelas das seções selecionadas construídas em paralelo.
+
+Cada seção do registro (ui.sections.SECTIONS_REGISTRY) declara uma função "plan"
+que devolve as tarefas de construção ({nome: RenderTask}) sem chamar o Streamlit.
+O planejador envia as tarefas de todas as seções a um pool de threads
+compartilhado; a thread do script emite as seções na ordem de
+get_ordered_sections(), esperando apenas as tarefas da seção da vez. As tarefas
+aquecem o cache de figuras e o ComparisonResult do par: ao renderizar, a seção
+executa as mesmas tarefas e encontra tudo pronto.
+
+Uma tarefa que falhe no pool tem a exceção guardada: RenderPlan.wait registra
+o erro no log e no perfil (render_plan.<seção>.<tarefa>.erro) e a relança na
+thread do script, para que a seção seja substituída pelo erro em vez de ser
+emitida vazia ou pela metade. A espera por seção tem limite
+(RENDER_PLAN_TIMEOUT_SECONDS): tarefas que não terminam a tempo (pool saturado
+por outras sessões, construtor travado) são abandonadas e a seção é construída
+na thread do script.
+"""
+
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor, wait as wait_futures
+from typing import Callable, NamedTuple
+
+import streamlit as st
+
+from config.settings import RENDER_POOL_SIZE, RENDER_PLAN_TIMEOUT_SECONDS
+from data.store import FoodRow
+from logic.profiling import current_profile
+from ui.figure_cache import current_theme, theme_scope
+
+logger = logging.getLogger(__name__)
+
+class RenderTask(NamedTuple):
+    """
+    Chamada de um construtor de figura ou tabela, montada antes da renderização
+    """
+    builder: Callable
+    args: tuple = ()
+    kwargs: dict | None = None
+
+    def run(self):
+        return self.builder(*self.args, **(self.kwargs or {}))
+
+@st.cache_resource
+def get_render_pool():
+    """
+    Pool de threads compartilhado por todas as sessões (None com RENDER_POOL_SIZE <= 1)
+    """
+    if RENDER_POOL_SIZE <= 1:
+        return None
+    return ThreadPoolExecutor(max_workers=RENDER_POOL_SIZE, thread_name_prefix="render")
+
+def _timed(task, theme):
+    """
+    Executa a tarefa no pool com o tema da sessão.
+
+    Returns:
+        (tempo em ms, exceção levantada pela tarefa ou None)
+    """
+    error = None
+    start = time.perf_counter()
+    with theme_scope(theme):
+        try:
+            task.run()
+        except Exception as exc:
+            error = exc
+    return (time.perf_counter() - start) * 1000, error
+
+class RenderPlan:
+    """
+    Tarefas em andamento por seção, na ordem de emissão
+    """
+
+    def __init__(self, pool, sections, data1, data2, food1, food2):
+        from ui.sections import SECTIONS_REGISTRY
+
+        theme = current_theme()
+        self.submitted_at = time.perf_counter()
+        self.futures = {}
+        for section in sections:
+            entry = SECTIONS_REGISTRY.get(section)
+            if entry is None or 'plan' not in entry:
+                continue
+            tasks = entry['plan'](data1, data2, food1, food2)
+            self.futures[section] = [
+                (name, pool.submit(_timed, task, theme)) for name, task in tasks.items()
+            ]
+
+    def wait(self, section):
+        """
+        Espera as tarefas da seção e registra o tempo de cada uma no perfil do rerun
+        (render_plan.<seção>.<tarefa>) e a espera da thread do script (render_plan.espera).
+        Relança a primeira exceção das tarefas da seção, depois de registrar todas.
+        Tarefas que não terminam em RENDER_PLAN_TIMEOUT_SECONDS são abandonadas
+        (render_plan.<seção>.<tarefa>.timeout) e ficam para a thread do script.
+        """
+        futures = self.futures.pop(section, ())
+        if not futures:
+            return
+        profile = current_profile()
+        start = time.perf_counter()
+        done, _ = wait_futures([future for _, future in futures], timeout=RENDER_PLAN_TIMEOUT_SECONDS)
+        waited_ms = (time.perf_counter() - start) * 1000
+        
+        results = []
+        for name, future in futures:
+            if future in done:
+                results.append((name, *future.result()))
+                continue
+            # Ainda na fila é cancelada; em execução termina sozinha e só aquece o cache
+            future.cancel()
+            logger.warning("Tarefa %s da seção %s excedeu %.1f s; construída na thread do script",
+                           name, section, RENDER_PLAN_TIMEOUT_SECONDS)
+            if profile is not None:
+                profile.add(f"render_plan.{section}.{name}.timeout", waited_ms)
+        
+        errors = []
+        for name, elapsed_ms, error in results:
+            if profile is not None:
+                profile.add(f"render_plan.{section}.{name}", elapsed_ms)
+            if error is not None:
+                logger.error("Tarefa %s da seção %s falhou", name, section, exc_info=error)
+                if profile is not None:
+                    profile.add(f"render_plan.{section}.{name}.erro", elapsed_ms)
+                errors.append(error)
+        if profile is not None:
+            profile.add("render_plan.espera", waited_ms)
+        if errors:
+            raise errors[0]
+
+def start_render_plan(sections, data1, data2, food1, food2):
+    """
+    Envia ao pool as tarefas das seções e retorna o RenderPlan, ou None quando o
+    planejador está desativado ou os alimentos não têm identidade estável
+    (DataFrames: nada do que o pool construísse seria reaproveitado)
+    """
+    pool = get_render_pool()
+    if pool is None or not sections:
+        return None
+    if not (isinstance(data1, FoodRow) and isinstance(data2, FoodRow)):
+        return None
+    return RenderPlan(pool, sections, data1, data2, food1, food2)
@@ -12,17 +12,27 @@ class StateKeys:
     ALIMENTO_1 = 'alimento1'
     ALIMENTO_2 = 'alimento2'
     
+    # Alimentos de cada slot na última execução completa {slot: alimento}
+    RENDERED_FOODS = 'alimentos_renderizados'
+    
     # Seleção atual (instância persistente)
     CURRENT_SELECTION = 'current_selection'
-    CURRENT_FOOD1 = 'current_food1'
-    CURRENT_FOOD2 = 'current_food2'
-    CURRENT_DATA1 = 'current_data1'
-    CURRENT_DATA2 = 'current_data2'
     
     # Grupos selecionados
     GRUPOS_SELECIONADOS_LEFT = 'grupos_selecionados_left'
     GRUPOS_SELECIONADOS_RIGHT = 'grupos_selecionados_right'
     
+    # Busca por nome (acima de cada selectbox)
+    BUSCA_LEFT = 'busca_left'
+    BUSCA_RIGHT = 'busca_right'
+    
+    # Comparação múltipla (3 a 10 alimentos)
+    MODO_COMPARACAO = 'modo_comparacao'
+    ALIMENTOS_MULTI = 'alimentos_multi'
+    
+    # Filtros por faixa de nutrientes (barra lateral)
+    CLEAR_RANGE_FILTERS = 'limpar_faixas'
+    
     # Seções selecionadas
     SECOES_SELECIONADAS = 'secoes_selecionadas'
     
@@ -41,6 +51,14 @@ class StateKeys:
         Evita colisões e facilita manutenção
         """
         return f"chip:{slot}:{group}"
+    
+    # Padrão de key para sliders de faixa: "faixa:{coluna}"
+    @staticmethod
+    def get_range_key(column: str) -> str:
+        """
+        Gera key para slider de faixa seguindo padrão: faixa:{coluna}
+        """
+        return f"faixa:{column}"
 
 def init_state():
     """
@@ -58,14 +76,6 @@ def init_state():
     # Inicializar seleção atual
     if StateKeys.CURRENT_SELECTION not in st.session_state:
         st.session_state[StateKeys.CURRENT_SELECTION] = None
-    if StateKeys.CURRENT_FOOD1 not in st.session_state:
-        st.session_state[StateKeys.CURRENT_FOOD1] = None
-    if StateKeys.CURRENT_FOOD2 not in st.session_state:
-        st.session_state[StateKeys.CURRENT_FOOD2] = None
-    if StateKeys.CURRENT_DATA1 not in st.session_state:
-        st.session_state[StateKeys.CURRENT_DATA1] = None
-    if StateKeys.CURRENT_DATA2 not in st.session_state:
-        st.session_state[StateKeys.CURRENT_DATA2] = None
 
 # === NOVA INTERFACE COM SLOTS ===
 
@@ -238,37 +248,23 @@ def get_current_selection():
     """
     return st.session_state.get(StateKeys.CURRENT_SELECTION, None)
 
-def set_current_selection(food1: str, food2: str, data1, data2):
+def set_current_selection(food1: str, food2: str, data1=None, data2=None):
     """
     Define a seleção atual (instância persistente)
     """
-    st.session_state[StateKeys.CURRENT_SELECTION] = {
-        'food1': food1,
-        'food2': food2,
-        'data1': data1,
-        'data2': data2
-    }
-    st.session_state[StateKeys.CURRENT_FOOD1] = food1
-    st.session_state[StateKeys.CURRENT_FOOD2] = food2
-    st.session_state[StateKeys.CURRENT_DATA1] = data1
-    st.session_state[StateKeys.CURRENT_DATA2] = data2
+    create_fixed_instance(food1, food2, data1, data2)
 
 def clear_current_selection():
     """
     Limpa a seleção atual
     """
     st.session_state[StateKeys.CURRENT_SELECTION] = None
-    st.session_state[StateKeys.CURRENT_FOOD1] = None
-    st.session_state[StateKeys.CURRENT_FOOD2] = None
-    st.session_state[StateKeys.CURRENT_DATA1] = None
-    st.session_state[StateKeys.CURRENT_DATA2] = None
 
 def has_selection_changed(food1: str, food2: str) -> bool:
     """
     Verifica se a seleção mudou comparando com a seleção atual
     """
-    current_food1 = st.session_state.get(StateKeys.CURRENT_FOOD1, None)
-    current_food2 = st.session_state.get(StateKeys.CURRENT_FOOD2, None)
+    current_food1, current_food2 = get_current_foods()
     
     return (food1 != current_food1) or (food2 != current_food2)
 
@@ -276,19 +272,13 @@ def get_current_foods():
     """
     Retorna os alimentos da seleção atual
     """
-    return (
-        st.session_state.get(StateKeys.CURRENT_FOOD1, None),
-        st.session_state.get(StateKeys.CURRENT_FOOD2, None)
-    )
+    return get_instance_foods()
 
-def get_current_data():
+def get_current_data(store=None):
     """
-    Retorna os dados da seleção atual
+    Retorna os dados da seleção atual (FoodRow resolvidos no store)
     """
-    return (
-        st.session_state.get(StateKeys.CURRENT_DATA1, None),
-        st.session_state.get(StateKeys.CURRENT_DATA2, None)
-    )
+    return get_instance_data(store)
 
 def is_valid_selection(food1: str, food2: str) -> bool:
     """
@@ -361,20 +351,69 @@ def handle_chips_interaction(slot: Literal["left", "right"]):
         # O usuário pode continuar vendo a comparação mesmo com filtros diferentes
         handle_filtering_with_fixed_instance(slot)
 
-def get_safe_food_names(df, selected_groups, slot):
+def get_safe_food_names(df, selected_groups, slot, rows=None):
     """
-    Obtém nomes de alimentos de forma segura, evitando quebras
+    Obtém nomes de alimentos de forma segura, evitando quebras.
+    `rows` restringe aos alimentos aprovados pelo filtro por faixas de nutrientes.
     """
     try:
         from logic.filters import get_food_names
         if not selected_groups:
             # Se não há grupos selecionados, retornar todos os alimentos
-            return get_food_names(df, None)
-        return get_food_names(df, selected_groups)
+            return get_food_names(df, None, rows=rows)
+        return get_food_names(df, selected_groups, rows=rows)
     except Exception as e:
         st.error(f"Erro ao filtrar alimentos: {str(e)}")
         return []
 
+def get_safe_food_keys(store, selected_groups, slot, rows=None):
+    """
+    Como get_safe_food_names, mas retorna as chaves canônicas dos alimentos
+    (opções dos seletores; o rótulo vem de store.label_for)
+    """
+    try:
+        from logic.filters import get_food_keys
+        return get_food_keys(store, selected_groups or None, rows=rows)
+    except Exception as e:
+        st.error(f"Erro ao filtrar alimentos: {str(e)}")
+        return []
+
+def get_multi_selection(store):
+    """
+    Retorna (rótulos, posições) dos alimentos da comparação múltipla, na ordem selecionada.
+    Alimentos que não existem mais no dataset (ex.: após recarga) são ignorados.
+    """
+    foods, rows = [], []
+    for key in st.session_state.get(StateKeys.ALIMENTOS_MULTI, []):
+        row = store.row_index(key)
+        if row is not None:
+            foods.append(store.labels[row])
+            rows.append(row)
+    return foods, rows
+
+def clear_range_filters():
+    """
+    Remove as faixas selecionadas nos sliders (volta ao intervalo completo)
+    """
+    from config.settings import RANGE_FILTERS
+    for column in RANGE_FILTERS:
+        st.session_state.pop(StateKeys.get_range_key(column), None)
+
+def get_search_filtered_foods(store, food_names, search_term):
+    """
+    Aplica a busca por nome sobre a lista de alimentos (chaves) já filtrada por grupos.
+    Retorna as chaves ranqueadas (prefixo, termos, aproximado) ou a lista original.
+    """
+    if not search_term or not search_term.strip():
+        return food_names
+    try:
+        from logic.search import search_foods
+        from config.settings import SEARCH_RESULT_LIMIT
+        return search_foods(store, search_term, allowed=food_names, limit=SEARCH_RESULT_LIMIT)
+    except Exception as e:
+        st.error(f"Erro na busca de alimentos: {str(e)}")
+        return food_names
+
 def handle_food_change_autoclear(slot: Literal["left", "right"], new_food: str):
     """
     Gerencia autoclear quando alimento muda
@@ -413,22 +452,74 @@ def handle_food_change_autoclear(slot: Literal["left", "right"], new_food: str):
 
 # === SISTEMA DE INSTÂNCIA FIXA ===
 
-def create_fixed_instance(food1: str, food2: str, data1, data2):
+class ComparisonState:
+    """
+    Instância fixa guardada na sessão: apenas identificadores compactos
+    (chave canônica e linha de cada alimento) e a versão do dataset em que as
+    linhas foram resolvidas. Os dados (FoodRow) vêm do FoodStore compartilhado sob demanda.
+    """
+
+    __slots__ = ('food1', 'food2', 'row1', 'row2', 'version', 'created_at')
+
+    def __init__(self, food1, food2, row1=None, row2=None, version=None, created_at=0):
+        self.food1 = food1
+        self.food2 = food2
+        self.row1 = row1
+        self.row2 = row2
+        self.version = version
+        self.created_at = created_at
+
+    def __repr__(self):
+        return f"ComparisonState({self.food1!r}, {self.food2!r}, version={self.version!r})"
+
+    def resolve(self, store):
+        """
+        Retorna (data1, data2) como FoodRow do store.
+        Se o dataset mudou de versão, as linhas são relocalizadas pela chave
+        (estável entre recargas: tabela_fonte + alimento_id).
+        """
+        from data.store import FoodRow
+        
+        if store is None:
+            return None, None
+        
+        stale = self.version is None or self.version != store.version
+        if stale or self.row1 is None or self.row2 is None:
+            self.row1 = store.row_index(self.food1)
+            self.row2 = store.row_index(self.food2)
+            self.version = store.version
+        
+        return (
+            FoodRow(store, self.row1) if self.row1 is not None else None,
+            FoodRow(store, self.row2) if self.row2 is not None else None
+        )
+
+def _row_id(data):
+    """
+    (linha, versão do dataset) de uma visão de linha; (None, None) para outros tipos
+    """
+    store = getattr(data, 'store', None)
+    if store is None:
+        return None, None
+    return data.index, store.version
+
+def create_fixed_instance(food1: str, food2: str, data1=None, data2=None):
     """
     Cria uma instância fixa da comparação.
     Esta instância permanece estável independente de filtros.
-    """
-    st.session_state[StateKeys.CURRENT_SELECTION] = {
-        'food1': food1,
-        'food2': food2,
-        'data1': data1,
-        'data2': data2,
-        'created_at': st.session_state.get('_timestamp', 0)
-    }
-    st.session_state[StateKeys.CURRENT_FOOD1] = food1
-    st.session_state[StateKeys.CURRENT_FOOD2] = food2
-    st.session_state[StateKeys.CURRENT_DATA1] = data1
-    st.session_state[StateKeys.CURRENT_DATA2] = data2
+    Só os identificadores das linhas são guardados; `data1`/`data2` (FoodRow)
+    apenas informam as linhas já localizadas.
+    """
+    row1, version1 = _row_id(data1)
+    row2, version2 = _row_id(data2)
+    if version1 != version2:
+        # Linhas de versões diferentes: relocalizar ambas na próxima leitura
+        row1 = row2 = version1 = None
+    
+    st.session_state[StateKeys.CURRENT_SELECTION] = ComparisonState(
+        food1, food2, row1, row2, version1,
+        created_at=st.session_state.get('_timestamp', 0)
+    )
 
 def get_fixed_instance():
     """
@@ -447,10 +538,6 @@ def clear_fixed_instance():
     Limpa a instância fixa atual.
     """
     st.session_state[StateKeys.CURRENT_SELECTION] = None
-    st.session_state[StateKeys.CURRENT_FOOD1] = None
-    st.session_state[StateKeys.CURRENT_FOOD2] = None
-    st.session_state[StateKeys.CURRENT_DATA1] = None
-    st.session_state[StateKeys.CURRENT_DATA2] = None
 
 def should_create_new_instance(food1: str, food2: str) -> bool:
     """
@@ -459,9 +546,7 @@ def should_create_new_instance(food1: str, food2: str) -> bool:
     if not has_fixed_instance():
         return True
     
-    current_instance = get_fixed_instance()
-    current_food1 = current_instance.get('food1', '')
-    current_food2 = current_instance.get('food2', '')
+    current_food1, current_food2 = get_instance_foods()
     
     # Criar nova instância se os alimentos mudaram
     return (food1 != current_food1 or food2 != current_food2)
@@ -473,9 +558,7 @@ def should_update_instance(food1: str, food2: str) -> bool:
     if not has_fixed_instance():
         return False
     
-    current_instance = get_fixed_instance()
-    current_food1 = current_instance.get('food1', '')
-    current_food2 = current_instance.get('food2', '')
+    current_food1, current_food2 = get_instance_foods()
     
     # Atualizar se pelo menos um alimento mudou
     return (food1 != current_food1 or food2 != current_food2)
@@ -502,17 +585,20 @@ def get_instance_foods():
         return None, None
     
     instance = get_fixed_instance()
-    return instance.get('food1', ''), instance.get('food2', '')
+    return instance.food1, instance.food2
 
-def get_instance_data():
+def get_instance_data(store=None):
     """
-    Retorna os dados da instância fixa atual.
+    Retorna os dados da instância fixa atual, resolvidos no FoodStore
+    informado (padrão: versão atual do dataset).
     """
     if not has_fixed_instance():
         return None, None
     
-    instance = get_fixed_instance()
-    return instance.get('data1', None), instance.get('data2', None)
+    if store is None:
+        from data.loader import load_store
+        store = load_store()
+    return get_fixed_instance().resolve(store)
 
 def is_instance_valid() -> bool:
     """
@@ -522,12 +608,7 @@ def is_instance_valid() -> bool:
         return False
     
     instance = get_fixed_instance()
-    food1 = instance.get('food1', '')
-    food2 = instance.get('food2', '')
-    data1 = instance.get('data1', None)
-    data2 = instance.get('data2', None)
-    
-    return (food1 and food2 and data1 is not None and data2 is not None)
+    return bool(instance.food1 and instance.food2)
 
 def handle_filtering_with_fixed_instance(slot: Literal["left", "right"]):
     """